@@ -6,13 +6,16 @@
 
 import os
 import time
-import urllib.parse
 
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
 
+from card_renderer import render_turn
 from chatbot_engine import ChatbotEngine
+from profiling import DEFAULT_PROFILE_DIR, QueryProfiler
+from query_log import QueryLog
+from session_history import ChatHistory
 
 
 # ============================================================================
@@ -27,6 +30,31 @@ st.set_page_config(
 )
 
 
+# Batas riwayat chat per session (giliran terlama dibuang lebih dulu).
+# Batas memori mencakup blok HTML kartu yang di-cache (~2-3 KB per kartu).
+MAX_HISTORY_TURNS = 20
+MAX_HISTORY_BYTES = 512 * 1024
+
+# Folder index bersama (memory-mapped) untuk beberapa replika di host yang sama.
+# Kosongkan untuk memakai index privat per proses.
+SHARED_INDEX_DIR = os.environ.get('KULINER_SHARED_INDEX_DIR') or None
+
+# Log query anonim (query ternormalisasi + frekuensi) untuk warm-up cache saat startup
+QUERY_LOG_PATH = os.environ.get('KULINER_QUERY_LOG', os.path.join('logs', 'query_log.json'))
+RESULT_CACHE_SIZE = 256
+
+# Query tombol Pencarian Cepat (selalu ikut di-warm-up)
+QUICK_SEARCH_QUERIES = ("kopi", "ramen", "Sate", "roti")
+RESULT_TOP_N = 50
+
+# Profiling query sampling (e.g., KULINER_PROFILE_SAMPLE_RATE=0.01 -> 1% query diprofil)
+PROFILE_DIR = os.environ.get('KULINER_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+PROFILE_SAMPLE_RATE = float(os.environ.get('KULINER_PROFILE_SAMPLE_RATE', '0') or 0)
+
+# Mode lean memory (KULINER_LEAN_MEMORY=1): kolom metadata build-only dilepas setelah index dibangun
+LEAN_MEMORY = os.environ.get('KULINER_LEAN_MEMORY', '0') == '1'
+
+
 # ============================================================================
 # FUNGSI PEMBANTU
 # ============================================================================
@@ -34,7 +62,17 @@ st.set_page_config(
 @st.cache_resource(show_spinner=False)
 def load_chatbot(dataset_path):
     """Memuat instance chatbot engine dengan caching agar tidak di-reload setiap interaksi"""
-    return ChatbotEngine(dataset_path)
+    engine = ChatbotEngine(
+        dataset_path,
+        shared_index_dir=SHARED_INDEX_DIR,
+        query_log=QueryLog(QUERY_LOG_PATH),
+        result_cache_size=RESULT_CACHE_SIZE,
+        profiler=QueryProfiler(PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE) if PROFILE_SAMPLE_RATE else None,
+        lean_memory=LEAN_MEMORY,
+    )
+    # Query populer diputar ulang di background: request pertama user langsung kena cache hangat
+    engine.warm_up(QUICK_SEARCH_QUERIES, price_filter="Semua", top_n=RESULT_TOP_N)
+    return engine
 
 
 def load_css(file_name):
@@ -43,31 +81,6 @@ def load_css(file_name):
         st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
 
-def get_category_icon(category_name):
-    """Mengembalikan ikon Font Awesome berdasarkan kategori kuliner"""
-    cat_lower = str(category_name).lower()
-    
-    icon_mapping = {
-        ('kopi', 'cafe', 'kafe', 'coffee'): "fa-mug-hot",
-        ('jepang', 'sushi', 'ramen', 'udon'): "fa-fish",
-        ('sunda', 'khas', 'tradisional'): "fa-leaf",
-        ('western', 'steak', 'burger', 'pizza', 'pasta'): "fa-burger",
-        ('roti', 'bakery', 'kue', 'cake', 'donat'): "fa-bread-slice",
-        ('ayam', 'bebek', 'geprek', 'fried chicken'): "fa-drumstick-bite",
-        ('mie', 'bakso', 'soto', 'sop', 'kuah'): "fa-bowl-food",
-        ('minuman', 'jus', 'thai tea', 'bobba'): "fa-glass-water",
-        ('nasi', 'padang', 'warteg'): "fa-utensils",
-        ('pedas', 'sambal'): "fa-fire",
-    }
-    
-    for keywords, icon in icon_mapping.items():
-        if any(keyword in cat_lower for keyword in keywords):
-            return icon
-    
-    return "fa-utensils"
-
-
-
 # ============================================================================
 # INISIALISASI APLIKASI
 # ============================================================================
@@ -89,8 +102,8 @@ if 'chatbot_engine' not in st.session_state:
             st.error("Dataset tidak ditemukan!")
             st.stop()
         st.session_state.chatbot_engine = load_chatbot(dataset_path)
-        if 'messages' not in st.session_state:
-            st.session_state.messages = []
+        if 'history' not in st.session_state:
+            st.session_state.history = ChatHistory(MAX_HISTORY_TURNS, MAX_HISTORY_BYTES)
         if 'show_scroll_btn' not in st.session_state:
             st.session_state.show_scroll_btn = False
     except Exception as e:
@@ -103,9 +116,10 @@ if 'chatbot_engine' not in st.session_state:
 # ============================================================================
 
 with st.sidebar:
-    # Data Sistem
+    # Data Sistem (dibaca dari snapshot statistik engine, tanpa menyentuh DataFrame)
     try:
-        total_umkm = len(st.session_state.chatbot_engine.df)
+        dataset_stats = st.session_state.chatbot_engine.statistics
+        total_umkm = dataset_stats.total_umkm
     except:
         total_umkm = 0
         
@@ -136,9 +150,9 @@ with st.sidebar:
     st.markdown('<div class="sidebar-header"><i class="fas fa-utensils"></i></div>', unsafe_allow_html=True)
     with st.expander("KATEGORI KULINER", expanded=True):
         if total_umkm > 0:
-            top_cats = st.session_state.chatbot_engine.df['kategori'].value_counts().head(10)
+            top_cats = dataset_stats.top_categories(10)
             st.markdown("<div class='sidebar-cat-list'>", unsafe_allow_html=True)
-            for cat, count in top_cats.items():
+            for cat, count in top_cats:
                 st.markdown(f"<div class='sidebar-cat-item'><span>{cat}</span><span>{count}</span></div>", unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
 
@@ -225,38 +239,30 @@ if 'temp_query' in st.session_state and st.session_state.temp_query:
 elif submitted and user_input_val:
     final_query = user_input_val
 elif quick_kopi:
-    final_query = "kopi"
+    final_query = QUICK_SEARCH_QUERIES[0]
 elif quick_ramen:
-    final_query = "ramen"
+    final_query = QUICK_SEARCH_QUERIES[1]
 elif quick_sate:
-    final_query = "Sate"
+    final_query = QUICK_SEARCH_QUERIES[2]
 elif quick_roti:
-    final_query = "roti"
+    final_query = QUICK_SEARCH_QUERIES[3]
 
 if final_query:
     st.session_state.show_scroll_btn = False  # Reset tombol setiap kali searching baru
-    st.session_state.messages.append({"role": "user", "content": final_query})
     
     price_map = {"Semua": "Semua", "Murah": "Murah", "Sedang": "Sedang", "Mahal": "Mahal"}
     backend_price = price_map.get(st.session_state.get("price_filter", "Semua"), "Semua")
     
     try:
         with st.spinner('Sedang mencari rekomendasi kuliner...'):
-            recommendations, warning_msg, corrected_query = st.session_state.chatbot_engine.get_recommendations(
+            result = st.session_state.chatbot_engine.recommend(
                 final_query, 
                 price_filter=backend_price,
-                top_n=50
+                top_n=RESULT_TOP_N
             )
         
-        st.session_state.messages.append({
-            "role": "bot",
-            "content": final_query, # Simpan input asli user untuk riwayat chat
-            "corrected_content": corrected_query, # Simpan query hasil koreksi untuk tampilan
-            "full_recommendations": recommendations,
-            "display_count": 5,
-            "display_count": 5,
-            "warning": warning_msg
-        })
+        # Simpan record ringkas (query, posisi baris & skor), bukan DataFrame
+        st.session_state.history.append(final_query, result, display_count=5)
         
         
     except Exception as e:
@@ -267,132 +273,33 @@ if final_query:
 # TAMPILAN HASIL REKOMENDASI
 # ============================================================================
 
-if len(st.session_state.messages) > 0:
+if len(st.session_state.history) > 0:
     st.markdown("<div style='height: 5px;'></div>", unsafe_allow_html=True) 
     
-    for idx, message in enumerate(st.session_state.messages):
-        if message['role'] == 'user':
-            pass
-        else:
-            # Tambahkan garis pemisah sebelum hasil pencarian kedua dan seterusnya
-            if idx > 1:  # idx > 1 karena idx 0 adalah user message pertama, idx 1 adalah bot response pertama
-                st.markdown("""
-                <div style="margin: 2rem 0; display: flex; align-items: center; gap: 1rem;">
-                    <div style="flex: 1; height: 2px; background: linear-gradient(to right, transparent, var(--accent-blue), transparent); opacity: 0.5;"></div>
-                    <div style="display: flex; align-items: center; gap: 0.5rem; padding: 0.5rem 1.5rem; background: var(--card-bg); border: 2px solid var(--accent-blue); border-radius: 50px; box-shadow: 0 4px 12px rgba(37, 99, 235, 0.2);">
-                        <i class="fas fa-search" style="color: var(--accent-blue); font-size: 1rem;"></i>
-                        <span style="color: var(--text-primary); font-weight: 600; font-size: 0.9rem;">Pencarian Baru</span>
-                    </div>
-                    <div style="flex: 1; height: 2px; background: linear-gradient(to left, transparent, var(--accent-blue), transparent); opacity: 0.5;"></div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="results-container">
-                <div class="results-header-container">
-                    <h3 class="results-header-title"><i class="fas fa-check-circle" style="color:var(--success);"></i> Berikut Rekomendasi untuk "{message.get('corrected_content', message['content'])}"</h3>
-                </div>
-            """, unsafe_allow_html=True)
-            
-            full_recs = message.get('full_recommendations')
-            display_count = message.get('display_count', 5)
-            
-            if full_recs is not None and not full_recs.empty:
-                # Tampilkan warning jika ada
-                warning_msg = message.get('warning')
-                if warning_msg:
-                    st.markdown(f"""
-                    <div style="width: 95%; max-width: 820px; margin: 0 auto 1rem auto; padding: 0.75rem 1rem; background-color: rgba(234, 179, 8, 0.1); border: 1px solid rgba(234, 179, 8, 0.3); border-radius: 8px; color: #eab308; font-size: 0.9rem; display: flex; align-items: start; gap: 0.5rem;">
-                        <i class="fas fa-exclamation-triangle" style="margin-top: 3px;"></i>
-                        <span>{warning_msg}</span>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                current_view = full_recs.iloc[:display_count]
-                
-                # Render kartu rekomendasi
-                for _, row in current_view.iterrows():
-                    similarity = row['similarity_score'] * 100
-                    icon_class = get_category_icon(row['kategori'])
-                    
-                    # Generate Google Maps URL
-                    maps_query = urllib.parse.quote(f"{row['nama_rumah_makan']} {row['alamat']}")
-                    maps_url = f"https://www.google.com/maps/search/?api=1&query={maps_query}"
-                    # Gunakan URL embed legacy yang tidak memerlukan API Key
-                    embed_url = f"https://maps.google.com/maps?q={maps_query}&t=&z=15&ie=UTF8&iwloc=&output=embed"
-                    
-                    # Generate unique ID untuk setiap modal
-                    modal_id = f"map-modal-{idx}-{_}"
-                    
-                    st.markdown(f"""
-<div class="recommendation-card">
-    <div style="display:flex; justify-content:space-between; align-items:flex-start; margin-bottom:0.5rem;">
-        <h4 style="margin:0;"><i class="fas {icon_class}"></i> {row['nama_rumah_makan']}</h4>
-        <span class="card-match-badge">{similarity:.0f}% Match</span>
-    </div>
-    <p><i class="fas fa-map-marker-alt icon-fixed-width"></i> <strong>Alamat:</strong> {row['alamat']}</p>
-    <p><i class="fas fa-tag icon-fixed-width"></i> <strong>Kategori:</strong> {row['kategori']}</p>
-    <p><i class="fas fa-money-bill icon-fixed-width"></i> <strong>Harga:</strong> {row['range_harga']} ({row['kategori_harga']})</p>
-    <p><i class="fas fa-utensils icon-fixed-width"></i> <strong>Menu:</strong> {row['menu']}</p>
-    <p><i class="fas fa-comments icon-fixed-width"></i> <strong>Deskripsi:</strong> {row['deskripsi']}</p>
-    <div style="margin-top: 1rem;">
-        <div class="map-popup-trigger" data-modal-id="{modal_id}" data-embed-url="{embed_url}">
-            <i class="fas fa-location-dot"></i> Lihat Lokasi di Google Maps
-        </div>
-    </div>
-</div>
-
-<!-- Modal Popup -->
-<div id="{modal_id}" class="map-modal-overlay">
-    <div class="map-modal-content">
-        <div class="map-modal-header">
-            <div class="map-modal-title">
-                <i class="fas fa-map-location-dot"></i>
-                <span>Preview Lokasi</span>
-            </div>
-            <div class="map-modal-close" data-close-modal="{modal_id}" title="Tutup">
-                <i class="fas fa-times"></i>
-            </div>
-        </div>
-        <div class="map-preview-container">
-            <iframe id="map-iframe-{modal_id}" src="" frameborder="0" allowfullscreen></iframe>
-        </div>
-        <div class="map-modal-actions">
-            <a href="{maps_url}" target="_blank" class="map-modal-btn map-modal-btn-expand" style="text-decoration: none; color: white; display: flex; align-items: center; justify-content: center;">
-                <i class="fas fa-up-right-from-square"></i>
-                Expand Map
-            </a>
-            <div class="map-modal-btn map-modal-btn-close" data-close-modal="{modal_id}">
-                <i class="fas fa-xmark"></i>
-                Close
-            </div>
-        </div>
-    </div>
-</div>
-""", unsafe_allow_html=True)
-                
-                if len(full_recs) > display_count:
-                    st.markdown('<div class="load-more-wrapper">', unsafe_allow_html=True)
-                    if st.button(f"Lebih Banyak ({len(full_recs) - display_count})", key=f"more_{idx}"):
-                        message['display_count'] += 5
-                        st.session_state.show_scroll_btn = True
-                        st.rerun()
-                    st.markdown('</div>', unsafe_allow_html=True)
-                
-                st.markdown('</div>', unsafe_allow_html=True) 
-            else:
-                st.markdown("""
-                <div style="max-width: 820px; width: 95%; margin: 0 auto; padding: 0.75rem 1.25rem; background-color: rgba(239, 68, 68, 0.1); border: 1px solid rgba(239, 68, 68, 0.2); border-radius: 12px; color: #ef4444; display: flex; align-items: center; gap: 0.75rem; font-weight: 500;">
-                    <i class="fas fa-circle-xmark" style="font-size: 1.1rem;"></i> Waduh, belum nemu kuliner yang cocok sama pencarian kamu nih. Coba pakai kata kunci lain ya!
-                </div>
-                """, unsafe_allow_html=True)
+    # Blok HTML yang di-cache ikut batas memori riwayat: giliran lama dibuang sebelum render
+    # (render di bawah tidak men-evict karena riwayat sedang di-iterasi)
+    st.session_state.history.trim()
+    
+    for position, turn in enumerate(st.session_state.history):
+        # Satu blok HTML per giliran; kartu yang sudah pernah dirender diambil dari cache.
+        # Garis pemisah ditambahkan sebelum hasil pencarian kedua dan seterusnya.
+        turn_html = render_turn(st.session_state.chatbot_engine, st.session_state.history, turn, with_separator=position > 0)
+        st.markdown(turn_html, unsafe_allow_html=True)
+        
+        if turn.remaining > 0:
+            st.markdown('<div class="load-more-wrapper">', unsafe_allow_html=True)
+            if st.button(f"Lebih Banyak ({turn.remaining})", key=f"more_{turn.turn_id}"):
+                st.session_state.history.expand(turn.turn_id, step=5)
+                st.session_state.show_scroll_btn = True
+                st.rerun()
+            st.markdown('</div>', unsafe_allow_html=True)
 
 
 # ============================================================================
 # PENCARIAN ULANG
 # ============================================================================
 
-if len(st.session_state.messages) > 0:
+if len(st.session_state.history) > 0:
     st.markdown("<div style='text-align:center; margin-top:1rem; margin-bottom:0.5rem; font-size:1rem; color:var(--text-secondary);'>Ingin mencari yang lain?</div>", unsafe_allow_html=True)
     st.markdown('<div class="bottom-search-wrapper">', unsafe_allow_html=True)
     with st.form(key='search_form_bottom'):
@@ -414,13 +321,13 @@ if len(st.session_state.messages) > 0:
 # HAPUS RIWAYAT CHAT
 # ============================================================================
 
-if len(st.session_state.messages) > 0:
+if len(st.session_state.history) > 0:
     st.markdown("---")
     c1, c2, c3 = st.columns([1, 1, 1])
     with c2:
         st.markdown('<div class="hapus-container">', unsafe_allow_html=True)
         if st.button("Hapus Riwayat Chat", type="primary", key="clear_chat", use_container_width=True):
-            st.session_state.messages = []
+            st.session_state.history.clear()
             st.rerun()
         st.markdown('</div>', unsafe_allow_html=True)
 
@@ -430,7 +337,7 @@ if len(st.session_state.messages) > 0:
 # ============================================================================
 
 # Tombol muncul jika user telah mengklik 'Lebih Banyak' ATAU sudah melakukan pencarian lebih dari sekali
-if st.session_state.get('show_scroll_btn', False) or len(st.session_state.messages) > 2:
+if st.session_state.get('show_scroll_btn', False) or len(st.session_state.history) > 1:
     st.markdown("""
     <a href="#top-of-page" class="scroll-to-top-btn" title="Kembali ke atas">
         <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="white" stroke-linecap="round" stroke-linejoin="round">
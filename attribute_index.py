@@ -0,0 +1,124 @@
+# ============================================================================
+# INDEX ATRIBUT BIT-PACKED (FASILITAS, SUASANA, TIPE PENGUNJUNG)
+# ============================================================================
+# Kolom multi-nilai seperti "Toilet, Wi-Fi, Parkiran" atau "Nyaman, Romantis"
+# diurai sekali saat load. Setiap nilai unik mendapat satu bit, dan seluruh
+# atribut satu restoran dipadatkan ke satu integer. Kombinasi filter atribut
+# apa pun (dari query maupun ekspansi semantik, e.g., 'nugas' -> 'wi fi')
+# cukup dijawab dengan satu operasi AND/OR vektor terhadap kolom integer.
+
+import re
+from collections import Counter
+
+import numpy as np
+
+
+ATTRIBUTE_COLUMNS = ('fasilitas', 'suasana', 'tipe_pengunjung')
+
+# Nilai placeholder di dataset (bukan atribut)
+EMPTY_ATTRIBUTE_VALUES = {'', '-', 'nan', 'none'}
+
+MAX_ATTRIBUTE_BITS = 64
+
+# Kata pembungkus di sekitar nilai atribut ('Toilet tersedia', 'Memiliki bar'),
+# dibuang agar setiap fasilitas hanya punya satu bit
+ATTRIBUTE_WRAPPER_PATTERN = re.compile(r'(?:memiliki\s+)?(.+?)(?:\s+tersedia)?', re.IGNORECASE)
+
+
+def strip_attribute_wrapper(value):
+    """Nilai atribut tanpa kata pembungkus: 'Toilet tersedia' -> 'Toilet', 'Memiliki bar' -> 'bar'"""
+    value = str(value).strip()
+    if not value:
+        return value
+    return ATTRIBUTE_WRAPPER_PATTERN.fullmatch(value).group(1)
+
+
+def normalize_attribute(value):
+    """Normalisasi satu nilai atribut: 'Wi-Fi' -> 'wi fi', 'Toilet tersedia' -> 'toilet'"""
+    return strip_attribute_wrapper(re.sub(r'[^a-z0-9]+', ' ', str(value).lower()))
+
+
+def split_attributes(text):
+    """Daftar nilai atribut (ternormalisasi, tanpa placeholder) dari teks dipisah koma"""
+    values = (normalize_attribute(item) for item in str(text).split(','))
+    return [value for value in values if value not in EMPTY_ATTRIBUTE_VALUES]
+
+
+def _code_dtype(n_bits):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if n_bits <= np.iinfo(dtype).bits:
+            return dtype
+    return np.uint64
+
+
+class AttributeIndex:
+    """Atribut multi-nilai yang dipadatkan ke satu kolom integer (satu bit per nilai).
+
+    Attributes:
+        columns (tuple): Kolom dataset yang diindeks
+        bits (dict): Mapping (kolom, nilai ternormalisasi) -> bit (int)
+        values (dict): Mapping kolom -> daftar nilai sesuai urutan bit
+        codes (np.array): Bit atribut per restoran (uint8/16/32/64 sesuai jumlah nilai)
+    """
+
+    def __init__(self, df, columns=ATTRIBUTE_COLUMNS):
+        self.columns = tuple(column for column in columns if column in df.columns)
+        parsed = {column: [split_attributes(text) for text in df[column].values] for column in self.columns}
+
+        counts = Counter(
+            (column, value)
+            for column in self.columns
+            for row_values in parsed[column]
+            for value in set(row_values)
+        )
+        kept = sorted(counts, key=lambda item: (-counts[item], item))[:MAX_ATTRIBUTE_BITS]
+        if len(counts) > MAX_ATTRIBUTE_BITS:
+            print(f"[WARNING] {len(counts) - MAX_ATTRIBUTE_BITS} nilai atribut langka tidak diindeks (maksimal {MAX_ATTRIBUTE_BITS} bit)")
+
+        # Bit diurutkan per kolom lalu frekuensi agar mudah dibaca saat debugging
+        kept.sort(key=lambda item: (self.columns.index(item[0]), -counts[item], item[1]))
+        self.bits = {item: 1 << position for position, item in enumerate(kept)}
+        self.values = {column: [value for col, value in kept if col == column] for column in self.columns}
+
+        row_codes = [0] * len(df)
+        for column in self.columns:
+            for row_id, row_values in enumerate(parsed[column]):
+                for value in row_values:
+                    row_codes[row_id] |= self.bits.get((column, value), 0)
+        self.codes = np.array(row_codes, dtype=_code_dtype(len(kept)))
+
+    def has_value(self, term, columns=None):
+        """True jika `term` adalah salah satu nilai atribut di `columns` (default: semua kolom)"""
+        term = normalize_attribute(term)
+        return any((column, term) in self.bits for column in (columns or self.columns))
+
+    def bit(self, column, value):
+        """Bit untuk satu nilai atribut (0 jika tidak dikenal)"""
+        return self.bits.get((column, normalize_attribute(value)), 0)
+
+    def find(self, text, columns=None):
+        """Gabungan bit untuk nilai atribut yang muncul utuh (per kata) di `text`"""
+        padded = f" {normalize_attribute(text)} "
+        columns = columns or self.columns
+        found = 0
+        for (column, value), bit in self.bits.items():
+            if column in columns and f" {value} " in padded:
+                found |= bit
+        return found
+
+    def names(self, bits):
+        """Nilai atribut untuk gabungan bit (untuk log)"""
+        return [value for (_, value), bit in self.bits.items() if bits & bit]
+
+    def mask_all(self, bits):
+        """Mask restoran yang memiliki SEMUA atribut di `bits` (satu AND vektor)"""
+        required = self.codes.dtype.type(bits)
+        return (self.codes & required) == required
+
+    def mask_any(self, bits):
+        """Mask restoran yang memiliki minimal SATU atribut di `bits` (satu AND vektor)"""
+        return (self.codes & self.codes.dtype.type(bits)) != 0
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
@@ -0,0 +1,205 @@
+# ============================================================================
+# INDEX AUTOCOMPLETE (TYPEAHEAD)
+# ============================================================================
+# Saran prefix untuk nama restoran, menu populer, kategori, lokasi, dan kata
+# sinonim. Seluruh key disimpan sebagai array string terurut: satu prefix
+# dijawab dengan dua binary search (rentang key yang diawali prefix), lalu
+# saran dipilih berdasarkan peringkat global yang dihitung saat load
+# (frekuensi di dataset, jenis saran, panjang label).
+
+import re
+from bisect import bisect_left
+
+import numpy as np
+
+from location_index import NEARBY_TERMS
+
+
+# Urutan jenis saran (dipakai sebagai tie-breaker jika frekuensi sama)
+SUGGESTION_KINDS = ('kategori', 'lokasi', 'menu', 'sinonim', 'nama')
+
+# Menu dianggap populer jika dijual minimal oleh sekian restoran
+MIN_MENU_FREQUENCY = 2
+
+# Kata sebelum kata terakhir yang menandakan kata terakhir adalah lokasi ('ramen di da')
+LOCATION_PREPOSITIONS = {'di'} | NEARBY_TERMS
+
+# Karakter terbesar untuk batas atas rentang prefix
+_PREFIX_END = '\uffff'
+
+
+def completion_key(text):
+    """Key pencarian saran: 'Kopi Susu, Gula Aren!' -> 'kopi susu gula aren'"""
+    return re.sub(r'[^a-z0-9]+', ' ', str(text).lower()).strip()
+
+
+class Suggestion:
+    """Satu saran autocomplete.
+
+    Attributes:
+        label (str): Teks yang ditampilkan / diisikan ke kotak pencarian
+        kind (str): Jenis saran ('nama', 'menu', 'kategori', 'lokasi', 'sinonim')
+        frequency (int): Jumlah restoran terkait di dataset
+    """
+
+    __slots__ = ('label', 'kind', 'frequency')
+
+    def __init__(self, label, kind, frequency):
+        self.label = label
+        self.kind = kind
+        self.frequency = frequency
+
+    def __repr__(self):
+        return f"Suggestion({self.label!r}, {self.kind!r}, {self.frequency})"
+
+
+class AutocompleteIndex:
+    """Array key terurut untuk pencarian prefix.
+
+    Attributes:
+        labels (list): Label setiap entri
+        kinds (np.array): Kode jenis saran per entri (posisi di SUGGESTION_KINDS)
+        frequencies (np.array): Frekuensi per entri
+        keys (list): Key terurut (satu entri bisa punya beberapa key)
+        key_entries (np.array): Entri untuk setiap key
+        ranks (np.array): Peringkat global per entri (0 = saran terbaik)
+    """
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries (iterable): (label, kind, frequency, word_starts). Jika `word_starts`,
+                entri juga bisa ditemukan dari awal setiap kata di label
+                (e.g., 'Ramen Bajuri' dari prefix 'baj')
+        """
+        merged = {}
+        for label, kind, frequency, word_starts in entries:
+            key = completion_key(label)
+            if not key:
+                continue
+            previous = merged.get((kind, key))
+            if previous is None or frequency > previous[1]:
+                merged[(kind, key)] = (label, int(frequency), word_starts)
+
+        self.labels = []
+        kinds, frequencies, pairs = [], [], []
+        for entry, ((kind, key), (label, frequency, word_starts)) in enumerate(merged.items()):
+            self.labels.append(label)
+            kinds.append(SUGGESTION_KINDS.index(kind))
+            frequencies.append(frequency)
+            pairs.append((key, entry))
+            if word_starts:
+                pairs.extend((key[match.end():], entry) for match in re.finditer(r' (?=\S)', key))
+
+        self.kinds = np.array(kinds, dtype=np.int8)
+        self.frequencies = np.array(frequencies, dtype=np.int32)
+
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.key_entries = np.array([entry for _, entry in pairs], dtype=np.int32)
+
+        # Peringkat: frekuensi tertinggi, lalu jenis saran, lalu label terpendek
+        lengths = np.array([len(label) for label in self.labels], dtype=np.int32)
+        order = np.lexsort((lengths, self.kinds, -self.frequencies))
+        self.ranks = np.empty(len(order), dtype=np.int32)
+        self.ranks[order] = np.arange(len(order), dtype=np.int32)
+        self._rank_entries = order.astype(np.int32)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _prefix_entries(self, prefix, limit, kind_codes):
+        """Entri terbaik (urut peringkat, label unik) untuk key yang diawali `prefix`"""
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + _PREFIX_END, lo)
+        if lo == hi:
+            return []
+
+        entries = self.key_entries[lo:hi]
+        if kind_codes is not None:
+            entries = entries[np.isin(self.kinds[entries], kind_codes)]
+
+        seen = set()
+        found = []
+        for entry in self._rank_entries[np.unique(self.ranks[entries])]:
+            label_key = completion_key(self.labels[entry])
+            if label_key in seen:
+                continue
+            seen.add(label_key)
+            found.append(int(entry))
+            if len(found) == limit:
+                break
+        return found
+
+    def _preferred_entries(self, prefix, limit, kind_codes, preferred_codes):
+        """Seperti `_prefix_entries`, tapi jenis `preferred_codes` didahulukan sebelum jenis lain"""
+        allowed = range(len(SUGGESTION_KINDS)) if kind_codes is None else kind_codes
+        preferred = [code for code in allowed if code in preferred_codes]
+        others = [code for code in allowed if code not in preferred_codes]
+
+        found = self._prefix_entries(prefix, limit, preferred) if preferred else []
+        if len(found) < limit and others:
+            seen = {completion_key(self.labels[entry]) for entry in found}
+            for entry in self._prefix_entries(prefix, limit, others):
+                if completion_key(self.labels[entry]) not in seen:
+                    found.append(entry)
+                    if len(found) == limit:
+                        break
+        return found
+
+    def complete(self, text, limit=8, kinds=None):
+        """Saran untuk teks yang sedang diketik.
+
+        Jika prefix utuh tidak menghasilkan saran dan teks terdiri dari beberapa
+        kata, kata terakhir dilengkapi sendiri (e.g., 'ramen di da' -> 'ramen di Dago').
+        Setelah kata depan lokasi ('di', 'dekat', 'sekitar', ...) saran lokasi didahulukan.
+
+        Args:
+            text (str): Teks di kotak pencarian
+            limit (int): Jumlah saran maksimal
+            kinds (iterable, optional): Batasi ke jenis saran tertentu
+
+        Returns:
+            list: Daftar Suggestion, urut dari yang terbaik
+
+        Raises:
+            ValueError: Jika jenis saran tidak dikenal
+        """
+        kind_codes = None
+        if kinds is not None:
+            unknown = set(kinds) - set(SUGGESTION_KINDS)
+            if unknown:
+                raise ValueError(f"Jenis saran {sorted(unknown)} tidak dikenal! Pilihan: {SUGGESTION_KINDS}")
+            kind_codes = [SUGGESTION_KINDS.index(kind) for kind in kinds]
+
+        # Spasi di akhir tetap bermakna: 'kopi ' hanya melengkapi kata berikutnya
+        prefix = completion_key(text)
+        if not prefix or limit <= 0:
+            return []
+        if str(text)[-1:].isspace():
+            prefix += ' '
+
+        entries = self._prefix_entries(prefix, limit, kind_codes)
+        if entries:
+            return [self._suggestion(entry) for entry in entries]
+
+        head, _, last = prefix.rpartition(' ')
+        if not head or not last:
+            return []
+        if head.rpartition(' ')[2] in LOCATION_PREPOSITIONS:
+            entries = self._preferred_entries(last, limit, kind_codes, [SUGGESTION_KINDS.index('lokasi')])
+        else:
+            entries = self._prefix_entries(last, limit, kind_codes)
+        return [self._suggestion(entry, head) for entry in entries]
+
+    def _suggestion(self, entry, head=None):
+        label = self.labels[entry]
+        if head:
+            label = f"{head} {label}"
+        return Suggestion(label, SUGGESTION_KINDS[self.kinds[entry]], int(self.frequencies[entry]))
+
+    @property
+    def nbytes(self):
+        return (self.kinds.nbytes + self.frequencies.nbytes + self.key_entries.nbytes
+                + self.ranks.nbytes + self._rank_entries.nbytes
+                + sum(len(key) for key in self.keys) + sum(len(label) for label in self.labels))
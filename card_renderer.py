@@ -0,0 +1,205 @@
+# ============================================================================
+# RENDER KARTU REKOMENDASI (HTML + CACHE PER GILIRAN)
+# ============================================================================
+
+import urllib.parse
+from functools import lru_cache
+
+
+# ============================================================================
+# TEMPLATE HTML
+# ============================================================================
+# Template ditulis rata kiri: seluruh blok satu giliran dikirim dalam satu
+# st.markdown, dan baris yang menjorok setelah baris kosong akan dianggap
+# code block oleh parser markdown.
+
+SEPARATOR_HTML = """<div style="margin: 2rem 0; display: flex; align-items: center; gap: 1rem;">
+    <div style="flex: 1; height: 2px; background: linear-gradient(to right, transparent, var(--accent-blue), transparent); opacity: 0.5;"></div>
+    <div style="display: flex; align-items: center; gap: 0.5rem; padding: 0.5rem 1.5rem; background: var(--card-bg); border: 2px solid var(--accent-blue); border-radius: 50px; box-shadow: 0 4px 12px rgba(37, 99, 235, 0.2);">
+        <i class="fas fa-search" style="color: var(--accent-blue); font-size: 1rem;"></i>
+        <span style="color: var(--text-primary); font-weight: 600; font-size: 0.9rem;">Pencarian Baru</span>
+    </div>
+    <div style="flex: 1; height: 2px; background: linear-gradient(to left, transparent, var(--accent-blue), transparent); opacity: 0.5;"></div>
+</div>"""
+
+HEADER_HTML = """<div class="results-container">
+<div class="results-header-container">
+    <h3 class="results-header-title"><i class="fas fa-check-circle" style="color:var(--success);"></i> Berikut Rekomendasi untuk "{query}"</h3>
+</div>"""
+
+WARNING_HTML = """<div style="width: 95%; max-width: 820px; margin: 0 auto 1rem auto; padding: 0.75rem 1rem; background-color: rgba(234, 179, 8, 0.1); border: 1px solid rgba(234, 179, 8, 0.3); border-radius: 8px; color: #eab308; font-size: 0.9rem; display: flex; align-items: start; gap: 0.5rem;">
+    <i class="fas fa-exclamation-triangle" style="margin-top: 3px;"></i>
+    <span>{warning}</span>
+</div>"""
+
+NO_RESULT_HTML = """<div style="max-width: 820px; width: 95%; margin: 0 auto; padding: 0.75rem 1.25rem; background-color: rgba(239, 68, 68, 0.1); border: 1px solid rgba(239, 68, 68, 0.2); border-radius: 12px; color: #ef4444; display: flex; align-items: center; gap: 0.75rem; font-weight: 500;">
+    <i class="fas fa-circle-xmark" style="font-size: 1.1rem;"></i> Waduh, belum nemu kuliner yang cocok sama pencarian kamu nih. Coba pakai kata kunci lain ya!
+</div>"""
+
+CARD_HTML = """<div class="recommendation-card">
+    <div style="display:flex; justify-content:space-between; align-items:flex-start; margin-bottom:0.5rem;">
+        <h4 style="margin:0;"><i class="fas {icon_class}"></i> {nama}</h4>
+        <span class="card-match-badge">{similarity:.0f}% Match</span>
+    </div>
+    <p><i class="fas fa-map-marker-alt icon-fixed-width"></i> <strong>Alamat:</strong> {alamat}</p>
+    <p><i class="fas fa-tag icon-fixed-width"></i> <strong>Kategori:</strong> {kategori}</p>
+    <p><i class="fas fa-money-bill icon-fixed-width"></i> <strong>Harga:</strong> {range_harga} ({kategori_harga})</p>
+    <p><i class="fas fa-utensils icon-fixed-width"></i> <strong>Menu:</strong> {menu}</p>
+    <p><i class="fas fa-comments icon-fixed-width"></i> <strong>Deskripsi:</strong> {deskripsi}</p>
+    <div style="margin-top: 1rem;">
+        <div class="map-popup-trigger" data-modal-id="{modal_id}" data-embed-url="{embed_url}">
+            <i class="fas fa-location-dot"></i> Lihat Lokasi di Google Maps
+        </div>
+    </div>
+</div>
+<!-- Modal Popup -->
+<div id="{modal_id}" class="map-modal-overlay">
+    <div class="map-modal-content">
+        <div class="map-modal-header">
+            <div class="map-modal-title">
+                <i class="fas fa-map-location-dot"></i>
+                <span>Preview Lokasi</span>
+            </div>
+            <div class="map-modal-close" data-close-modal="{modal_id}" title="Tutup">
+                <i class="fas fa-times"></i>
+            </div>
+        </div>
+        <div class="map-preview-container">
+            <iframe id="map-iframe-{modal_id}" src="" frameborder="0" allowfullscreen></iframe>
+        </div>
+        <div class="map-modal-actions">
+            <a href="{maps_url}" target="_blank" class="map-modal-btn map-modal-btn-expand" style="text-decoration: none; color: white; display: flex; align-items: center; justify-content: center;">
+                <i class="fas fa-up-right-from-square"></i>
+                Expand Map
+            </a>
+            <div class="map-modal-btn map-modal-btn-close" data-close-modal="{modal_id}">
+                <i class="fas fa-xmark"></i>
+                Close
+            </div>
+        </div>
+    </div>
+</div>"""
+
+
+# ============================================================================
+# FUNGSI RENDER
+# ============================================================================
+
+@lru_cache(maxsize=256)
+def get_category_icon(category_name):
+    """Mengembalikan ikon Font Awesome berdasarkan kategori kuliner"""
+    cat_lower = str(category_name).lower()
+
+    icon_mapping = {
+        ('kopi', 'cafe', 'kafe', 'coffee'): "fa-mug-hot",
+        ('jepang', 'sushi', 'ramen', 'udon'): "fa-fish",
+        ('sunda', 'khas', 'tradisional'): "fa-leaf",
+        ('western', 'steak', 'burger', 'pizza', 'pasta'): "fa-burger",
+        ('roti', 'bakery', 'kue', 'cake', 'donat'): "fa-bread-slice",
+        ('ayam', 'bebek', 'geprek', 'fried chicken'): "fa-drumstick-bite",
+        ('mie', 'bakso', 'soto', 'sop', 'kuah'): "fa-bowl-food",
+        ('minuman', 'jus', 'thai tea', 'bobba'): "fa-glass-water",
+        ('nasi', 'padang', 'warteg'): "fa-utensils",
+        ('pedas', 'sambal'): "fa-fire",
+    }
+
+    for keywords, icon in icon_mapping.items():
+        if any(keyword in cat_lower for keyword in keywords):
+            return icon
+
+    return "fa-utensils"
+
+
+def render_card_html(row, modal_id):
+    """Membuat HTML satu kartu rekomendasi beserta modal Google Maps-nya.
+
+    Args:
+        row (namedtuple): Baris hasil `fetch_page(...).itertuples()`
+        modal_id (str): ID unik modal untuk kartu ini
+
+    Returns:
+        str: HTML kartu + modal
+    """
+    # Generate Google Maps URL
+    maps_query = urllib.parse.quote(f"{row.nama_rumah_makan} {row.alamat}")
+    maps_url = f"https://www.google.com/maps/search/?api=1&query={maps_query}"
+    # Gunakan URL embed legacy yang tidak memerlukan API Key
+    embed_url = f"https://maps.google.com/maps?q={maps_query}&t=&z=15&ie=UTF8&iwloc=&output=embed"
+
+    return CARD_HTML.format(
+        icon_class=get_category_icon(row.kategori),
+        nama=row.nama_rumah_makan,
+        similarity=row.similarity_score * 100,
+        alamat=row.alamat,
+        kategori=row.kategori,
+        range_harga=row.range_harga,
+        kategori_harga=row.kategori_harga,
+        menu=row.menu,
+        deskripsi=row.deskripsi,
+        modal_id=modal_id,
+        embed_url=embed_url,
+        maps_url=maps_url,
+    )
+
+
+# ============================================================================
+# RENDER PER GILIRAN (CACHE DI RIWAYAT CHAT)
+# ============================================================================
+
+BLOCK_END_HTML = "\n</div>"
+
+
+def _render_cards(engine, turn, start, stop):
+    """HTML kartu ke-`start` sampai sebelum `stop` (kolom tampilan diambil dari engine)"""
+    page = engine.fetch_page(turn.to_result(), start, stop - start)
+    return [
+        render_card_html(row, f"map-modal-{turn.turn_id}-{row_label}")
+        for row_label, row in zip(page.index, page.itertuples(index=False))
+    ]
+
+
+def render_turn(engine, history, turn, with_separator=False):
+    """Membuat satu blok HTML gabungan (pemisah, header, warning, kartu) untuk satu giliran.
+
+    Blok gabungan di-cache di giliran itu sendiri (`ChatTurn.rendered`), sehingga ikut
+    dihitung dalam batas memori riwayat dan ikut dibuang saat giliran di-evict. Pada
+    rerun, hanya kartu yang baru ditampilkan (giliran baru atau setelah klik "Lebih
+    Banyak") yang diambil dari engine dan disisipkan ke blok yang sudah ada.
+
+    Args:
+        engine (ChatbotEngine): Engine bersama untuk mengambil kolom tampilan
+        history (ChatHistory): Riwayat chat pemilik giliran (untuk hitungan memori cache)
+        turn (ChatTurn): Giliran dari riwayat chat
+        with_separator (bool): Tambahkan pemisah "Pencarian Baru" di atas blok
+
+    Returns:
+        str: HTML siap dikirim lewat satu st.markdown
+    """
+    visible = min(turn.display_count, len(turn))
+    if turn.rendered is not None:
+        card_count, had_separator, html = turn.rendered
+        if card_count == visible and had_separator == with_separator:
+            return html
+    else:
+        card_count, had_separator, html = None, with_separator, None
+
+    if html is None or card_count > visible:
+        parts = [SEPARATOR_HTML] if with_separator else []
+        parts.append(HEADER_HTML.format(query=turn.corrected_query or turn.query))
+        if turn.empty:
+            parts.append(NO_RESULT_HTML)
+        else:
+            if turn.warning:
+                parts.append(WARNING_HTML.format(warning=turn.warning))
+            parts.extend(_render_cards(engine, turn, 0, visible))
+        html = "\n".join(parts) + BLOCK_END_HTML
+    else:
+        # Pemisah hilang/muncul saat giliran sebelumnya di-evict; kartu lama tidak dirender ulang
+        if had_separator != with_separator:
+            html = SEPARATOR_HTML + "\n" + html if with_separator else html[len(SEPARATOR_HTML) + 1:]
+        if card_count < visible:
+            new_cards = _render_cards(engine, turn, card_count, visible)
+            html = html[:-len(BLOCK_END_HTML)] + "\n" + "\n".join(new_cards) + BLOCK_END_HTML
+
+    history.store_rendered(turn, visible, with_separator, html)
+    return html
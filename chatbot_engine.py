@@ -3,11 +3,36 @@
 # ============================================================================
 
 import re
+import threading
+import time
+from dataclasses import replace
+from functools import lru_cache
+import numpy as np
 import pandas as pd
+from scipy.sparse import csr_matrix
 from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from compact_store import CompressedText, compact_columns
+from concurrency import QueryGate
+from attribute_index import (
+    ATTRIBUTE_COLUMNS, ATTRIBUTE_WRAPPER_PATTERN, EMPTY_ATTRIBUTE_VALUES, AttributeIndex,
+)
+from autocomplete import MIN_MENU_FREQUENCY, AutocompleteIndex
+from dataset_statistics import compute_statistics
+from facet_index import BrowseResult, FacetIndex
+from location_index import ADDRESS_ABBREVIATIONS, DISTRICT_ADJACENCY, NEARBY_TERMS, LocationIndex
+from price_index import PRICE_UNITS, PriceIndex, parse_price_query
+from profiling import QueryProfiler
+from query_cache import LRUCache, ParsedQuery
 from preprocessing import TextPreprocessor
+from ranking_plan import DEFAULT_PLAN_PATH, RankingContext, RankingPlan
+from recommendation_result import DISPLAY_COLUMNS, RecommendationResult
+from shared_index import SharedIndex, dataset_fingerprint
+from trigram_index import TrigramIndex
+from retrieval import (
+    BM25_B, BM25_K1, LSA_BLEND_WEIGHT, LSA_COMPONENTS, RETRIEVAL_MODES,
+    BlendedScorer, Bm25Scorer, CandidateScores, LsaScorer, TfidfScorer, prepare_document_matrix,
+)
+from vectorization import VectorizerConfig
 from difflib import get_close_matches
 
 
@@ -132,6 +157,22 @@ LOCATION_EXPANSION = {
     'ujungberung': ['ujung berung', 'ujungberung', 'pasir endah']
 }
 
+# Bonus kecil untuk restoran yang lebih murah di dalam budget numerik: memutus skor
+# seri (e.g., query yang hanya berisi budget) tanpa mengubah urutan skor yang berbeda nyata
+PRICE_TIE_BREAK = 1e-6
+
+# Jumlah kata typo unik yang hasil koreksinya di-cache
+CORRECTION_CACHE_SIZE = 4096
+
+# Jumlah teks query unik yang hasil parsing-nya di-cache
+PARSE_CACHE_SIZE = 1024
+
+# Jumlah query terpopuler yang diputar ulang saat warm-up
+WARM_UP_QUERIES = 50
+
+# Kolom metadata yang hanya dibutuhkan untuk membangun index (dilepas pada mode lean memory)
+BUILD_ONLY_COLUMNS = ('metadata_tfidf', 'metadata_tfidf_processed', 'metadata_tfidf_original')
+
 
 # ============================================================================
 # KELAS MESIN CHATBOT
@@ -150,22 +191,109 @@ class ChatbotEngine:
     - Location Filtering: Boost restoran di area yang diminta user
     - Warning System: Mendeteksi konflik semantik dan mismatch filter
     
+    Thread Safety:
+    Satu instance aman dipakai bersamaan oleh banyak thread (e.g., semua session
+    Streamlit). Jalur baca (`recommend`, `get_recommendations`, `fetch_page`,
+    `browse`) tidak mengubah state bersama: state per query ada di RankingContext,
+    buffer skor TF-IDF bersifat per thread, dan seluruh array index statis dibuat
+    read-only setelah load. Perubahan runtime (`set_ranking_weights`,
+    `reload_ranking_plan`, index LSA/BM25 yang dibangun lazy) menyiapkan objek baru
+    lalu mengganti referensinya sekaligus di bawah lock, sehingga query yang sedang
+    berjalan tetap memakai versi lama secara utuh. Jumlah query yang berjalan
+    bersamaan bisa dibatasi dengan `max_concurrent_queries`.
+    
     Attributes:
         df (DataFrame): Dataset restoran yang sudah dimuat
         preprocessor (TextPreprocessor): Instance untuk text preprocessing
-        vectorizer (TfidfVectorizer): Model TF-IDF untuk similarity calculation
+        vectorizer: Model TF-IDF untuk similarity calculation (fitted atau hashing)
+        vectorizer_config (VectorizerConfig): Pengaturan vektorisasi yang dipakai
         tfidf_matrix (sparse matrix): Matrix TF-IDF dari seluruh dataset
         vocabulary (set): Kumpulan kata unik dari dataset (untuk autocorrect)
         priority_vocabulary (set): Kata kunci prioritas (kategori, menu populer, lokasi)
+        scorers (dict): Scorer tahap pertama per retrieval mode ('tfidf', 'lsa', 'blend', 'bm25')
+        ranking_plan (CompiledRankingPlan): Tahap & bobot ranking dari config/ranking_plan.json
+        statistics (DatasetStatistics): Snapshot statistik dataset (dihitung sekali saat load)
+        query_gate (QueryGate): Pembatas query bersamaan (None jika tidak dibatasi)
+        query_log (QueryLog): Log frekuensi query anonim untuk warm-up (None jika tidak dicatat)
+        result_cache (LRUCache): Cache hasil `recommend` per versi ranking plan (None jika nonaktif)
+        parse_cache (LRUCache): Cache ParsedQuery per teks query (None jika nonaktif)
+        profiler (QueryProfiler): Perekam profil query (None = profil hanya lewat `profile=True`)
+        lean_memory (bool): Kolom metadata build-only sudah dilepas dari `df`
     """
     
-    def __init__(self, csv_path):
-        """Inisialisasi chatbot dengan memuat data dan membuat TF-IDF matrix"""
+    def __init__(self, csv_path, ranking_plan_path=None, retrieval_mode='tfidf', lsa_components=LSA_COMPONENTS,
+                 vectorizer_config=None, preprocessor=None, shared_index_dir=None,
+                 max_concurrent_queries=None, gate_timeout=None, query_log=None, result_cache_size=0,
+                 parse_cache_size=PARSE_CACHE_SIZE, profiler=None, lean_memory=False):
+        """Inisialisasi chatbot dengan memuat data dan membuat TF-IDF matrix.
+        
+        Args:
+            csv_path (str): Path dataset CSV
+            ranking_plan_path (str, optional): Path konfigurasi ranking plan
+            retrieval_mode (str, optional): Scorer tahap pertama default ('tfidf', 'lsa', 'blend', 'bm25')
+            lsa_components (int, optional): Dimensi ruang laten LSA
+            vectorizer_config (VectorizerConfig, optional): Mode vectorizer, n-gram & budget fitur
+                (default: mode 'fitted', n-gram (1, 2), 1000 fitur)
+            preprocessor (TextPreprocessor, optional): Preprocessor bersama (stemmer, cache stem,
+                stopwords), e.g. dari EngineRegistry; default membuat instance baru
+            shared_index_dir (str, optional): Folder index bersama. Array index yang immutable
+                ditulis sekali ke folder ini lalu dibuka memory-mapped (read-only), sehingga
+                beberapa proses di host yang sama berbagi page memori yang sama
+            max_concurrent_queries (int, optional): Batas query `recommend` yang berjalan
+                bersamaan (None = tanpa batas); query lain menunggu giliran
+            gate_timeout (float, optional): Batas waktu tunggu giliran (detik); lewat dari itu
+                query ditolak dengan QueryGateTimeout
+            query_log (QueryLog, optional): Log query anonim; setiap query `recommend` dicatat
+                dan query terpopuler diputar ulang oleh `warm_up`
+            result_cache_size (int, optional): Jumlah hasil `recommend` yang di-cache
+                (0 = nonaktif). Cache dikosongkan setiap kali ranking plan berubah
+            parse_cache_size (int, optional): Jumlah teks query yang hasil parsing-nya
+                (koreksi, normalisasi, ekspansi, filter, kategori, vektor TF-IDF) di-cache (0 = nonaktif)
+            profiler (QueryProfiler, optional): Profil cProfile/tracemalloc untuk query terpilih
+                (per panggilan dengan `profile=True`, atau sampling `sample_rate`)
+            lean_memory (bool, optional): Setelah index dibangun, kolom metadata build-only
+                dilepas dari `df` (teks untuk fallback search & BM25 disimpan terkompresi) dan
+                kolom tampilan yang banyak berulang disimpan sebagai categorical
+        """
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Retrieval mode harus salah satu dari {RETRIEVAL_MODES}!")
+        
+        self.retrieval_mode = retrieval_mode
+        self.lsa_components = lsa_components
+        self.vectorizer_config = vectorizer_config or VectorizerConfig()
+        self.query_gate = QueryGate(max_concurrent_queries, gate_timeout) if max_concurrent_queries else None
+        self._plan_lock = threading.Lock()
+        self._plan_revision = 0
+        self.query_log = query_log
+        self.result_cache = LRUCache(result_cache_size) if result_cache_size else None
+        self.parse_cache = LRUCache(parse_cache_size) if parse_cache_size else None
+        self.profiler = profiler
+        self.lean_memory = False
+        self._compressed_columns = {}
+        self._closest_word = lru_cache(maxsize=CORRECTION_CACHE_SIZE)(self._find_closest_word)
+        self._warm_up_options = None
+        self._warm_up_generation = 0
+        
         self.df = self._load_dataset(csv_path)
-        self.preprocessor = self._initialize_preprocessor()
+        self.preprocessor = preprocessor or self._initialize_preprocessor()
         self._preprocess_dataset()
         self._build_vocabulary()
-        self._create_tfidf_matrix()
+        
+        shared_index, shared_arrays = self._open_shared_index(csv_path, shared_index_dir)
+        if shared_arrays is not None:
+            self._load_shared_tfidf_matrix(shared_index, shared_arrays)
+        else:
+            self._create_tfidf_matrix()
+        
+        self._build_scorers()
+        self._build_search_columns()
+        if shared_index is not None:
+            self._attach_shared_index(shared_index, shared_arrays)
+        self._freeze_index_arrays()
+        self._load_ranking_plan(ranking_plan_path)
+        self.statistics = compute_statistics(self.df)
+        if lean_memory:
+            self._release_build_columns()
         
         print(f"[SUCCESS] Chatbot Engine berhasil dimuat!")
         print(f"[INFO] Total UMKM: {len(self.df)}")
@@ -219,6 +347,44 @@ class ChatbotEngine:
         except Exception as e:
             raise Exception(f"Error preprocessing dataset: {str(e)}")
     
+    def _release_build_columns(self):
+        """Mode lean memory: melepas kolom metadata build-only dan meringkas kolom tampilan.
+        
+        Teks yang masih dibutuhkan jalur jarang (fallback search, BM25 lazy) disimpan
+        sebagai CompressedText; urutan baris tidak berubah sehingga row_ids tetap valid.
+        """
+        try:
+            before = int(self.df.memory_usage(deep=True).sum())
+            self._compressed_columns = {
+                'metadata_tfidf': CompressedText(self.df['metadata_tfidf'].str.lower()),
+                'metadata_tfidf_processed': CompressedText(self.df['metadata_tfidf_processed']),
+            }
+            self.df = self.df.drop(columns=[column for column in BUILD_ONLY_COLUMNS if column in self.df.columns])
+            categorical = compact_columns(self.df)
+            self.lean_memory = True
+            
+            after = int(self.df.memory_usage(deep=True).sum())
+            compressed = sum(column.nbytes for column in self._compressed_columns.values())
+            print(f"[INFO] Mode lean memory: DataFrame {before / 1024:.0f} KB -> {after / 1024:.0f} KB "
+                  f"(+{compressed / 1024:.0f} KB teks terkompresi, {len(categorical)} kolom categorical)")
+            
+        except Exception as e:
+            raise Exception(f"Error melepas kolom build-only: {str(e)}")
+    
+    def _metadata_values(self, column, row_ids=None):
+        """Nilai kolom metadata sebagai list (dari DataFrame, atau didekompresi pada mode lean memory).
+        
+        Jika `row_ids` diisi, hanya baris tersebut yang diambil dan hasilnya berupa
+        iterable lazy (blok terkompresi baru didekompresi saat barisnya dibaca).
+        """
+        if column in self._compressed_columns:
+            if row_ids is None:
+                return self._compressed_columns[column].values()
+            return self._compressed_columns[column].iter_rows(row_ids)
+        if row_ids is None:
+            return self.df[column].tolist()
+        return self.df[column].values[row_ids]
+    
     def _build_vocabulary(self):
         """Membangun vocabulary untuk koreksi typo"""
         try:
@@ -286,17 +452,13 @@ class ChatbotEngine:
             raise Exception(f"Error building vocabulary: {str(e)}")
     
     def _create_tfidf_matrix(self):
-        """Membuat TF-IDF matrix"""
+        """Membuat TF-IDF matrix (CSR float32, baris ternormalisasi L2)"""
         try:
-            print("[INFO] Membuat TF-IDF matrix...")
-            self.vectorizer = TfidfVectorizer(
-                max_features=1000,
-                ngram_range=(1, 2),
-                min_df=1,
-                max_df=0.8
-            )
+            print(f"[INFO] Membuat TF-IDF matrix ({self.vectorizer_config.describe()})...")
+            self.vectorizer = self.vectorizer_config.build()
             
-            self.tfidf_matrix = self.vectorizer.fit_transform(self.df['metadata_tfidf_processed'])
+            # Disimpan sebagai CSR float32 ternormalisasi L2 (siap untuk dot product langsung)
+            self.tfidf_matrix = prepare_document_matrix(self.vectorizer.fit_transform(self.df['metadata_tfidf_processed']))
             
             if self.tfidf_matrix.shape[0] == 0:
                 raise ValueError("TF-IDF matrix kosong!")
@@ -304,6 +466,412 @@ class ChatbotEngine:
         except Exception as e:
             raise Exception(f"Error membuat TF-IDF matrix: {str(e)}")
     
+    # ========================================================================
+    # INDEX BERSAMA (MEMORY-MAPPED)
+    # ========================================================================
+    
+    def _open_shared_index(self, csv_path, shared_index_dir):
+        """Membuka index bersama untuk versi dataset ini (jika sudah pernah ditulis).
+        
+        Returns:
+            tuple: (SharedIndex atau None, (arrays, groups, metadata) atau None)
+        """
+        if not shared_index_dir:
+            return None, None
+        
+        try:
+            fingerprint = dataset_fingerprint(csv_path, self.vectorizer_config, self._index_build_params())
+            shared_index = SharedIndex(shared_index_dir, fingerprint)
+            if not shared_index.exists():
+                print(f"[INFO] Index bersama belum ada di {shared_index.path}, akan dibangun.")
+                return shared_index, None
+            
+            print(f"[INFO] Membuka index bersama (memory-mapped) dari {shared_index.path}")
+            return shared_index, shared_index.load()
+            
+        except Exception as e:
+            raise Exception(f"Error membuka index bersama: {str(e)}")
+    
+    def _index_build_params(self):
+        """Parameter & leksikon yang ikut menentukan isi array index bersama (bagian dari fingerprint)"""
+        return {
+            'lsa_components': self.lsa_components,
+            'bm25': [BM25_K1, BM25_B],
+            'location_expansion': LOCATION_EXPANSION,
+            'district_adjacency': DISTRICT_ADJACENCY,
+            'address_abbreviations': ADDRESS_ABBREVIATIONS,
+            'attribute_columns': ATTRIBUTE_COLUMNS,
+            'empty_attribute_values': EMPTY_ATTRIBUTE_VALUES,
+            'attribute_wrapper': ATTRIBUTE_WRAPPER_PATTERN.pattern,
+            'price_units': PRICE_UNITS,
+        }
+    
+    def _load_shared_tfidf_matrix(self, shared_index, shared_arrays):
+        """Vectorizer hasil fit + matrix TF-IDF yang array-nya memory-mapped (tanpa fit ulang)"""
+        try:
+            arrays, _, metadata = shared_arrays
+            self.vectorizer = shared_index.load_vectorizer()
+            self.tfidf_matrix = csr_matrix(
+                (arrays['tfidf.data'], arrays['tfidf.indices'], arrays['tfidf.indptr']),
+                shape=tuple(metadata['tfidf_shape']), copy=False,
+            )
+        except Exception as e:
+            raise Exception(f"Error memuat TF-IDF matrix dari index bersama: {str(e)}")
+    
+    def _shared_array_slots(self):
+        """(nama, objek pemilik, atribut) untuk setiap array index immutable yang dibagikan"""
+        slots = [
+            ('tfidf.data', self.tfidf_matrix, 'data'),
+            ('tfidf.indices', self.tfidf_matrix, 'indices'),
+            ('tfidf.indptr', self.tfidf_matrix, 'indptr'),
+            ('cafe_group_mask', self, 'cafe_group_mask'),
+            ('cafe_fallback_mask', self, 'cafe_fallback_mask'),
+            ('location.district_codes', self.location_index, 'district_codes'),
+            ('location.village_codes', self.location_index, 'village_codes'),
+            ('location.street_codes', self.location_index, 'street_codes'),
+            ('attribute.codes', self.attribute_index, 'codes'),
+            ('facet.all_rows', self.facet_index, '_all_rows'),
+            ('content_trigrams.indptr', self.content_trigrams, 'indptr'),
+            ('content_trigrams.postings', self.content_trigrams, 'postings'),
+            ('metadata_trigrams.indptr', self.metadata_trigrams, 'indptr'),
+            ('metadata_trigrams.postings', self.metadata_trigrams, 'postings'),
+        ]
+        slots += [
+            (f'price.{attr}', self.price_index, attr)
+            for attr in ('min_prices', 'max_prices', 'min_order', 'max_order', 'sorted_min', 'sorted_max')
+        ]
+        slots += [(f'facet.{name}', facet, 'bitsets') for name, facet in self.facet_index.facets.items()]
+        
+        # Index LSA/BM25 hanya ikut jika sudah dibangun saat init (sesuai retrieval mode)
+        for mode, attrs in (('lsa', ('components', 'doc_vectors')), ('bm25', ('indptr', 'postings', 'weights'))):
+            if mode in self.scorers:
+                slots += [(f'{mode}.{attr}', self.scorers[mode], attr) for attr in attrs]
+        return slots
+    
+    def _shared_group_slots(self):
+        """(nama, objek pemilik, atribut) untuk dict key -> array (mask per kategori, index token, ...)"""
+        return [
+            ('category_masks', self, 'category_masks'),
+            ('tipe_masks', self, 'tipe_masks'),
+            ('price_category_masks', self, 'price_category_masks'),
+            ('location.district_masks', self.location_index, '_district_masks'),
+            ('location.nearby_masks', self.location_index, '_nearby_masks'),
+        ]
+    
+    def _attach_shared_index(self, shared_index, shared_arrays):
+        """Menulis index bersama (jika belum ada), lalu mengganti array milik engine dengan versi memory-mapped.
+        
+        Array hasil build di proses ini dilepas setelah diganti, sehingga memori
+        privat engine tinggal DataFrame, leksikon Python, dan state query. Index
+        bersama yang shape/dtype/key-nya tidak cocok dengan hasil build (e.g., ditulis
+        versi kode lama) dihapus lalu ditulis ulang dari array proses ini.
+        """
+        try:
+            if shared_arrays is not None:
+                stale = self._shared_index_mismatch(shared_arrays)
+                if stale is not None:
+                    print(f"[WARNING] Index bersama {shared_index.path} tidak cocok ({stale}), dibangun ulang.")
+                    shared_index.remove()
+                    shared_arrays = None
+            
+            if shared_arrays is None:
+                shared_index.write(
+                    {name: getattr(owner, attr) for name, owner, attr in self._shared_array_slots()},
+                    {name: getattr(owner, attr) for name, owner, attr in self._shared_group_slots()},
+                    self.vectorizer,
+                    metadata={'tfidf_shape': list(self.tfidf_matrix.shape)},
+                )
+                print(f"[INFO] Index bersama ditulis ke {shared_index.path}")
+                shared_arrays = shared_index.load()
+            
+            stale = self._shared_index_mismatch(shared_arrays)
+            if stale is not None:
+                raise ValueError(f"Index bersama {shared_index.path} tidak cocok ({stale}) setelah dibangun ulang")
+            
+            arrays, groups, _ = shared_arrays
+            for name, owner, attr in self._shared_array_slots():
+                if name in arrays:
+                    setattr(owner, attr, arrays[name])
+            
+            for name, owner, attr in self._shared_group_slots():
+                if name in groups:
+                    setattr(owner, attr, groups[name])
+                    
+        except Exception as e:
+            raise Exception(f"Error memasang index bersama: {str(e)}")
+    
+    def _shared_index_mismatch(self, shared_arrays):
+        """Slot index bersama yang shape/dtype/key-nya berbeda dengan hasil build proses ini (atau None)"""
+        arrays, groups, _ = shared_arrays
+        for name, owner, attr in self._shared_array_slots():
+            array = getattr(owner, attr)
+            if name in arrays and (arrays[name].shape != array.shape or arrays[name].dtype != array.dtype):
+                return f"array '{name}'"
+        for name, owner, attr in self._shared_group_slots():
+            if name in groups and groups[name].keys() != getattr(owner, attr).keys():
+                return f"key '{name}'"
+        return None
+    
+    def _freeze_index_arrays(self):
+        """Membuat seluruh array index statis read-only (penulisan tak sengaja saat query langsung error)"""
+        for _, owner, attr in self._shared_array_slots():
+            getattr(owner, attr).setflags(write=False)
+        for _, owner, attr in self._shared_group_slots():
+            for array in getattr(owner, attr).values():
+                array.setflags(write=False)
+    
+    def _build_scorers(self):
+        """Menyiapkan scorer tahap pertama (LSA/BM25 hanya dibangun jika mode default membutuhkannya)"""
+        self._scorer_lock = threading.Lock()
+        self.scorers = {'tfidf': TfidfScorer(self.vectorizer, self.tfidf_matrix)}
+        
+        if self.retrieval_mode in ('lsa', 'blend'):
+            self.build_lsa_index()
+        elif self.retrieval_mode == 'bm25':
+            self.build_bm25_index()
+    
+    def build_lsa_index(self, n_components=None, lsa_weight=LSA_BLEND_WEIGHT):
+        """Membangun index LSA (truncated SVD dari matrix TF-IDF) dan scorer blend-nya.
+        
+        Args:
+            n_components (int, optional): Dimensi ruang laten (default: `lsa_components` engine)
+            lsa_weight (float, optional): Porsi skor LSA pada mode 'blend'
+        """
+        try:
+            print("[INFO] Membangun index LSA (truncated SVD)...")
+            lsa_scorer = LsaScorer(self.scorers['tfidf'], n_components or self.lsa_components)
+            blended_scorer = BlendedScorer(self.scorers['tfidf'], lsa_scorer, lsa_weight)
+            
+            self.scorers = dict(self.scorers, lsa=lsa_scorer, blend=blended_scorer)
+            print(f"[INFO] LSA: {lsa_scorer.n_components} dimensi, explained variance {lsa_scorer.explained_variance:.1%}")
+            
+        except Exception as e:
+            raise Exception(f"Error membangun index LSA: {str(e)}")
+    
+    def build_bm25_index(self):
+        """Membangun inverted index BM25 dari metadata yang sudah dipreprocess"""
+        try:
+            print("[INFO] Membangun inverted index BM25...")
+            bm25_scorer = Bm25Scorer(self._metadata_values('metadata_tfidf_processed'))
+            
+            self.scorers = dict(self.scorers, bm25=bm25_scorer)
+            print(f"[INFO] BM25: {len(bm25_scorer.vocabulary)} term, {len(bm25_scorer.postings)} posting")
+            
+        except Exception as e:
+            raise Exception(f"Error membangun index BM25: {str(e)}")
+    
+    def _get_scorer(self, retrieval_mode=None):
+        """Mengambil scorer tahap pertama; index LSA/BM25 dibangun saat pertama kali diminta"""
+        mode = retrieval_mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Retrieval mode harus salah satu dari {RETRIEVAL_MODES}!")
+        
+        if mode not in self.scorers:
+            with self._scorer_lock:
+                if mode not in self.scorers:
+                    if mode == 'bm25':
+                        self.build_bm25_index()
+                    else:
+                        self.build_lsa_index()
+        
+        return self.scorers[mode]
+    
+    def _build_search_columns(self):
+        """Menyiapkan kolom lowercase dan mask statis yang dipakai ulang setiap query.
+        
+        Kolom teks (nama, menu, alamat) di-lowercase sekali saat load sehingga
+        tahap scoring dan warning tidak perlu mengulang `.astype(str).str.lower()`.
+        Mask yang hanya bergantung pada dataset (kategori, tipe pengunjung, kategori
+        harga), index lokasi terkode, index harga numerik, dan index nama restoran
+        juga dihitung sekali di sini.
+        """
+        try:
+            self.lower_columns = {
+                column: self.df[column].astype(str).str.lower()
+                for column in ['nama_rumah_makan', 'menu', 'alamat']
+            }
+            self.empty_mask = np.zeros(len(self.df), dtype=bool)
+            
+            # Mask kategori (Strict Mode & Perfect Match)
+            kategori_lower = self.df['kategori'].astype(str).str.lower()
+            all_categories = set(str(cat).lower() for cat in self.df['kategori'].dropna().unique())
+            self.sorted_categories = sorted(all_categories, key=lambda c: (-len(c), c))
+            self.category_masks = {cat: (kategori_lower == cat).values for cat in all_categories}
+            self.cafe_group_mask = kategori_lower.str.contains('kopi|cafe|kafe|coffee|dessert', na=False, regex=True).values
+            self.cafe_fallback_mask = kategori_lower.str.contains('kopi|cafe|kafe|coffee', na=False, regex=True).values
+            
+            # Fasilitas, suasana & tipe pengunjung sebagai satu kolom integer bit-packed
+            self.attribute_index = AttributeIndex(self.df)
+            
+            # Mask tipe pengunjung (satu AND terhadap kolom bit atribut)
+            all_tipe_pengunjung = [t for t in self.attribute_index.values.get('tipe_pengunjung', []) if len(t) >= 4]
+            self.sorted_tipe_pengunjung = sorted(all_tipe_pengunjung, key=lambda t: (-len(t), t))
+            self.tipe_masks = {
+                tipe: self.attribute_index.mask_any(self.attribute_index.bit('tipe_pengunjung', tipe))
+                for tipe in all_tipe_pengunjung
+            }
+            
+            # Mask kategori harga & kolom harga numerik dari range_harga (filter budget)
+            kategori_harga_lower = self.df['kategori_harga'].astype(str).str.lower()
+            self.price_category_masks = {
+                label: kategori_harga_lower.str.contains(label.lower(), na=False, regex=False).values
+                for label in ('Murah', 'Sedang', 'Mahal')
+            }
+            self.price_index = PriceIndex(self.df['range_harga'])
+            
+            # Kecamatan & kelurahan terkode + graf ketetanggaan (filter lokasi)
+            self.location_index = LocationIndex(self.df['alamat'], LOCATION_EXPANSION)
+            self.location_filter_keys = set(LOCATION_EXPANSION) | set(self.location_index.district_keys)
+            
+            # Keyword filter tambahan (lokasi, suasana, fasilitas) untuk _extract_filters
+            self.filter_keywords = self._build_filter_keywords()
+            
+            # Index nama restoran (Exact Name Matching)
+            self.normalized_names = self.df['nama_rumah_makan'].apply(self._normalize_name)
+            self.name_index = {}
+            for row_id, name in enumerate(self.normalized_names.values):
+                self.name_index.setdefault(name, []).append(row_id)
+            self.raw_name_set = set(self.df['nama_rumah_makan'].apply(self._normalize_raw_text))
+            
+            # Index trigram karakter untuk pencarian substring (nama/menu & fallback metadata),
+            # juga sumber kandidat content boost
+            self.content_trigrams = TrigramIndex(
+                f"{name}\n{menu}" for name, menu in zip(self.lower_columns['nama_rumah_makan'].values, self.lower_columns['menu'].values)
+            )
+            self.metadata_trigrams = TrigramIndex(self.df['metadata_tfidf'].str.lower().values)
+            
+            # Bitset facet untuk browse (kategori, harga, kecamatan, fasilitas)
+            self.facet_index = self._build_facet_index()
+            
+            # Array key terurut untuk typeahead (nama, menu, kategori, lokasi, sinonim)
+            self.autocomplete_index = self._build_autocomplete_index()
+                
+        except Exception as e:
+            raise Exception(f"Error menyiapkan kolom pencarian: {str(e)}")
+    
+    def _build_facet_index(self):
+        """Bitset per nilai facet dari mask statis yang sudah dihitung"""
+        facet_index = FacetIndex(len(self.df))
+        
+        categories = sorted(str(cat) for cat in self.df['kategori'].dropna().unique())
+        facet_index.add('kategori', categories, [self.category_masks[cat.lower()] for cat in categories])
+        
+        facet_index.add('harga', list(self.price_category_masks), list(self.price_category_masks.values()))
+        
+        districts = [key for key in self.location_index.district_keys if self.location_index.district_mask(key).any()]
+        facet_index.add(
+            'kecamatan',
+            [self.location_index.district_names[key] for key in districts],
+            [self.location_index.district_mask(key) for key in districts],
+        )
+        
+        facilities = self.attribute_index.values.get('fasilitas', [])
+        facet_index.add(
+            'fasilitas',
+            [facility.title() for facility in facilities],
+            [self.attribute_index.mask_any(self.attribute_index.bit('fasilitas', facility)) for facility in facilities],
+            match_all=True,
+        )
+        return facet_index
+    
+    def _build_autocomplete_index(self):
+        """Entri autocomplete beserta frekuensinya di dataset"""
+        entries = []
+        
+        name_counts = Counter(self.normalized_names.values)
+        for name, normalized in zip(self.df['nama_rumah_makan'].astype(str).values, self.normalized_names.values):
+            entries.append((name, 'nama', name_counts[normalized], True))
+        
+        menu_counts = Counter()
+        menu_labels = {}
+        for menu in self.df['menu'].dropna().astype(str).values:
+            items = {item.strip().lower(): item.strip() for item in menu.split(',') if item.strip()}
+            menu_counts.update(items.keys())
+            for key, label in items.items():
+                menu_labels.setdefault(key, label)
+        entries.extend(
+            (menu_labels[key], 'menu', count, False)
+            for key, count in menu_counts.items() if count >= MIN_MENU_FREQUENCY
+        )
+        
+        for category, count in self.df['kategori'].dropna().astype(str).value_counts().items():
+            entries.append((category, 'kategori', count, False))
+        
+        for district, aliases in LOCATION_EXPANSION.items():
+            spaced = {alias.replace(' ', '') for alias in aliases if ' ' in alias}
+            for alias in aliases:
+                if ' ' not in alias and alias in spaced:
+                    continue
+                resolved = self.location_index.resolve(alias) or self.location_index.resolve(district)
+                entries.append((alias.title(), 'lokasi', int(resolved[0].sum()) if resolved else 0, False))
+        
+        for synonym, replacement in SYNONYM_MAP.items():
+            if replacement in self.category_masks:
+                count = int(self.category_masks[replacement].sum())
+            elif replacement in self.location_filter_keys:
+                continue
+            else:
+                count = int(self._name_menu_mask(replacement).sum())
+            if count:
+                entries.append((synonym, 'sinonim', count, False))
+        
+        return AutocompleteIndex(entries)
+    
+    def _load_ranking_plan(self, plan_path=None):
+        """Memuat ranking plan dari file konfigurasi dan meng-compile tahapnya"""
+        plan = RankingPlan.from_file(plan_path or DEFAULT_PLAN_PATH)
+        with self._plan_lock:
+            self._install_ranking_plan(plan)
+        print(f"[INFO] Ranking plan v{plan.version} dimuat ({len(plan.stages)} tahap)")
+    
+    def _install_ranking_plan(self, plan):
+        """Compile & pasang plan baru (dipanggil di bawah `_plan_lock`).
+        
+        Revisi plan selalu naik (versi plan dari file bisa kembali ke angka lama),
+        sehingga hasil yang di-cache dengan plan lama tidak pernah terpakai lagi.
+        """
+        self.ranking_plan = plan.compile(self._ranking_stage_functions())
+        self._plan_revision += 1
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    # ========================================================================
+    # KONFIGURASI RANKING (HOT-SWAP)
+    # ========================================================================
+    
+    def reload_ranking_plan(self, plan_path=None):
+        """Memuat ulang ranking plan dari file tanpa membangun ulang index TF-IDF.
+        
+        Args:
+            plan_path (str, optional): Path file JSON (default: config/ranking_plan.json)
+        """
+        self._load_ranking_plan(plan_path)
+        self._rewarm()
+    
+    def set_ranking_weights(self, overrides):
+        """Mengganti sebagian bobot ranking saat runtime.
+        
+        Plan baru di-compile terlebih dahulu lalu referensinya diganti sekaligus,
+        sehingga query yang sedang berjalan tetap memakai plan lama secara utuh.
+        
+        Args:
+            overrides (dict): Bobot pengganti, e.g. {'location': {'match': 20.0}}
+            
+        Returns:
+            dict: Seluruh bobot yang berlaku setelah penggantian
+        """
+        # Lock hanya untuk penulis: dua penggantian bersamaan tidak saling menimpa
+        with self._plan_lock:
+            plan = self.ranking_plan.plan.with_weights(overrides)
+            self._install_ranking_plan(plan)
+        print(f"[INFO] Bobot ranking diperbarui (plan v{plan.version})")
+        self._rewarm()
+        return plan.weights
+    
+    def get_ranking_weights(self):
+        """Mengembalikan salinan bobot ranking yang sedang aktif"""
+        return {stage: dict(values) for stage, values in self.ranking_plan.plan.weights.items()}
+    
     # ========================================================================
     # METODE PEMBANTU UNTUK PEMROSESAN QUERY
     # ========================================================================
@@ -312,10 +880,15 @@ class ChatbotEngine:
         """Normalisasi teks mentah untuk exact matching"""
         return str(text).lower().strip().replace("   ", " ").replace("  ", " ")
     
+    def _normalize_name(self, text):
+        """Normalisasi nama restoran untuk exact/fuzzy name matching"""
+        text = str(text).lower().strip()
+        text = re.sub(r'\s+', ' ', text)
+        return text.replace("`", "'")
+    
     def _check_exact_match(self, query):
         """Cek apakah query adalah exact match dengan nama restoran"""
-        normalized_query = self._normalize_raw_text(query)
-        return (self.df['nama_rumah_makan'].apply(self._normalize_raw_text) == normalized_query).any()
+        return self._normalize_raw_text(query) in self.raw_name_set
     
     def _apply_synonym_normalization(self, query):
         """Menerapkan normalisasi sinonim pada query.
@@ -355,23 +928,11 @@ class ChatbotEngine:
             if word in self.vocabulary:
                 corrected_words.append(word)
             else: # Removed 'elif word in COMMON_WORDS:'
-                threshold = 0.82 if len(word) > 4 else 0.70
-                matches = get_close_matches(word, self.vocabulary, n=3, cutoff=threshold)
-                
-                if matches:
-                    suggestion = matches[0]
-                    
-                    for match in matches:
-                        if match in self.priority_vocabulary:
-                            suggestion = match
-                            break
-                    
-                    corrected_words.append(suggestion)
-                    if word != suggestion:
-                        print(f"[INFO] Auto-correct: '{word}' -> '{suggestion}'")
-                        was_corrected = True
-                else:
-                    corrected_words.append(word)
+                suggestion = self._closest_word(word)
+                corrected_words.append(suggestion)
+                if word != suggestion:
+                    print(f"[INFO] Auto-correct: '{word}' -> '{suggestion}'")
+                    was_corrected = True
         
         if was_corrected:
             corrected_query = " ".join(corrected_words)
@@ -380,6 +941,23 @@ class ChatbotEngine:
         
         return query
     
+    def _find_closest_word(self, word):
+        """Kata vocabulary terdekat untuk `word` (atau `word` itu sendiri jika tidak ada).
+        
+        Dipanggil lewat `self._closest_word` (lru_cache per engine): pencarian fuzzy
+        ke seluruh vocabulary hanya dilakukan sekali per kata typo.
+        """
+        threshold = 0.82 if len(word) > 4 else 0.70
+        matches = get_close_matches(word, self.vocabulary, n=3, cutoff=threshold)
+        
+        if not matches:
+            return word
+        
+        for match in matches:
+            if match in self.priority_vocabulary:
+                return match
+        return matches[0]
+    
     def _apply_semantic_expansion(self, query, processed_query):
         """Menerapkan ekspansi semantik pada query.
         
@@ -407,6 +985,40 @@ class ChatbotEngine:
             return processed_query + " " + " ".join(expanded_terms)
         return processed_query
     
+    def _build_filter_keywords(self):
+        """Kumpulan keyword filter dari dataset (kata alamat, suasana, fasilitas), dihitung sekali saat load"""
+        additional_filters = set()
+        
+        alamat_words = ' '.join(self.df['alamat'].dropna().astype(str)).lower()
+        location_keywords = set([w for w in alamat_words.split() if len(w) >= 4 and w.isalpha()])
+        
+        ignore_location_terms = {
+            'cafe', 'dessert', 'chinese', 'food', 'japanese', 'korean', 
+            'western', 'middle', 'eastern', 'masakan', 'indonesia', 'aneka',
+            'chicken', 'kopi', 'coffee', 'latte', 'beef', 'bakar', 'ramen',
+            'tahu', 'sate', 'katsu', 'rice', 'steak', 'cheese', 'pizza',
+            'jalan', 'kota', 'bandung', 'kecamatan', 'kelurahan', 'nomor',
+            'utara', 'selatan', 'barat', 'timur', 'tengah', 'jawa'
+        }
+        location_keywords = location_keywords - ignore_location_terms
+        additional_filters.update(location_keywords)
+        additional_filters.update(LOCATION_EXPANSION.keys()) # Tambahkan manual keys agar buahbatu dll terdeteksi
+        
+        price_keywords = {'murah', 'mahal', 'sedang', 'terjangkau', 'hemat', 'premium', 'mewah', 'budget', 'promo'}
+        additional_filters.update(price_keywords)
+        
+        # Teks suasana & fasilitas diurai persis seperti sebelumnya (hanya dipindah ke waktu load)
+        for column in ('suasana', 'fasilitas'):
+            if column in self.df.columns:
+                column_words = ' '.join(self.df[column].dropna().astype(str)).lower()
+                additional_filters.update([w.strip() for w in column_words.split(',') if len(w.strip()) >= 4])
+        
+        additional_filters = {w.strip() for w in additional_filters 
+                             if len(w.strip()) >= 3 and w.strip() not in {'dan', 'yang', 'untuk', 'dari', 'dengan'}}
+        
+        price_terms = {'murah', 'mahal', 'sedang', 'terjangkau', 'ekonomis', 'hemat', 'premium', 'mewah', 'standar', 'menengah'}
+        return frozenset(additional_filters - price_terms)
+    
     def _extract_filters(self, query_normalized):
         """Ekstrak filter tambahan (lokasi, fasilitas, suasana) dari query.
         
@@ -420,53 +1032,14 @@ class ChatbotEngine:
         Returns:
             list: Daftar filter yang terdeteksi (e.g., ['buahbatu', 'parkiran'])
         """
-        additional_filters = set()
-        
-        try:
-            alamat_words = ' '.join(self.df['alamat'].dropna().astype(str)).lower()
-            location_keywords = set([w for w in alamat_words.split() if len(w) >= 4 and w.isalpha()])
-            
-            ignore_location_terms = {
-                'cafe', 'dessert', 'chinese', 'food', 'japanese', 'korean', 
-                'western', 'middle', 'eastern', 'masakan', 'indonesia', 'aneka',
-                'chicken', 'kopi', 'coffee', 'latte', 'beef', 'bakar', 'ramen',
-                'tahu', 'sate', 'katsu', 'rice', 'steak', 'cheese', 'pizza',
-                'jalan', 'kota', 'bandung', 'kecamatan', 'kelurahan', 'nomor',
-                'utara', 'selatan', 'barat', 'timur', 'tengah', 'jawa'
-            }
-            location_keywords = location_keywords - ignore_location_terms
-            additional_filters.update(location_keywords)
-            additional_filters.update(LOCATION_EXPANSION.keys()) # Tambahkan manual keys agar buahbatu dll terdeteksi
-        except:
-            pass
-        
-        price_keywords = {'murah', 'mahal', 'sedang', 'terjangkau', 'hemat', 'premium', 'mewah', 'budget', 'promo'}
-        additional_filters.update(price_keywords)
-        
-        try:
-            suasana_words = ' '.join(self.df['suasana'].dropna().astype(str)).lower()
-            additional_filters.update([w.strip() for w in suasana_words.split(',') if len(w.strip()) >= 4])
-        except:
-            pass
-        
-        try:
-            fasilitas_words = ' '.join(self.df['fasilitas'].dropna().astype(str)).lower()
-            additional_filters.update([w.strip() for w in fasilitas_words.split(',') if len(w.strip()) >= 4])
-        except:
-            pass
-        
-        additional_filters = {w.strip() for w in additional_filters 
-                             if len(w.strip()) >= 3 and w.strip() not in {'dan', 'yang', 'untuk', 'dari', 'dengan'}}
-        
-        price_terms = {'murah', 'mahal', 'sedang', 'terjangkau', 'ekonomis', 'hemat', 'premium', 'mewah', 'standar', 'menengah'}
-        additional_filters = additional_filters - price_terms
+        query_lower = query_normalized.lower()
         
-        # 1. Deteksi dari keyword hasil ekstraksi dataset
-        detected_raw = {kw for kw in additional_filters if kw in query_normalized.lower()}
+        # 1. Deteksi dari keyword hasil ekstraksi dataset (dihitung sekali saat load)
+        detected_raw = {kw for kw in self.filter_keywords if kw in query_lower}
         
-        # 2. FORCE CHECK: Cek semua lokasi manual (LOCATION_EXPANSION)
-        for loc_key in LOCATION_EXPANSION.keys():
-            if loc_key in query_normalized.lower():
+        # 2. FORCE CHECK: Cek semua lokasi manual (LOCATION_EXPANSION) & kecamatan di index lokasi
+        for loc_key in self.location_filter_keys:
+            if loc_key in query_lower:
                 detected_raw.add(loc_key)
         
         # 3. ALGORITMA "LONGEST MATCH WINS" (Pembersihan Filter)
@@ -491,7 +1064,176 @@ class ChatbotEngine:
     # METODE PEMBANTU UNTUK PENILAIAN SKOR
     # ========================================================================
     
-    def _apply_category_matching(self, similarity_scores, query_normalized, has_additional_filter):
+    def _ranking_stage_functions(self):
+        """Mapping nama tahap di ranking plan ke fungsi tahap milik engine"""
+        return {
+            'category': self._apply_category_matching,
+            'location': self._apply_location_boost,
+            'content': self._apply_content_boost,
+            'price': self._apply_price_boost,
+            'price_range': self._apply_price_range_filter,
+            'perfect_match': self._apply_perfect_match_boost,
+            'exact_name': self._apply_exact_name_matching,
+        }
+    
+    def _category_mask(self, category):
+        """Mask kategori yang sudah dihitung saat load (grup cafe digabung jadi satu)"""
+        if any(x in category for x in ['kopi', 'cafe', 'kafe', 'coffee', 'dessert']):
+            return self.cafe_group_mask
+        return self.category_masks.get(category, self.empty_mask)
+    
+    def _location_mask(self, context, flt):
+        """Mask alamat untuk satu filter lokasi, dihitung sekali per query.
+        
+        Kecamatan & kelurahan dicocokkan lewat kode di `location_index` (dengan
+        kecamatan tetangga untuk query "sekitar"/"dekat" atau kecamatan tanpa data).
+        Filter lain (e.g., nama jalan) tetap dicari di teks alamat.
+        """
+        def build():
+            resolved = self.location_index.resolve(flt, nearby=context.nearby)
+            if resolved is not None:
+                addr_mask, fallback = resolved
+                if fallback:
+                    context.location_fallbacks[flt] = fallback
+                return addr_mask
+            
+            return self.lower_columns['alamat'].str.contains(flt, na=False, regex=False).values
+        
+        return context.mask(('location', flt), build)
+    
+    def _price_mask(self, target_price):
+        """Mask kategori harga yang sudah dihitung saat load"""
+        return self.price_category_masks.get(target_price.title(), self.empty_mask)
+    
+    def _price_range_mask(self, context):
+        """Mask budget numerik dari query ("di bawah 30 ribu"), dihitung sekali per query.
+        
+        Jika tidak ada restoran yang range harganya utuh di dalam budget, dipakai
+        restoran yang range harganya beririsan dengan budget (lihat `_price_range_approximate`).
+        """
+        def build():
+            if self._price_range_approximate(context):
+                return self.price_index.mask(replace(context.price_range, around=True))
+            return self._price_range_exact_mask(context)
+        
+        return context.mask(('price_range', context.price_range), build)
+    
+    def _price_range_exact_mask(self, context):
+        return context.mask(('price_range_exact', context.price_range), lambda: self.price_index.mask(context.price_range))
+    
+    def _price_range_approximate(self, context):
+        """True jika tidak ada restoran yang utuh di dalam budget, sehingga mask budget memakai range yang mendekati"""
+        return not context.price_range.around and not self._price_range_exact_mask(context).any()
+    
+    def _detect_category(self, query_expanded):
+        """Mendeteksi kategori (atau tipe pengunjung jika tidak ada kategori) di query.
+        
+        Returns:
+            tuple: (kategori, tipe pengunjung), masing-masing None jika tidak terdeteksi
+        """
+        for category in self.sorted_categories:
+            if category in query_expanded:
+                print(f"[DEBUG] MATCHED CATEGORY: '{category}'")
+                return category, None
+        
+        for tipe in self.sorted_tipe_pengunjung:
+            if tipe in query_expanded:
+                print(f"[DEBUG] MATCHED TIPE: '{tipe}'")
+                return None, tipe
+        
+        return None, None
+    
+    def _select_candidates(self, context, first_stage, budget):
+        """Fase 1: memilih kandidat murah dari skor teks dan index statis.
+        
+        Kandidat adalah gabungan dari:
+        - `budget` dokumen dengan skor teks tertinggi (skor > 0)
+        - baris index nama yang persis sama dengan query
+        - `budget` baris teratas nama/menu yang memuat kata inti query (index trigram)
+        - `budget` baris teratas (menurut skor teks) dari index kategori/tipe
+          pengunjung yang terdeteksi, index setiap filter lokasi, index
+          kategori harga yang diminta, dan index budget numerik dari query
+          (skor seri, termasuk query yang hanya berisi budget, diambil dari
+          harga minimum termurah, sama seperti tie-break tahap price_range)
+        
+        Seluruh tahap ranking (fase 2) lalu hanya berjalan pada kandidat. Karena
+        setiap tahap bersifat per baris, hasil akhirnya sama dengan scoring penuh
+        selama kandidat mencakup top-k sebenarnya (termasuk jendela fuzzy match).
+        
+        Args:
+            context (RankingContext): Konteks query; `rows` & `scores` diisi di sini
+            first_stage (np.array or CandidateScores): Skor dari scorer tahap pertama
+            budget (int): Batas kandidat per sumber (0 = tanpa batas, scoring penuh)
+        """
+        if isinstance(first_stage, CandidateScores):
+            text_rows, text_scores = first_stage.row_ids, first_stage.scores
+            dense_scores = None
+        else:
+            dense_scores = first_stage
+            text_rows = np.flatnonzero(dense_scores > 0)
+            text_scores = dense_scores[text_rows]
+        
+        if budget <= 0:
+            # Tanpa batas: scorer dense menilai seluruh restoran, BM25 tetap memakai posting list
+            if dense_scores is None:
+                context.rows, context.scores = text_rows, text_scores
+            else:
+                context.rows, context.scores = None, dense_scores.astype(np.float64)
+            return
+        
+        if dense_scores is None:
+            dense_scores = first_stage.to_dense(len(self.df))
+        
+        sources = [text_rows[self._select_top(text_scores, budget)]]
+        
+        exact_ids = self.name_index.get(self._normalize_name(context.query))
+        if exact_ids:
+            sources.append(np.asarray(exact_ids))
+        
+        for word in set(self._content_core_words(context.query_normalized)):
+            token_rows = self._content_token_rows(word)
+            sources.append(token_rows[self._select_top(dense_scores[token_rows], budget)])
+        
+        pools = []
+        if context.detected_category:
+            pools.append(self._category_mask(context.detected_category))
+        elif context.detected_tipe:
+            pools.append(self.tipe_masks[context.detected_tipe])
+        elif 'cafe' in context.query_expanded:
+            pools.append(self.cafe_fallback_mask)
+        for flt in context.active_filters:
+            pools.append(self._location_mask(context, flt))
+        
+        target_price = self._price_target(*self._detect_price(context.query_normalized, context.price_filter))
+        if target_price:
+            pools.append(self._price_mask(target_price))
+        
+        for pool in pools:
+            pool_rows = np.flatnonzero(pool)
+            sources.append(pool_rows[self._select_top(dense_scores[pool_rows], budget)])
+        
+        if context.price_range is not None:
+            # Baris dalam urutan harga minimum naik: seri skor teks dipecah oleh harga termurah
+            price_order = self.price_index.min_order
+            range_rows = price_order[self._price_range_mask(context)[price_order]]
+            sources.append(range_rows[self._select_top(dense_scores[range_rows], budget)])
+        
+        rows = np.unique(np.concatenate(sources)).astype(np.int32)
+        # Salinan float64: skor tahap pertama bisa berupa buffer float32 milik scorer
+        context.rows, context.scores = rows, dense_scores[rows].astype(np.float64)
+    
+    def _content_token_rows(self, word):
+        """Baris yang token nama/menu-nya memuat `word` (setara substring pada content boost).
+        
+        Kata yang seluruhnya karakter \\w selalu berada di dalam satu token, sehingga
+        cukup dicari sebagai substring nama/menu lewat index trigram (kandidat dari
+        irisan posting list, lalu diverifikasi), tanpa memindai vocabulary token.
+        """
+        if not re.fullmatch(r'\w+', word):
+            return np.array([], dtype=np.int32)
+        return np.flatnonzero(self._name_menu_mask(word)).astype(np.int32)
+    
+    def _apply_category_matching(self, context, weights):
         """Menerapkan category matching logic dengan Strict Mode.
         
         Jika kategori makanan terdeteksi di query (e.g., 'japanese food', 'cafe & dessert'),
@@ -499,152 +1241,145 @@ class ChatbotEngine:
         yang akan direkomendasikan. Ini mencegah hasil yang tidak relevan.
         
         Args:
-            similarity_scores (np.array): Array skor similarity TF-IDF
-            query_normalized (str): Query yang sudah di-expand (mengandung kategori)
-            has_additional_filter (bool): Apakah ada filter lokasi/fasilitas aktif
+            context (RankingContext): Konteks query (memakai `detected_category`, `detected_tipe`,
+                `query_expanded` dan `active_filters`)
+            weights (dict): Bobot tahap 'category' dari ranking plan
             
         Returns:
-            tuple: (similarity_scores, matched_category, strict_mode_activated)
+            RankingContext: Konteks dengan `matched_category` dan `strict_mode` terisi
         """
-        all_categories = set(str(cat).lower() for cat in self.df['kategori'].dropna().unique())
-        all_tipe_pengunjung = set()
-        
-        for val in self.df['tipe_pengunjung'].dropna():
-            for item in str(val).split(','):
-                cleaned = item.strip().lower()
-                if len(cleaned) >= 4:
-                    all_tipe_pengunjung.add(cleaned)
-        
-        matched_category = None
-        sorted_categories = sorted(all_categories, key=len, reverse=True)
-        for category in sorted_categories:
-            if category in query_normalized:
-                matched_category = category
-                print(f"[DEBUG] MATCHED CATEGORY: '{category}'")
-                break
+        similarity_scores = context.scores
+        query_normalized = context.query_expanded
+        has_additional_filter = len(context.active_filters) > 0
         
-        matched_tipe_pengunjung = None
-        if not matched_category:
-            sorted_tipe = sorted(all_tipe_pengunjung, key=len, reverse=True)
-            for tipe in sorted_tipe:
-                if tipe in query_normalized:
-                    matched_tipe_pengunjung = tipe
-                    print(f"[DEBUG] MATCHED TIPE: '{tipe}'")
-                    break
+        matched_category = context.detected_category
+        matched_tipe_pengunjung = context.detected_tipe
         
         strict_mode_activated = False
         
         if matched_category:
             print(f"[STRICT MODE] Enforcing Category: '{matched_category}'")
-            
-            if any(x in matched_category for x in ['kopi', 'cafe', 'kafe', 'coffee', 'dessert']):
-                 category_mask = self.df['kategori'].astype(str).str.lower().str.contains(
-                    'kopi|cafe|kafe|coffee|dessert', na=False, regex=True
-                )
-            else:
-                category_mask = self.df['kategori'].astype(str).str.lower() == matched_category
+            category_mask = context.view(self._category_mask(matched_category))
                 
-            similarity_scores[~category_mask] = -1000.0
-            similarity_scores[category_mask] += 1.0
+            similarity_scores[~category_mask] = weights['excluded_score']
+            similarity_scores[category_mask] += weights['match']
             strict_mode_activated = True
             
         elif matched_tipe_pengunjung and not has_additional_filter:
             print(f"[STRICT MODE] Tipe: '{matched_tipe_pengunjung}'")
-            tipe_mask = self.df['tipe_pengunjung'].astype(str).str.lower().str.contains(
-                matched_tipe_pengunjung, na=False, regex=False
-            )
-            similarity_scores[~tipe_mask] = -1000.0
-            similarity_scores[tipe_mask] += 1.0
+            tipe_mask = context.view(self.tipe_masks[matched_tipe_pengunjung])
+            similarity_scores[~tipe_mask] = weights['excluded_score']
+            similarity_scores[tipe_mask] += weights['match']
             strict_mode_activated = True
         
         else:
             if matched_tipe_pengunjung:
-                tipe_mask = self.df['tipe_pengunjung'].astype(str).str.lower().str.contains(
-                    matched_tipe_pengunjung, na=False, regex=False
-                )
-                similarity_scores[tipe_mask] += 5.0
+                tipe_mask = context.view(self.tipe_masks[matched_tipe_pengunjung])
+                similarity_scores[tipe_mask] += weights['tipe_soft_match']
             
             elif 'cafe' in query_normalized:
                 print("[INFO] Cafe intent detected (manual fallback)")
-                category_mask = self.df['kategori'].astype(str).str.lower().str.contains(
-                    'kopi|cafe|kafe|coffee', na=False, regex=True
-                )
-                similarity_scores[~category_mask] = -1000.0
-                similarity_scores[category_mask] += 1.0
+                category_mask = context.view(self.cafe_fallback_mask)
+                similarity_scores[~category_mask] = weights['excluded_score']
+                similarity_scores[category_mask] += weights['match']
                 matched_category = 'cafe & dessert'
         
-        return similarity_scores, matched_category, strict_mode_activated
+        context.matched_category = matched_category
+        context.strict_mode = strict_mode_activated
+        return context
     
-    def _apply_location_boost(self, similarity_scores, active_filters):
-        """Menerapkan boost untuk lokasi"""
-        if len(active_filters) > 0:
-            for flt in active_filters:
-                search_terms = LOCATION_EXPANSION.get(flt, [flt])
-                
-                addr_mask = pd.Series([False] * len(self.df), index=self.df.index)
-                for term in search_terms:
-                    term_mask = self.df['alamat'].astype(str).str.lower().str.contains(term, na=False)
-                    addr_mask = addr_mask | term_mask
-                
-                similarity_scores[addr_mask] += 15.0
-                
-                if addr_mask.sum() > 0:
-                    similarity_scores[~addr_mask] -= 50.0
-                    print(f"[DEBUG] Applied Location Boost (+15.0) & Penalty (-50.0) for '{flt}' (Expanded: {search_terms})")
+    def _apply_location_boost(self, context, weights):
+        """Menerapkan boost untuk lokasi.
         
-        return similarity_scores
+        Mask alamat per filter disimpan di konteks agar bisa dipakai ulang oleh
+        perfect match dan tahap warning.
+        """
+        similarity_scores = context.scores
+        
+        for flt in context.active_filters:
+            full_mask = self._location_mask(context, flt)
+            addr_mask = context.view(full_mask)
+            similarity_scores[addr_mask] += weights['match']
+            
+            # Penalti hanya jika lokasi tersebut memang ada di dataset (bukan hanya di kandidat)
+            if full_mask.any():
+                similarity_scores[~addr_mask] += weights['mismatch']
+                print(f"[DEBUG] Applied Location Boost ({weights['match']:+}) & Penalty ({weights['mismatch']:+}) for '{flt}' (Nearby: {context.nearby}, Fallback: {context.location_fallbacks.get(flt, [])})")
+        
+        return context
     
-    def _apply_content_boost(self, similarity_scores, query_lower):
-        """Menerapkan boost untuk konten (nama/menu) berdasarkan keyword matching"""
+    def _content_core_words(self, query_normalized):
+        """Kata inti query untuk content boost (tanpa kata harga & stopword umum)"""
         price_terms = {'murah', 'mahal', 'sedang', 'terjangkau', 'hemat', 'premium', 'mewah', 'budget', 'promo', 'murmer'}
         common_stopwords = {'yang', 'dan', 'di', 'ke', 'dari', 'untuk', 'dengan', 'atau', 'ini', 'itu', 'makan', 'minum', 'tempat', 'warung', 'resto', 'kafe', 'cafe'}
         ignore_terms = price_terms | common_stopwords
         
-        core_words = [w for w in query_lower.split() if w not in ignore_terms and len(w) > 2]
+        return [w for w in query_normalized.split() if w not in ignore_terms and len(w) > 2]
+    
+    def _apply_content_boost(self, context, weights):
+        """Menerapkan boost untuk konten (nama/menu) berdasarkan keyword matching.
+        
+        Mask nama/menu per keyword disimpan di konteks agar bisa dipakai ulang oleh
+        tahap warning.
+        """
+        similarity_scores = context.scores
+        core_words = self._content_core_words(context.query_normalized)
         
         if core_words:
-            all_search_terms = set(core_words)
-            processed_concepts = set()
-            
             # Simple Keyword Boosting
-            for word in all_search_terms:
-                if word in processed_concepts:
-                    continue
-                
+            for word in set(core_words):
                 # Cek apakah ini lokasi (beri boost lebih kecil)
                 is_loc = word in LOCATION_EXPANSION or word in ['dago', 'braga', 'riau', 'juanda']
-                boost_val = 2.0 if is_loc else 10.0
+                boost_val = weights['location_keyword'] if is_loc else weights['keyword']
                 
-                safe_word = re.escape(word)
-                name_mask = self.df['nama_rumah_makan'].astype(str).str.lower().str.contains(safe_word, na=False)
-                menu_mask = self.df['menu'].astype(str).str.lower().str.contains(safe_word, na=False)
-                anywhere_mask = name_mask | menu_mask
-                
-                if anywhere_mask.any():
-                    similarity_scores[anywhere_mask] += boost_val
-                    processed_concepts.add(word)
+                similarity_scores[self._content_mask(context, word)] += boost_val
             
             # Phrase Boosting (Urutan Kata)
             if len(core_words) >= 2:
                 phrase = " ".join(core_words)
-                safe_phrase = re.escape(phrase)
-                
-                phrase_name_mask = self.df['nama_rumah_makan'].astype(str).str.lower().str.contains(safe_phrase, na=False)
-                phrase_menu_mask = self.df['menu'].astype(str).str.lower().str.contains(safe_phrase, na=False)
-                phrase_mask = phrase_name_mask | phrase_menu_mask
                 
                 # Bonus besar untuk frasa utuh
-                similarity_scores[phrase_mask] += 50.0
+                similarity_scores[self._content_mask(context, phrase)] += weights['phrase']
+        
+        return context
+    
+    def _name_menu_mask(self, term, rows=None):
+        """Mask baris yang nama atau menunya mengandung `term` (substring, lowercase).
         
-        return similarity_scores
+        Jika `rows` diisi, hanya baris tersebut yang dicek dan mask sejajar dengan `rows`.
+        """
+        if rows is not None:
+            names = self.lower_columns['nama_rumah_makan'].values[rows]
+            menus = self.lower_columns['menu'].values[rows]
+            return np.fromiter((term in name or term in menu for name, menu in zip(names, menus)), dtype=bool, count=len(rows))
+        
+        # Seluruh dataset: hanya kandidat dari index trigram yang dicek
+        candidates = self.content_trigrams.candidates(term)
+        if candidates is None:
+            name_mask = self.lower_columns['nama_rumah_makan'].str.contains(term, na=False, regex=False).values
+            menu_mask = self.lower_columns['menu'].str.contains(term, na=False, regex=False).values
+            return name_mask | menu_mask
+        
+        mask = np.zeros(len(self.df), dtype=bool)
+        if len(candidates):
+            mask[candidates] = self._name_menu_mask(term, candidates)
+        return mask
     
-    def _apply_price_boost(self, similarity_scores, query_lower, price_filter):
-        """Menerapkan boost untuk harga"""
-        BOOST_FACTOR = 15.0
+    def _content_mask(self, context, term):
+        """Mask nama/menu untuk `term` yang sejajar dengan `context.scores`.
         
-        is_murah = any(k in query_lower for k in ['murah', 'terjangkau', 'hemat', 'low budget'])
-        is_sedang = any(k in query_lower for k in ['sedang', 'standar', 'menengah', 'reasonable'])
-        is_mahal = any(k in query_lower for k in ['mahal', 'premium', 'mewah', 'fancy'])
+        Pada fase kandidat hanya baris kandidat yang dicek, dan mask-nya disimpan
+        dengan key terpisah agar tidak tertukar dengan mask seluruh dataset.
+        """
+        if context.rows is None:
+            return context.mask(('content', term), lambda: self._name_menu_mask(term))
+        return context.mask(('candidate_content', term), lambda: self._name_menu_mask(term, context.rows))
+    
+    def _detect_price(self, query_normalized, price_filter):
+        """Flag harga (is_murah, is_sedang, is_mahal) dari query, ditimpa filter harga sidebar"""
+        is_murah = any(k in query_normalized for k in ['murah', 'terjangkau', 'hemat', 'low budget'])
+        is_sedang = any(k in query_normalized for k in ['sedang', 'standar', 'menengah', 'reasonable'])
+        is_mahal = any(k in query_normalized for k in ['mahal', 'premium', 'mewah', 'fancy'])
         
         if price_filter and price_filter != "Semua":
             if price_filter == "Murah":
@@ -654,69 +1389,125 @@ class ChatbotEngine:
             elif price_filter == "Mahal":
                 is_murah, is_sedang, is_mahal = False, False, True
         
-        relevant_mask = similarity_scores > -500
+        return is_murah, is_sedang, is_mahal
+    
+    def _price_target(self, is_murah, is_sedang, is_mahal):
+        """Kategori harga yang di-boost (prioritas Murah > Mahal > Sedang)"""
+        return "Murah" if is_murah else ("Mahal" if is_mahal else ("Sedang" if is_sedang else None))
+    
+    def _apply_price_boost(self, context, weights):
+        """Menerapkan boost untuk harga.
+        
+        Flag harga (`is_murah`, `is_sedang`, `is_mahal`) disimpan di konteks untuk
+        perfect match & warning; mask kategori harga sudah dihitung saat load.
+        """
+        similarity_scores = context.scores
+        is_murah, is_sedang, is_mahal = self._detect_price(context.query_normalized, context.price_filter)
+        
+        relevant_mask = similarity_scores > weights['relevance_floor']
         
-        if is_murah:
-            mask = self.df['kategori_harga'].astype(str).str.contains('Murah', case=False, na=False)
-            similarity_scores[mask & relevant_mask] += BOOST_FACTOR
-        elif is_mahal:
-            mask = self.df['kategori_harga'].astype(str).str.contains('Mahal', case=False, na=False)
-            similarity_scores[mask & relevant_mask] += BOOST_FACTOR
-        elif is_sedang:
-            mask = self.df['kategori_harga'].astype(str).str.contains('Sedang', case=False, na=False)
-            similarity_scores[mask & relevant_mask] += BOOST_FACTOR
+        target_price = self._price_target(is_murah, is_sedang, is_mahal)
         
-        return similarity_scores, is_murah, is_sedang, is_mahal
+        if target_price:
+            mask = context.view(self._price_mask(target_price))
+            similarity_scores[mask & relevant_mask] += weights['match']
+        
+        context.is_murah, context.is_sedang, context.is_mahal = is_murah, is_sedang, is_mahal
+        return context
     
-    def _apply_exact_name_matching(self, similarity_scores, query):
+    def _apply_price_range_filter(self, context, weights):
+        """Menerapkan filter budget numerik ("di bawah 30 ribu", "50rb-an").
+        
+        Rentang budget diurai dari query sebelum autocorrect; mask-nya berasal dari
+        binary search di `price_index` sehingga tidak ada operasi string per baris.
+        """
+        if context.price_range is None:
+            return context
+        
+        similarity_scores = context.scores
+        full_mask = self._price_range_mask(context)
+        range_mask = context.view(full_mask)
+        similarity_scores[range_mask] += weights['match']
+        
+        # Tie-break deterministik: harga minimum lebih murah sedikit lebih tinggi
+        min_prices = context.view(self.price_index.min_prices)[range_mask]
+        similarity_scores[range_mask] += PRICE_TIE_BREAK / (1.0 + min_prices / 1000.0)
+        
+        # Penalti hanya jika ada restoran yang masuk budget (bukan hanya di kandidat)
+        if full_mask.any():
+            similarity_scores[~range_mask] += weights['mismatch']
+            print(f"[DEBUG] Applied Price Range Boost ({weights['match']:+}) & Penalty ({weights['mismatch']:+}) for '{context.price_range.label}'")
+        
+        return context
+    
+    def _apply_perfect_match_boost(self, context, weights):
+        """Memberikan boost besar untuk perfect match (kategori + harga + lokasi).
+        
+        Semua mask diambil dari hasil tahap sebelumnya atau mask statis saat load.
+        """
+        detected_price = context.detected_price
+        if not (context.matched_category and detected_price):
+            return context
+        
+        perfect_mask = self._category_mask(context.matched_category) & self._price_mask(detected_price)
+        
+        if context.active_filters:
+            loc_mask = np.zeros(len(self.df), dtype=bool)
+            for flt in context.active_filters:
+                loc_mask |= self._location_mask(context, flt)
+            perfect_mask = perfect_mask & loc_mask
+        
+        perfect_mask = context.view(perfect_mask)
+        if perfect_mask.any():
+            context.scores[perfect_mask] += weights['match']
+        
+        return context
+    
+    def _apply_exact_name_matching(self, context, weights):
         """Menerapkan exact/fuzzy name matching dengan boost tinggi"""
+        similarity_scores = context.scores
+        query = context.query
+        
         try:
             from rapidfuzz import fuzz
             
-            def normalize_text(text):
-                text = str(text).lower().strip()
-                text = re.sub(r'\s+', ' ', text)
-                text = text.replace("'", "'").replace("`", "'")
-                return text
-            
-            query_clean = normalize_text(query)
+            query_clean = self._normalize_name(query)
             query_len = len(query_clean)
             
-            df_names_normalized = self.df['nama_rumah_makan'].apply(normalize_text)
-            exact_matches = df_names_normalized == query_clean
+            exact_ids = self.name_index.get(query_clean)
+            exact_positions = context.positions(exact_ids) if exact_ids else []
             
-            if exact_matches.any():
-                exact_matches_array = exact_matches.values
-                similarity_scores[exact_matches_array] += 2000.0
+            if len(exact_positions):
+                similarity_scores[exact_positions] += weights['exact']
                 
-                matched_names = self.df.loc[exact_matches, 'nama_rumah_makan'].tolist()
-                for name in matched_names:
+                for name in self.df['nama_rumah_makan'].values[context.row_ids(exact_positions)]:
                     print(f"[EXACT MATCH 100%] '{name}' matched query '{query}'")
             
-            elif query_len >= 8:
-                top_indices = similarity_scores.argsort()[-100:][::-1]
+            elif query_len >= weights['min_query_length']:
+                top_indices = similarity_scores.argsort()[-int(weights['fuzzy_candidates']):][::-1]
+                normalized_names = self.normalized_names.values
                 
                 for idx in top_indices:
-                    nama_resto = normalize_text(self.df.iloc[idx]['nama_rumah_makan'])
+                    nama_resto = normalized_names[context.row_ids(idx)]
                     similarity_ratio = fuzz.ratio(query_clean, nama_resto)
                     partial_ratio = fuzz.partial_ratio(query_clean, nama_resto)
                     best_ratio = max(similarity_ratio, partial_ratio)
                     
-                    if best_ratio >= 88.0:
-                        similarity_scores[idx] += 8.0
-                        print(f"[NEAR MATCH {best_ratio:.1f}%] '{self.df.iloc[idx]['nama_rumah_makan']}' matched query '{query}'")
+                    if best_ratio >= weights['near_ratio']:
+                        similarity_scores[idx] += weights['near']
+                        print(f"[NEAR MATCH {best_ratio:.1f}%] '{self.df['nama_rumah_makan'].values[context.row_ids(idx)]}' matched query '{query}'")
                         break
-                    elif best_ratio >= 80.0 and query_len >= 10:
-                        similarity_scores[idx] += 5.0
-                        print(f"[GOOD MATCH {best_ratio:.1f}%] '{self.df.iloc[idx]['nama_rumah_makan']}' matched query '{query}'")
+                    elif best_ratio >= weights['good_ratio'] and query_len >= weights['good_min_query_length']:
+                        similarity_scores[idx] += weights['good']
+                        print(f"[GOOD MATCH {best_ratio:.1f}%] '{self.df['nama_rumah_makan'].values[context.row_ids(idx)]}' matched query '{query}'")
                         break
                         
         except Exception as e:
             print(f"[WARNING] Fuzzy matching error: {str(e)}")
         
-        return similarity_scores
+        return context
     
-    def _generate_warning_message(self, top_recommendations, is_murah, is_sedang, is_mahal, query, matched_category, active_filters):
+    def _generate_warning_message(self, row_ids, context):
         """Membuat pesan peringatan cerdas untuk user.
         
         Mendeteksi 3 jenis warning:
@@ -724,20 +1515,24 @@ class ChatbotEngine:
         2. Lokasi Mismatch: Hasil tidak ada di lokasi yang diminta user
         3. Harga Mismatch: Hasil tidak sesuai dengan filter harga user
         
+        Semua pengecekan dilakukan secara vektor terhadap posisi baris hasil teratas,
+        memakai ulang mask yang sudah dihitung pada tahap scoring (`context.masks`)
+        dan mask lokasi yang dihitung sekali saat load.
+        
         Args:
-            top_recommendations (DataFrame): Top N hasil rekomendasi
-            is_murah/is_sedang/is_mahal (bool): Flag filter harga aktif
-            query (str): Query asli user
-            matched_category (str): Kategori yang terdeteksi dari query
-            active_filters (list): Daftar filter yang aktif
+            row_ids (np.array): Posisi baris (urut ranking) dari hasil rekomendasi
+            context (RankingContext): Konteks query setelah seluruh tahap ranking
             
         Returns:
             str or None: Pesan warning jika ada kondisi yang perlu diperingatkan
         """
-        if top_recommendations.empty:
+        if len(row_ids) == 0:
             return None
             
-        checked_recs = top_recommendations.head(5)
+        checked_ids = row_ids[:5]
+        query = context.query
+        matched_category = context.matched_category
+        active_filters = context.active_filters
         
         # 0. CEK WARNING KONFLIK KATEGORI (Semantic Conflict)
         if matched_category:
@@ -762,155 +1557,199 @@ class ChatbotEngine:
                 if conflicting_term:
                     return f"Sepertinya kamu mencari **'{matched_category.title()}'** sekaligus **'{conflicting_term}'**. Aku utamakan **{matched_category.title()}** dulu ya. Kalau kurang pas, coba cari dengan kata kunci yang lebih spesifik."
 
-        # 0.5. CEK WARNING CONTENT + LOCATION MISMATCH
-        # Deteksi jika user mencari keyword spesifik di lokasi tertentu, tapi keyword tidak ada di hasil
-        location_filters = [f for f in active_filters if f in LOCATION_EXPANSION]
+        # Pisahkan filter lokasi dari active_filters
+        location_filters = [f for f in active_filters if f in LOCATION_EXPANSION or self.location_index.is_district(f)]
         
         if location_filters:
-            # Ekstrak keyword utama dari query (bukan stopword, bukan lokasi, bukan kategori)
+            target_loc = location_filters[0] # Ambil satu lokasi utama
+            # Mask kode kecamatan yang sama dengan tahap scoring
+            loc_match_found = bool(self._location_mask(context, target_loc)[checked_ids].any())
+            
+            # 0.25. KECAMATAN TANPA DATA -> HASIL DARI KECAMATAN TETANGGA
+            fallback = context.location_fallbacks.get(target_loc)
+            if fallback and loc_match_found:
+                return f"Belum ada data kuliner di area **'{target_loc.title()}'** nih, jadi aku tampilkan dari daerah sekitarnya (**{', '.join(fallback)}**) ya."
+            
+            # 0.5. CEK WARNING CONTENT + LOCATION MISMATCH
+            # Deteksi jika user mencari keyword spesifik di lokasi tertentu, tapi keyword tidak ada di hasil
             query_lower = query.lower()
             stopwords_extended = {
                 'enak', 'murah', 'bagus', 'recommended', 'rekomendasi', 'cari', 'mau', 'ingin',
                 'di', 'daerah', 'sekitar', 'dekat', 'wilayah', 'area', 'yang', 'dong', 'sih'
             }
             
-            # Hapus lokasi dan stopwords dari query
-            query_words = query_lower.split()
-            content_keywords = []
-            
             # Buat set kata-kata yang merupakan bagian dari lokasi
+            # (e.g., 'buahbatu' -> variasi 'buah batu' -> 'buah', 'batu')
             location_parts = set()
             for loc_filter in location_filters:
-                # Pisahkan lokasi gabung jadi kata-kata (e.g., 'buahbatu' -> 'buah', 'batu')
-                # Cek di LOCATION_EXPANSION untuk mendapatkan variasi dengan spasi
-                loc_variants = LOCATION_EXPANSION.get(loc_filter, [loc_filter])
-                for variant in loc_variants:
+                for variant in LOCATION_EXPANSION.get(loc_filter, [loc_filter]):
                     location_parts.update(variant.split())
             
-            for word in query_words:
-                # Skip jika stopword, lokasi, bagian dari lokasi, atau terlalu pendek
-                if (word not in stopwords_extended and 
-                    word not in location_filters and 
-                    word not in location_parts and
-                    len(word) >= 4 and
-                    word not in ['cafe', 'kafe', 'resto', 'restoran', 'warung']):
-                    content_keywords.append(word)
-            
-            # Jika ada keyword konten yang spesifik
-            if content_keywords:
-                # Cek apakah keyword ada di Top 5 results (nama atau menu)
+            # Skip jika stopword, lokasi, bagian dari lokasi, atau terlalu pendek
+            content_keywords = [
+                word for word in query_lower.split()
+                if word not in stopwords_extended
+                and word not in location_filters
+                and word not in location_parts
+                and len(word) >= 4
+                and word not in ['cafe', 'kafe', 'resto', 'restoran', 'warung']
+            ]
+            
+            # Jika ada keyword konten yang spesifik, cek apakah ada di Top 5 (nama atau menu)
+            if content_keywords and loc_match_found:
                 keyword_found_in_results = False
                 for keyword in content_keywords:
-                    for _, row in checked_recs.iterrows():
-                        nama = str(row['nama_rumah_makan']).lower()
-                        menu = str(row.get('menu', '')).lower()
-                        if keyword in nama or keyword in menu:
-                            keyword_found_in_results = True
-                            break
-                    if keyword_found_in_results:
+                    keyword_mask = context.masks.get(('content', keyword))
+                    if keyword_mask is not None:
+                        found = keyword_mask[checked_ids].any()
+                    else:
+                        found = self._rows_contain(checked_ids, keyword)
+                    if found:
+                        keyword_found_in_results = True
                         break
                 
-                # Jika keyword TIDAK ditemukan di hasil, tapi lokasi cocok
+                # Jika lokasi cocok tapi konten tidak cocok -> Warning
                 if not keyword_found_in_results:
-                    target_loc = location_filters[0]
-                    # Cek apakah hasil memang ada di lokasi yang diminta
-                    loc_match_found = False
-                    for _, row in checked_recs.iterrows():
-                        addr_raw = str(row['alamat']).lower()
-                        search_terms = LOCATION_EXPANSION.get(target_loc, [target_loc])
-                        for term in search_terms:
-                            if term in addr_raw or term.replace(" ", "") in addr_raw.replace(" ", ""):
-                                loc_match_found = True
-                                break
-                        if loc_match_found:
-                            break
-                    
-                    # Jika lokasi cocok tapi konten tidak cocok -> Warning
-                    if loc_match_found:
-                        keyword_str = "', '".join(content_keywords[:2])  # Ambil max 2 keyword
-                        return f"Maaf, sepertinya **'{keyword_str}'** di daerah **{target_loc.replace('_', ' ').title()}** belum ada datanya. Tapi, coba cek rekomendasi kuliner lain di area tersebut ya!"
+                    keyword_str = "', '".join(content_keywords[:2])  # Ambil max 2 keyword
+                    return f"Maaf, sepertinya **'{keyword_str}'** di daerah **{target_loc.replace('_', ' ').title()}** belum ada datanya. Tapi, coba cek rekomendasi kuliner lain di area tersebut ya!"
 
-        # 1. CEK WARNING LOKASI (Prioritas Utama)
-        # Pisahkan filter lokasi dari active_filters
-        location_filters = [f for f in active_filters if f in LOCATION_EXPANSION]
-        
-        if location_filters:
-            target_loc = location_filters[0] # Ambil satu lokasi utama
-            search_terms = LOCATION_EXPANSION.get(target_loc, [target_loc])
-            
-            # Cek apakah ada satu pun hasil di top 5 yang alamatnya cocok
-            loc_match_found = False
-            for _, row in checked_recs.iterrows():
-                addr_raw = str(row['alamat']).lower()
-                # Normalisasi alamat (hapus spasi) agar "buahbatu" match dengan "buah batu"
-                addr_clean = addr_raw.replace(" ", "")
-                
-                # Cek juga term yang sudah dinormalisasi
-                match = False
-                for term in search_terms:
-                    # Cek term asli (dengan spasi jika ada)
-                    if term in addr_raw:
-                        match = True
-                    # Cek term tanpa spasi
-                    elif term.replace(" ", "") in addr_clean:
-                        match = True
-                    
-                    if match: break
-                
-                if match:
-                    loc_match_found = True
-                    break
-            
+            # 1. CEK WARNING LOKASI (Prioritas Utama)
             if not loc_match_found:
                 return f"Belum ada data kuliner di area **'{target_loc.title()}'** nih. Coba intip rekomendasi di daerah lain yang mungkin kamu suka."
 
         # 2. CEK WARNING HARGA
-        target_price = None
-        if is_murah:
-            target_price = "Murah"
-        elif is_mahal:
-            target_price = "Mahal"
-        elif is_sedang:
-            target_price = "Sedang"
+        if context.price_range is not None:
+            if not self._price_range_mask(context)[checked_ids].any():
+                return f"Maaf, belum nemu rekomendasi yang pas untuk '{query}' dengan harga {context.price_range.label}. Tapi ini ada rekomendasi terbaik lainnya untukmu."
+            if self._price_range_approximate(context):
+                return f"Belum ada tempat dengan harga {context.price_range.label} nih. Ini rekomendasi yang harganya paling mendekati ya!"
+        
+        target_price = self._price_target(context.is_murah, context.is_sedang, context.is_mahal)
         
         if target_price:
-            if 'kategori_harga' in checked_recs.columns:
-                matched_count = checked_recs['kategori_harga'].astype(str).str.contains(target_price, case=False, na=False).sum()
-                
-                if matched_count == 0:
-                    return f"Maaf, belum nemu rekomendasi yang pas untuk '{query}' dengan harga '{target_price}'. Tapi ini ada rekomendasi terbaik lainnya untukmu."
+            if not self._price_mask(target_price)[checked_ids].any():
+                return f"Maaf, belum nemu rekomendasi yang pas untuk '{query}' dengan harga '{target_price}'. Tapi ini ada rekomendasi terbaik lainnya untukmu."
         
         return None
     
+    def _metadata_substring_rows(self, keyword, limit):
+        """Baris (urut dataset) yang metadata-nya memuat `keyword` sebagai substring literal.
+        
+        Kandidat diambil dari irisan posting list trigram, lalu diverifikasi satu per
+        satu terhadap teks metadata dan berhenti begitu `limit` baris ditemukan
+        (`keyword` minimal sepanjang satu trigram).
+        """
+        candidates = self.metadata_trigrams.candidates(keyword)
+        matched = []
+        for row_id, text in zip(candidates, self._metadata_values('metadata_tfidf', candidates)):
+            if len(matched) >= limit:
+                break
+            if keyword in text.lower():
+                matched.append(int(row_id))
+        return np.array(matched, dtype=np.int32)
+    
+    def _rows_contain(self, row_ids, term):
+        """Cek apakah nama atau menu pada baris `row_ids` mengandung `term`"""
+        names = self.lower_columns['nama_rumah_makan'].values[row_ids]
+        menus = self.lower_columns['menu'].values[row_ids]
+        return any(term in name or term in menu for name, menu in zip(names, menus))
+    
     # ========================================================================
     # METODE REKOMENDASI UTAMA
     # ========================================================================
     
-    def get_recommendations(self, query, price_filter=None, top_n=5):
-        """Mendapatkan rekomendasi UMKM berdasarkan query pengguna.
+    def recommend(self, query, price_filter=None, top_n=5, retrieval_mode=None, profile=False):
+        """Mendapatkan rekomendasi UMKM sebagai handle hasil yang ringkas.
         
         Pipeline Lengkap:
-        1. Preprocessing: Clean, Autocorrect, Synonym Normalization, Semantic Expansion
-        2. TF-IDF Calculation: Menghitung similarity antara query dan dataset
-        3. Boosting & Filtering: Category Matching, Location Boost, Content Boost, Price Boost
-        4. Ranking: Mengurutkan hasil berdasarkan skor akhir
-        5. Warning Generation: Mendeteksi konflik kategori/lokasi/harga
+        1. Preprocessing: Clean, Budget Parsing ("di bawah 30 ribu"), Autocorrect, Synonym Normalization, Semantic Expansion,
+           ekstraksi filter & vektor TF-IDF (di-cache per teks query, lihat `parse_cache`)
+        2. First-Stage Scoring: Similarity TF-IDF, LSA, blend keduanya, atau BM25
+           (BM25 hanya memberi skor untuk kandidat yang memuat term query)
+        3. Candidate Generation: Kandidat terbatas dari skor teks + index kategori/lokasi/nama
+           (budget di grup 'candidates' pada ranking plan)
+        4. Boosting & Filtering: Tahap-tahap di ranking plan (kategori, lokasi, atribut, konten, harga, ...),
+           hanya pada kandidat
+        5. Ranking: Memilih top N berdasarkan skor akhir
+        6. Warning Generation: Mendeteksi konflik kategori/lokasi/harga
         
         Args:
             query (str): Query pencarian dari user (e.g., "sushi enak di dago")
             price_filter (str, optional): Filter harga ('Murah', 'Sedang', 'Mahal', atau None)
             top_n (int, optional): Jumlah rekomendasi yang dikembalikan (default: 5)
+            retrieval_mode (str, optional): 'tfidf', 'lsa', 'blend', atau 'bm25' (default: mode engine)
+            profile (bool, optional): Rekam profil cProfile query ini ke folder profiler
+                (default folder 'profiles/' jika engine tidak punya profiler)
             
         Returns:
-            tuple: (recommendations_df, warning_message, processed_query)
-                - recommendations_df: DataFrame berisi top N rekomendasi
-                - warning_message: Pesan warning jika ada (atau None)
-                - processed_query: Query yang sudah diproses (untuk debugging)
+            RecommendationResult: Posisi baris & skor top N, warning, dan query hasil koreksi.
+                Kolom tampilan diambil per halaman lewat `fetch_page` atau `result.cursor(engine)`.
                 
         Raises:
             ValueError: Jika query kosong atau bukan string
+            QueryGateTimeout: Jika `max_concurrent_queries` aktif dan giliran tidak didapat
+                dalam `gate_timeout`
         """
+        if self.query_log is not None:
+            self.query_log.record(query)
         
+        # Tanpa profiler & tanpa `profile=True`, biaya profiling hanya pengecekan ini
+        if profile or (self.profiler is not None and self.profiler.should_sample()):
+            return self._profiled_recommend(query, price_filter, top_n, retrieval_mode)
+        
+        return self._cached_recommend(query, price_filter, top_n, retrieval_mode)
+    
+    def _profiled_recommend(self, query, price_filter, top_n, retrieval_mode):
+        """`recommend` di bawah profiler; metadata mencatat parameter & status cache saat itu"""
+        if self.profiler is None:
+            self.profiler = QueryProfiler()
+        
+        is_text = isinstance(query, str)
+        params = {
+            'price_filter': price_filter,
+            'top_n': top_n,
+            'retrieval_mode': retrieval_mode or self.retrieval_mode,
+            'ranking_plan_version': self.ranking_plan.version,
+            'parse_cached': is_text and self.parse_cache is not None and self._normalize_raw_text(query) in self.parse_cache,
+            'result_cached': is_text and self.result_cache is not None and (
+                self._result_cache_key(query, price_filter, top_n, retrieval_mode) in self.result_cache
+            ),
+        }
+        return self.profiler.run(
+            lambda: self._cached_recommend(query, price_filter, top_n, retrieval_mode), query, params
+        )
+    
+    def _cached_recommend(self, query, price_filter, top_n, retrieval_mode):
+        """`recommend` lewat cache hasil (jika aktif), tanpa mencatat ke query log"""
+        if self.result_cache is None or not isinstance(query, str):
+            return self._gated_recommend(query, price_filter, top_n, retrieval_mode)
+        
+        key = self._result_cache_key(query, price_filter, top_n, retrieval_mode)
+        result = self.result_cache.get(key)
+        if result is None:
+            result = self._gated_recommend(query, price_filter, top_n, retrieval_mode)
+            # Handle yang sama dibagikan ke banyak session: array-nya dibuat read-only
+            result.row_ids.setflags(write=False)
+            result.scores.setflags(write=False)
+            self.result_cache.put(key, result)
+        return result
+    
+    def _result_cache_key(self, query, price_filter, top_n, retrieval_mode):
+        # Revisi dibaca sebelum pipeline membaca plan: hasil tidak pernah lebih lama dari key-nya.
+        # Pipeline hanya membaca teks hasil clean_text (tanpa tanda baca, sama seperti query log)
+        # ditambah status exact match nama, sehingga "kopi, murah!" kena entri warm-up "kopi murah"
+        return (self._plan_revision, self.preprocessor.clean_text(query), self._check_exact_match(query),
+                price_filter, top_n, retrieval_mode or self.retrieval_mode)
+    
+    def _gated_recommend(self, query, price_filter, top_n, retrieval_mode):
+        if self.query_gate is None:
+            return self._recommend(query, price_filter, top_n, retrieval_mode)
+        
+        with self.query_gate:
+            return self._recommend(query, price_filter, top_n, retrieval_mode)
+    
+    def _recommend(self, query, price_filter, top_n, retrieval_mode):
+        """Pipeline `recommend` (tanpa gerbang konkurensi)"""
         if not query or not isinstance(query, str):
             raise ValueError("Query harus berupa string yang tidak kosong!")
         
@@ -918,138 +1757,301 @@ class ChatbotEngine:
         if not query:
             raise ValueError("Query tidak boleh kosong atau hanya spasi!")
         
-        raw_match_exists = self._check_exact_match(query)
+        scorer = self._get_scorer(retrieval_mode)
+        parsed = self._parse_query(query)
+        if parsed.skip_reason is not None:
+            return RecommendationResult([], [], None, parsed.query_display)
+        
+        query = parsed.query_corrected
         
         try:
-            query_clean = self.preprocessor.clean_text(query)
-            query_corrected = self._apply_autocorrect(query_clean)
-            query_normalized = self._apply_synonym_normalization(query_corrected.lower())
-            query_expanded = self._apply_semantic_expansion(query_normalized, query_normalized)
-            processed_query = self.preprocessor.preprocess(query_expanded)
+            first_stage = scorer.score(parsed.processed_query, query_vector=parsed.query_vector)
             
-            if not raw_match_exists and len(processed_query.strip()) < 2:
-                print(f"[INFO] Query '{processed_query}' diabaikan karena terlalu pendek.")
-                return pd.DataFrame(), None, query_corrected
+            # Referensi plan dibaca sekali agar budget & bobot berasal dari versi yang sama
+            ranking_plan = self.ranking_plan
+            candidate_budget = int(ranking_plan.weights.get('candidates', {}).get('budget', 0))
             
-            if not processed_query.strip():
-                return pd.DataFrame(), None, query_corrected
-                
-            query = query_corrected
+            context = RankingContext(
+                None, query, parsed.query_normalized, parsed.query_expanded, parsed.active_filters, price_filter
+            )
+            context.detected_category = parsed.detected_category
+            context.detected_tipe = parsed.detected_tipe
+            context.nearby = parsed.nearby
+            context.price_range = parsed.price_range
+            self._select_candidates(context, first_stage, candidate_budget)
+            
+            # Seluruh tahap boosting dijalankan sesuai urutan & bobot di ranking plan
+            ranking_plan.run(context)
+            similarity_scores = context.scores
             
         except Exception as e:
-            raise Exception(f"Error preprocessing query pipeline: {str(e)}")
+            raise Exception(f"Error menghitung similarity: {str(e)}")
         
         try:
-            query_vector = self.vectorizer.transform([processed_query])
-            similarity_scores = cosine_similarity(query_vector, self.tfidf_matrix).flatten()
+            positions = self._select_top(similarity_scores, top_n)
+            positions = positions[similarity_scores[positions] > 0]
+            row_ids = context.row_ids(positions)
+            top_scores = similarity_scores[positions]
+            
+            if len(row_ids) == 0:
+                print(f"[INFO] Fallback search for: {query}")
+                keyword = query.lower()
+                
+                if len(keyword) >= 3:
+                    row_ids = self._metadata_substring_rows(keyword, top_n)
+                    top_scores = np.full(len(row_ids), 0.5)
             
-            query_lower = query_normalized
-            active_filters = self._extract_filters(query_normalized)
-            has_additional_filter = len(active_filters) > 0
+            # Warning dicek terhadap posisi baris hasil, memakai ulang mask dari tahap scoring
+            warning_msg = self._generate_warning_message(row_ids, context)
             
-            similarity_scores, matched_category, strict_mode = self._apply_category_matching(
-                similarity_scores, query_expanded, has_additional_filter
-            )
+            return RecommendationResult(row_ids, top_scores, warning_msg, parsed.query_display)
             
-            similarity_scores = self._apply_location_boost(similarity_scores, active_filters)
-            similarity_scores = self._apply_content_boost(similarity_scores, query_lower)
+        except Exception as e:
+            raise Exception(f"Error memproses hasil rekomendasi: {str(e)}")
+    
+    def _parse_query(self, query):
+        """ParsedQuery untuk `query`, dari cache parsing jika teks yang sama pernah diproses"""
+        if self.parse_cache is None:
+            return self._build_parsed_query(query)
+        
+        # Seluruh parsing berawal dari teks huruf kecil, jadi key cukup teks ternormalisasi
+        key = self._normalize_raw_text(query)
+        parsed = self.parse_cache.get(key)
+        if parsed is None:
+            parsed = self._build_parsed_query(query)
+            self.parse_cache.put(key, parsed)
+        return parsed
+    
+    def _build_parsed_query(self, query):
+        """Clean -> budget -> autocorrect -> sinonim -> ekspansi -> stemming -> filter -> vektor TF-IDF"""
+        try:
+            raw_match_exists = self._check_exact_match(query)
+            query_clean = self.preprocessor.clean_text(query)
+            # Ekspresi budget diurai sebelum autocorrect (yang akan merusak angka & satuan)
+            price_range, query_rest = parse_price_query(query_clean)
+            query_corrected = self._apply_autocorrect(query_rest)
+            query_normalized = self._apply_synonym_normalization(query_corrected.lower())
+            query_expanded = self._apply_semantic_expansion(query_normalized, query_normalized)
+            processed_query = self.preprocessor.preprocess(query_expanded)
             
-            similarity_scores, is_murah, is_sedang, is_mahal = self._apply_price_boost(
-                similarity_scores, query_lower, price_filter
+            parsed = ParsedQuery(
+                raw_match_exists, price_range, query_corrected, query_normalized, query_expanded, processed_query
             )
+            # Query yang hanya berisi budget tetap ditampilkan sebagai teks budget-nya, bukan string kosong
+            if price_range is not None and not query_corrected.strip():
+                parsed.query_display = query_clean
             
-            detected_price = "Murah" if is_murah else ("Sedang" if is_sedang else ("Mahal" if is_mahal else None))
-            if matched_category and detected_price:
-                self._apply_perfect_match_boost(similarity_scores, matched_category, active_filters, detected_price)
+            # Query yang hanya berisi budget (e.g., "di bawah 20 ribu") tetap diproses
+            if not raw_match_exists and len(processed_query.strip()) < 2 and price_range is None:
+                print(f"[INFO] Query '{processed_query}' diabaikan karena terlalu pendek.")
+                parsed.skip_reason = 'too_short'
+                return parsed
+            
+            if not processed_query.strip() and price_range is None:
+                parsed.skip_reason = 'empty'
+                return parsed
+            
+            parsed.active_filters = tuple(self._extract_filters(query_normalized))
+            parsed.detected_category, parsed.detected_tipe = self._detect_category(query_expanded)
+            parsed.nearby = any(word in NEARBY_TERMS for word in query_normalized.split())
+            parsed.query_vector = self.scorers['tfidf'].transform(processed_query)
+            return parsed
             
         except Exception as e:
-            raise Exception(f"Error menghitung similarity: {str(e)}")
+            raise Exception(f"Error preprocessing query pipeline: {str(e)}")
+    
+    def get_recommendations(self, query, price_filter=None, top_n=5, retrieval_mode=None, profile=False):
+        """Mendapatkan rekomendasi UMKM dalam bentuk DataFrame.
         
-        similarity_scores = self._apply_exact_name_matching(similarity_scores, query)
+        Wrapper dari `recommend` yang langsung mematerialisasi seluruh kolom
+        dataset untuk top N hasil. UI sebaiknya memakai `recommend` + `fetch_page`.
         
-        try:
-            result_df = self.df.copy()
-            result_df['similarity_score'] = similarity_scores
-            
-            top_recommendations = result_df.nlargest(top_n, 'similarity_score')
-            top_recommendations = top_recommendations[top_recommendations['similarity_score'] > 0]
+        Args:
+            query (str): Query pencarian dari user (e.g., "sushi enak di dago")
+            price_filter (str, optional): Filter harga ('Murah', 'Sedang', 'Mahal', atau None)
+            top_n (int, optional): Jumlah rekomendasi yang dikembalikan (default: 5)
+            retrieval_mode (str, optional): 'tfidf', 'lsa', 'blend', atau 'bm25' (default: mode engine)
+            profile (bool, optional): Rekam profil cProfile query ini (lihat `recommend`)
             
-            if top_recommendations.empty:
-                print(f"[INFO] Fallback search for: {query}")
-                keyword = query.lower()
-                
-                if len(keyword) < 3:
-                     mask = pd.Series([False] * len(self.df))
-                else:
-                    mask = self.df['metadata_tfidf'].str.lower().str.contains(keyword, na=False)
+        Returns:
+            tuple: (recommendations_df, warning_message, processed_query)
+                - recommendations_df: DataFrame berisi top N rekomendasi
+                - warning_message: Pesan warning jika ada (atau None)
+                - processed_query: Query yang sudah diproses (untuk debugging)
                 
-                if mask.any():
-                    fallback_df = self.df[mask].copy()
-                    fallback_df['similarity_score'] = 0.5
-                    top_recommendations = fallback_df.head(top_n)
-            
-            # PENGGILAN UPDATE: Sertakan active_filters
-            warning_msg = self._generate_warning_message(
-                top_recommendations, is_murah, is_sedang, is_mahal, query, matched_category, active_filters
-            )
-            
-            return top_recommendations, warning_msg, query
+        Raises:
+            ValueError: Jika query kosong atau bukan string
+        """
+        result = self.recommend(query, price_filter=price_filter, top_n=top_n, retrieval_mode=retrieval_mode, profile=profile)
+        
+        if result.empty:
+            return pd.DataFrame(), result.warning, result.corrected_query
+        
+        recommendations = self.fetch_page(result, 0, len(result), columns=None)
+        return recommendations, result.warning, result.corrected_query
+    
+    def fetch_page(self, result, offset=0, limit=5, columns=DISPLAY_COLUMNS):
+        """Mematerialisasi satu halaman hasil rekomendasi.
+        
+        Args:
+            result (RecommendationResult): Handle hasil dari `recommend`
+            offset (int): Posisi awal halaman
+            limit (int): Jumlah baris maksimal di halaman
+            columns (tuple, optional): Kolom yang diambil (None = semua kolom dataset)
             
-        except Exception as e:
-            raise Exception(f"Error memproses hasil rekomendasi: {str(e)}")
-
-    def _apply_perfect_match_boost(self, similarity_scores, matched_category, active_filters, price_filter):
-        """Memberikan boost besar untuk perfect match"""
-        cat_mask = pd.Series([False] * len(self.df), index=self.df.index)
+        Returns:
+            DataFrame: Baris halaman tersebut beserta kolom 'similarity_score'
+        """
+        row_ids = result.row_ids[offset:offset + limit]
         
-        if any(x in matched_category for x in ['kopi', 'cafe', 'kafe', 'coffee', 'dessert']):
-             cat_mask = self.df['kategori'].astype(str).str.lower().str.contains(
-                'kopi|cafe|kafe|coffee|dessert', na=False, regex=True
-            )
+        if columns is None:
+            page = self.df.iloc[row_ids]
         else:
-            cat_mask = self.df['kategori'].astype(str).str.lower() == matched_category
-            
-        price_mask = pd.Series([False] * len(self.df), index=self.df.index)
-        query_lower = price_filter.lower()
-        
-        if any(k in query_lower for k in ['murah', 'terjangkau', 'hemat', 'low budget']):
-            price_mask = self.df['kategori_harga'] == 'Murah'
-        elif any(k in query_lower for k in ['sedang', 'standar', 'menengah']):
-            price_mask = self.df['kategori_harga'] == 'Sedang'
-        elif any(k in query_lower for k in ['mahal', 'premium', 'mewah']):
-             price_mask = self.df['kategori_harga'] == 'Mahal'
-             
-        if active_filters and len(active_filters) > 0:
-            loc_mask = pd.Series([False] * len(self.df), index=self.df.index)
-            for flt in active_filters:
-                search_terms = LOCATION_EXPANSION.get(flt, [flt])
-                for term in search_terms:
-                    term_mask = self.df['alamat'].astype(str).str.lower().str.contains(term, na=False)
-                    loc_mask = loc_mask | term_mask
+            page = self.df.iloc[row_ids, self.df.columns.get_indexer(list(columns))]
+        
+        return page.assign(similarity_score=result.scores[offset:offset + limit])
+    
+    def _select_top(self, scores, top_n):
+        """Posisi top N skor tertinggi, urutan seri mengikuti posisi baris (seperti `nlargest`)"""
+        if top_n <= 0:
+            return np.array([], dtype=np.intp)
+        
+        if top_n < len(scores):
+            threshold = scores[np.argpartition(-scores, top_n - 1)[:top_n]].min()
+            greater = np.flatnonzero(scores > threshold)
+            ties = np.flatnonzero(scores == threshold)[:top_n - len(greater)]
+            candidates = np.sort(np.concatenate([greater, ties]))
         else:
-            loc_mask = pd.Series([True] * len(self.df), index=self.df.index)
+            candidates = np.arange(len(scores))
         
-        perfect_mask = cat_mask & price_mask & loc_mask
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+    
+    # ========================================================================
+    # AUTOCOMPLETE (TYPEAHEAD)
+    # ========================================================================
+    
+    def autocomplete(self, text, limit=8, kinds=None):
+        """Saran pelengkap untuk teks yang sedang diketik di kotak pencarian.
         
-        if perfect_mask.any():
-            similarity_scores[perfect_mask] += 50.0
+        Saran berasal dari nama restoran, menu populer, kategori, lokasi
+        (LOCATION_EXPANSION), dan kata di SYNONYM_MAP, diurutkan berdasarkan
+        frekuensinya di dataset. Cukup cepat untuk dipanggil setiap ketikan
+        (binary search di array key terurut, tanpa menjalankan pipeline).
+        
+        Args:
+            text (str): Teks yang sedang diketik, e.g. 'ram' atau 'ramen di da'
+            limit (int, optional): Jumlah saran maksimal
+            kinds (iterable, optional): Batasi jenis saran, e.g. ('nama', 'menu')
             
+        Returns:
+            list: Daftar Suggestion (label, kind, frequency), urut dari yang terbaik
+        """
+        return self.autocomplete_index.complete(text, limit=limit, kinds=kinds)
+    
+    # ========================================================================
+    # WARM-UP CACHE
+    # ========================================================================
+    
+    def warm_up(self, queries=(), limit=WARM_UP_QUERIES, price_filter=None, top_n=5, background=True):
+        """Memutar ulang query populer agar cache (stem, koreksi, hasil) sudah hangat.
+        
+        Query yang diputar: `queries` (e.g., tombol pencarian cepat) lalu `limit` query
+        terpopuler dari query log. Opsi warm-up diingat dan diputar ulang otomatis
+        setelah `reload_ranking_plan` / `set_ranking_weights`. Query warm-up tidak
+        dicatat ke query log.
+        
+        Args:
+            queries (iterable, optional): Query yang selalu diputar lebih dulu
+            limit (int, optional): Jumlah query terpopuler dari query log
+            price_filter (str, optional): Filter harga yang dipakai UI (bagian dari key cache hasil)
+            top_n (int, optional): top_n yang dipakai UI (bagian dari key cache hasil)
+            background (bool, optional): True = jalan di thread daemon, langsung kembali
+            
+        Returns:
+            threading.Thread or int: Thread warm-up, atau jumlah query yang diputar jika
+                `background=False`
+        """
+        self._warm_up_options = (tuple(queries), limit, price_filter, top_n)
+        self._warm_up_generation += 1
+        generation = self._warm_up_generation
+        
+        if not background:
+            return self._run_warm_up(generation)
+        
+        thread = threading.Thread(target=self._run_warm_up, args=(generation,), name='cache-warm-up', daemon=True)
+        thread.start()
+        return thread
+    
+    def _warm_up_queries(self):
+        queries, limit, _, _ = self._warm_up_options
+        logged = self.query_log.top(limit) if self.query_log is not None and limit else []
+        return list(dict.fromkeys([*queries, *logged]))
+    
+    def _run_warm_up(self, generation):
+        """Memutar query warm-up; berhenti jika warm-up yang lebih baru sudah dimulai"""
+        _, _, price_filter, top_n = self._warm_up_options
+        queries = self._warm_up_queries()
+        start = time.perf_counter()
+        replayed = 0
+        
+        for query in queries:
+            if generation != self._warm_up_generation:
+                print(f"[INFO] Warm-up dihentikan (digantikan warm-up baru)")
+                return replayed
+            try:
+                self._cached_recommend(query, price_filter, top_n, None)
+                replayed += 1
+            except Exception as e:
+                print(f"[WARNING] Warm-up query '{query}' gagal: {str(e)}")
+        
+        print(f"[INFO] Warm-up selesai: {replayed} query dalam {time.perf_counter() - start:.2f} detik")
+        return replayed
+    
+    def _rewarm(self):
+        """Warm-up ulang dengan opsi terakhir (setelah plan berubah & cache hasil dikosongkan)"""
+        if self._warm_up_options is not None:
+            queries, limit, price_filter, top_n = self._warm_up_options
+            self.warm_up(queries, limit, price_filter, top_n)
+    
     # ========================================================================
     # METODE UTILITAS
     # ========================================================================
     
     def get_statistics(self):
-        """Mendapatkan statistik dataset"""
-        try:
-            stats = {
-                'total_umkm': len(self.df),
-                'total_kategori': self.df['kategori'].nunique(),
-                'kategori_terbanyak': self.df['kategori'].value_counts().head(5).to_dict(),
-                'harga_distribution': self.df['kategori_harga'].value_counts().to_dict()
-            }
-            return stats
-        except Exception as e:
-            raise Exception(f"Error mendapatkan statistik: {str(e)}")
+        """Mendapatkan statistik dataset dari snapshot yang dihitung saat load"""
+        return self.statistics.to_dict()
+    
+    def memory_report(self):
+        """Perkiraan memori engine per komponen (bytes).
+        
+        Array memory-mapped dari index bersama ikut dihitung walaupun page-nya
+        dibagikan antar proses. Leksikon Python (vocabulary, index nama, cache
+        query) tidak dihitung.
+        
+        Returns:
+            dict: {komponen: bytes}, e.g. {'dataframe': ..., 'tfidf': ..., 'location': ...}
+        """
+        report = {
+            'dataframe': int(self.df.memory_usage(deep=True).sum()),
+            'lower_columns': int(sum(column.memory_usage(deep=True) for column in self.lower_columns.values())),
+            'compressed_text': sum(column.nbytes for column in self._compressed_columns.values()),
+        }
+        
+        # Komponen dari prefix nama slot index ('tfidf.data' -> 'tfidf', 'category_masks' -> 'masks')
+        def add(name, nbytes):
+            if '.' in name:
+                component = name.split('.')[0]
+            else:
+                component = 'masks' if name.endswith(('_mask', '_masks')) else name
+            report[component] = report.get(component, 0) + int(nbytes)
+        
+        for name, owner, attr in self._shared_array_slots():
+            add(name, getattr(owner, attr).nbytes)
+        for name, owner, attr in self._shared_group_slots():
+            add(name, sum(array.nbytes for array in getattr(owner, attr).values()))
+        
+        report['autocomplete'] = self.autocomplete_index.nbytes
+        return report
     
     def search_by_category(self, category, top_n=10):
         """Mencari UMKM berdasarkan kategori spesifik"""
@@ -1073,13 +2075,66 @@ class ChatbotEngine:
         except Exception as e:
             raise Exception(f"Error mencari berdasarkan harga: {str(e)}")
     
-    def search_by_location(self, location):
-        """Mencari UMKM berdasarkan lokasi"""
+    def search_by_location(self, location, resolve=False):
+        """Mencari UMKM berdasarkan lokasi.
+        
+        Args:
+            location (str): Teks lokasi; default dicocokkan sebagai substring alamat
+            resolve (bool, optional): Pakai index lokasi terkode (kecamatan/kelurahan/jalan)
+                untuk nama lokasi yang dikenal, bukan substring alamat. Hasilnya bisa berbeda,
+                e.g. 'dago' tidak lagi cocok dengan 'Puri Dago' di Arcamanik
+        """
         if not location or not isinstance(location, str):
             raise ValueError("Lokasi harus berupa string yang tidak kosong!")
         
         try:
+            resolved = self.location_index.resolve(location) if resolve else None
+            if resolved is not None:
+                return self.df[resolved[0]]
+            
             filtered = self.df[self.df['alamat'].str.contains(location, case=False, na=False)]
             return filtered
         except Exception as e:
             raise Exception(f"Error mencari berdasarkan lokasi: {str(e)}")
+    
+    def browse(self, category=None, price=None, district=None, facilities=None, query=None,
+               offset=0, limit=10, columns=DISPLAY_COLUMNS):
+        """Browse restoran dengan kombinasi facet, lengkap dengan jumlah per nilai facet.
+        
+        Filter dan jumlah per nilai facet dihitung dari bitset yang disiapkan saat
+        load (AND/OR + popcount), sehingga UI bisa memperbarui seluruh facet setiap
+        kali user mengubah pilihan.
+        
+        Args:
+            category (str or list, optional): Kategori (beberapa nilai = OR)
+            price (str or list, optional): Kategori harga 'Murah', 'Sedang', 'Mahal' (OR)
+            district (str or list, optional): Kecamatan, e.g. 'Coblong' (OR)
+            facilities (str or list, optional): Fasilitas, e.g. ['Wi-Fi', 'Parkiran'] (AND)
+            query (str, optional): Jika diisi, hasil diurutkan menurut skor teks query
+                (default: urutan dataset)
+            offset (int): Posisi awal halaman
+            limit (int): Jumlah baris maksimal di halaman
+            columns (tuple, optional): Kolom yang diambil (None = semua kolom dataset)
+            
+        Returns:
+            BrowseResult: Halaman hasil, total restoran yang cocok, dan jumlah per nilai
+                facet ({'kategori': {...}, 'harga': {...}, 'kecamatan': {...}, 'fasilitas': {...}})
+                
+        Raises:
+            ValueError: Jika nilai facet tidak dikenal
+        """
+        selection = {'kategori': category, 'harga': price, 'kecamatan': district, 'fasilitas': facilities}
+        mask, facet_counts = self.facet_index.search(selection)
+        row_ids = np.flatnonzero(mask)
+        
+        if query and len(row_ids):
+            scores = self._get_scorer('tfidf').score(self.preprocessor.preprocess(self._apply_synonym_normalization(query.lower())))
+            row_ids = row_ids[np.argsort(-scores[row_ids], kind='stable')]
+        
+        page_ids = row_ids[offset:offset + limit]
+        if columns is None:
+            page = self.df.iloc[page_ids]
+        else:
+            page = self.df.iloc[page_ids, self.df.columns.get_indexer(list(columns))]
+        
+        return BrowseResult(page, len(row_ids), facet_counts)
@@ -0,0 +1,87 @@
+# ============================================================================
+# PENYIMPANAN KOLOM RINGKAS (MODE LEAN MEMORY)
+# ============================================================================
+# Setelah index dibangun, kolom metadata panjang hanya dibutuhkan oleh jalur
+# yang jarang dipakai (verifikasi fallback search, BM25 yang dibangun lazy).
+# Kolom seperti itu disimpan sebagai blok-blok teks terkompresi zlib dan hanya
+# blok yang dibutuhkan yang didekompresi. Kolom tampilan yang nilainya banyak
+# berulang (kategori, kategori harga, fasilitas, ...) disimpan sebagai categorical.
+
+import zlib
+
+import pandas as pd
+
+
+# Kolom dengan rasio nilai unik / jumlah baris di bawah ini dijadikan categorical
+MAX_CATEGORICAL_RATIO = 0.5
+
+# Level kompresi zlib (trade-off ukuran vs waktu kompresi saat load)
+COMPRESSION_LEVEL = 6
+
+# Jumlah baris per blok terkompresi (blok besar = rasio kompresi lebih baik,
+# blok kecil = lebih sedikit teks yang didekompresi untuk membaca beberapa baris)
+BLOCK_ROWS = 16
+
+
+class CompressedText:
+    """Kolom teks read-only yang disimpan sebagai blok-blok zlib.
+
+    Setiap blok berisi `block_rows` baris yang digabung dengan '\n' (newline di
+    dalam teks diganti spasi), sehingga posisi baris tetap sama dengan DataFrame asal.
+
+    Attributes:
+        size (int): Jumlah baris
+        block_rows (int): Jumlah baris per blok
+    """
+
+    def __init__(self, texts, level=COMPRESSION_LEVEL, block_rows=BLOCK_ROWS):
+        texts = ['' if pd.isna(text) else str(text).replace('\n', ' ') for text in texts]
+        if not texts:
+            raise ValueError("Kolom teks kosong!")
+
+        self.size = len(texts)
+        self.block_rows = block_rows
+        self._blocks = [
+            zlib.compress('\n'.join(texts[start:start + block_rows]).encode('utf-8'), level)
+            for start in range(0, len(texts), block_rows)
+        ]
+
+    def __len__(self):
+        return self.size
+
+    def _block(self, block):
+        return zlib.decompress(self._blocks[block]).decode('utf-8').split('\n')
+
+    def values(self):
+        """Seluruh baris (semua blok didekompresi)"""
+        return [text for block in range(len(self._blocks)) for text in self._block(block)]
+
+    def iter_rows(self, row_ids):
+        """Teks baris `row_ids` secara lazy (setiap blok didekompresi paling banyak sekali)"""
+        blocks = {}
+        for row_id in row_ids:
+            block, offset = divmod(int(row_id), self.block_rows)
+            if block not in blocks:
+                blocks[block] = self._block(block)
+            yield blocks[block][offset]
+
+    @property
+    def nbytes(self):
+        return sum(len(block) for block in self._blocks)
+
+
+def compact_columns(df, max_ratio=MAX_CATEGORICAL_RATIO):
+    """Mengubah kolom teks yang nilainya banyak berulang menjadi categorical (in-place).
+
+    Returns:
+        list: Nama kolom yang diubah
+    """
+    converted = []
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype) or not pd.api.types.is_string_dtype(series.dtype):
+            continue
+        if series.nunique(dropna=True) <= max_ratio * len(series):
+            df[column] = series.astype('category')
+            converted.append(column)
+    return converted
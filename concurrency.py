@@ -0,0 +1,90 @@
+# ============================================================================
+# GERBANG KONKURENSI QUERY
+# ============================================================================
+# Membatasi jumlah query yang diproses bersamaan oleh satu engine (e.g., satu
+# engine ter-cache yang dipakai semua thread session Streamlit). Query yang
+# datang saat gerbang penuh menunggu giliran, atau ditolak jika melewati
+# timeout. Statistik antrean dicatat untuk mengukur lock contention.
+
+import threading
+import time
+
+
+class QueryGateTimeout(RuntimeError):
+    """Query ditolak karena gerbang konkurensi penuh melewati batas waktu tunggu"""
+
+
+class QueryGate:
+    """Gerbang BoundedSemaphore dengan statistik antrean.
+
+    Dipakai sebagai context manager:
+
+        with gate:
+            ...  # paling banyak `max_concurrent` thread berada di sini
+
+    Attributes:
+        max_concurrent (int): Jumlah query maksimal yang berjalan bersamaan
+        timeout (float): Batas waktu tunggu giliran dalam detik (None = tunggu terus)
+    """
+
+    def __init__(self, max_concurrent, timeout=None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent minimal 1!")
+
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def __enter__(self):
+        # Percobaan tanpa menunggu dulu: jika gagal, query ini mengalami contention
+        if self._semaphore.acquire(blocking=False):
+            self._record(0.0, contended=False)
+            return self
+
+        start = time.perf_counter()
+        acquired = self._semaphore.acquire(timeout=self.timeout) if self.timeout is not None else self._semaphore.acquire()
+        waited = time.perf_counter() - start
+
+        if not acquired:
+            with self._stats_lock:
+                self._rejected += 1
+            raise QueryGateTimeout(f"Server sedang sibuk ({self.max_concurrent} query berjalan), coba lagi sebentar lagi.")
+
+        self._record(waited, contended=True)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._semaphore.release()
+        return False
+
+    def _record(self, waited, contended):
+        with self._stats_lock:
+            self._acquired += 1
+            if contended:
+                self._contended += 1
+                self._total_wait += waited
+                self._max_wait = max(self._max_wait, waited)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._acquired = 0
+            self._contended = 0
+            self._rejected = 0
+            self._total_wait = 0.0
+            self._max_wait = 0.0
+
+    def stats(self):
+        """Ringkasan antrean sejak reset terakhir"""
+        with self._stats_lock:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'acquired': self._acquired,
+                'contended': self._contended,
+                'rejected': self._rejected,
+                'contention_rate': self._contended / self._acquired if self._acquired else 0.0,
+                'total_wait_ms': self._total_wait * 1000,
+                'mean_wait_ms': self._total_wait / self._contended * 1000 if self._contended else 0.0,
+                'max_wait_ms': self._max_wait * 1000,
+            }
@@ -0,0 +1,119 @@
+# ============================================================================
+# SNAPSHOT STATISTIK DATASET
+# ============================================================================
+
+from collections import Counter
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from attribute_index import strip_attribute_wrapper
+from location_index import parse_district
+
+
+# ============================================================================
+# KELAS SNAPSHOT
+# ============================================================================
+
+@dataclass(frozen=True)
+class DatasetStatistics:
+    """Statistik dataset yang dihitung sekali setiap dataset dimuat.
+
+    Seluruh field bersifat read-only (mapping dibungkus `MappingProxyType`),
+    sehingga snapshot aman dibagikan ke semua session tanpa menyentuh DataFrame.
+
+    Attributes:
+        total_umkm (int): Jumlah restoran di dataset
+        total_kategori (int): Jumlah kategori unik
+        category_counts (Mapping): Jumlah restoran per kategori (urut terbanyak)
+        price_distribution (Mapping): Jumlah restoran per kategori harga
+        district_counts (Mapping): Jumlah restoran per kecamatan
+        facility_counts (Mapping): Jumlah restoran per fasilitas
+    """
+
+    total_umkm: int
+    total_kategori: int
+    category_counts: MappingProxyType
+    price_distribution: MappingProxyType
+    district_counts: MappingProxyType
+    facility_counts: MappingProxyType
+
+    def top_categories(self, n=10):
+        """Daftar (kategori, jumlah) sebanyak n teratas"""
+        return list(self.category_counts.items())[:n]
+
+    def to_dict(self):
+        """Format dict untuk konsumen API (kompatibel dengan `get_statistics`)"""
+        return {
+            'total_umkm': self.total_umkm,
+            'total_kategori': self.total_kategori,
+            'kategori_terbanyak': dict(self.top_categories(5)),
+            'harga_distribution': dict(self.price_distribution),
+            'kecamatan_distribution': dict(self.district_counts),
+            'fasilitas_distribution': dict(self.facility_counts),
+        }
+
+
+# ============================================================================
+# FUNGSI PEMBANGUN SNAPSHOT
+# ============================================================================
+
+def _freeze(counts):
+    """Membungkus hasil hitungan menjadi mapping read-only"""
+    return MappingProxyType({key: int(count) for key, count in counts})
+
+
+def _count_multi_values(series):
+    """Menghitung nilai dari kolom multi-nilai (dipisah koma), seragam tanpa beda huruf besar/kecil.
+
+    Kata pembungkus dibuang agar 'Toilet tersedia' dihitung sebagai 'Toilet'.
+    """
+    counts = Counter()
+    spellings = {}
+
+    for value in series.dropna().astype(str):
+        seen = set()
+        for item in value.split(','):
+            item = item.strip()
+            stripped = strip_attribute_wrapper(item)
+            if stripped != item:
+                item = stripped[:1].upper() + stripped[1:]
+            key = item.lower()
+            if len(key) < 2 or key in seen:
+                continue
+            seen.add(key)
+            counts[key] += 1
+            spellings.setdefault(key, Counter())[item] += 1
+
+    return [(spellings[key].most_common(1)[0][0], count) for key, count in counts.most_common()]
+
+
+def _count_districts(alamat_series):
+    """Menghitung jumlah restoran per kecamatan dari teks alamat"""
+    counts = Counter()
+    for alamat in alamat_series.dropna().astype(str):
+        district = parse_district(alamat)
+        if district:
+            counts[district] += 1
+    return counts.most_common()
+
+
+def compute_statistics(df):
+    """Membangun snapshot statistik dari DataFrame dataset.
+
+    Args:
+        df (DataFrame): Dataset restoran
+
+    Returns:
+        DatasetStatistics: Snapshot statistik yang immutable
+    """
+    try:
+        return DatasetStatistics(
+            total_umkm=len(df),
+            total_kategori=int(df['kategori'].nunique()),
+            category_counts=_freeze(df['kategori'].value_counts().items()),
+            price_distribution=_freeze(df['kategori_harga'].value_counts().items()),
+            district_counts=_freeze(_count_districts(df['alamat'])),
+            facility_counts=_freeze(_count_multi_values(df['fasilitas'])),
+        )
+    except Exception as e:
+        raise Exception(f"Error menghitung statistik dataset: {str(e)}")
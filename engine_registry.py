@@ -0,0 +1,161 @@
+# ============================================================================
+# REGISTRY ENGINE MULTI-KOTA
+# ============================================================================
+# Beberapa dataset kota (e.g., Bandung, Cimahi, Jakarta) dilayani dari satu
+# proses. Bagian berat yang immutable dibagikan ke seluruh engine:
+# - TextPreprocessor: stemmer Sastrawi beserta cache stem-nya & stopwords
+# - Leksikon modul (SYNONYM_MAP, SEMANTIC_EXPANSION, LOCATION_EXPANSION)
+# Index per kota dibangun saat kota tersebut pertama kali di-query, dan kota
+# yang paling lama tidak dipakai dikeluarkan jika total memori melewati budget.
+
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from chatbot_engine import ChatbotEngine
+from preprocessing import TextPreprocessor
+
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'cities.json')
+
+
+def city_key(city):
+    """Key kota untuk routing: ' Bandung ' -> 'bandung'"""
+    return str(city).strip().lower()
+
+
+def estimate_engine_bytes(engine):
+    """Perkiraan memori satu engine (jumlah seluruh komponen `ChatbotEngine.memory_report`)"""
+    return sum(engine.memory_report().values())
+
+
+class EngineRegistry:
+    """Registry engine per kota dengan lazy loading dan eviksi LRU di bawah budget memori.
+
+    Attributes:
+        memory_budget (int): Batas total memori engine yang dimuat (bytes, None = tanpa batas)
+        engine_options (dict): Argumen default untuk setiap ChatbotEngine (e.g., retrieval_mode)
+    """
+
+    def __init__(self, memory_budget_mb=None, preprocessor=None, **engine_options):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024) if memory_budget_mb else None
+        self.engine_options = engine_options
+        self._preprocessor = preprocessor
+        self._datasets = {}
+        self._engines = OrderedDict()
+        self._engine_bytes = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_REGISTRY_PATH, **kwargs):
+        """Memuat daftar kota dari file JSON.
+
+        Format: {"memory_budget_mb": 512, "cities": {"bandung": {"dataset": "dataset/....csv"}}}
+        Path dataset relatif dihitung dari folder project. Opsi lain per kota
+        diteruskan ke ChatbotEngine (e.g., "retrieval_mode": "bm25").
+        """
+        try:
+            with open(path, encoding='utf-8') as f:
+                config = json.load(f)
+
+            kwargs.setdefault('memory_budget_mb', config.get('memory_budget_mb'))
+            registry = cls(**kwargs)
+            base_dir = os.path.dirname(os.path.dirname(os.path.abspath(path)))
+            for city, options in config['cities'].items():
+                options = dict(options)
+                dataset = options.pop('dataset')
+                registry.register(city, os.path.join(base_dir, dataset), **options)
+            return registry
+        except Exception as e:
+            raise Exception(f"Error memuat registry kota '{path}': {str(e)}")
+
+    @property
+    def preprocessor(self):
+        """TextPreprocessor bersama (dibuat saat kota pertama dimuat)"""
+        if self._preprocessor is None:
+            with self._lock:
+                if self._preprocessor is None:
+                    self._preprocessor = TextPreprocessor()
+        return self._preprocessor
+
+    @property
+    def cities(self):
+        return tuple(self._datasets)
+
+    @property
+    def loaded_cities(self):
+        """Kota yang index-nya sedang dimuat, dari yang paling lama tidak dipakai"""
+        with self._lock:
+            return tuple(self._engines)
+
+    def register(self, city, csv_path, **engine_options):
+        """Mendaftarkan dataset kota (index belum dibangun sampai kota tersebut dipakai)"""
+        key = city_key(city)
+        with self._lock:
+            self._datasets[key] = (csv_path, dict(self.engine_options, **engine_options))
+            self._load_locks.setdefault(key, threading.Lock())
+
+    def get(self, city):
+        """Engine untuk kota `city`; dimuat saat pertama kali diminta.
+
+        Raises:
+            ValueError: Jika kota belum didaftarkan
+        """
+        key = city_key(city)
+        if key not in self._datasets:
+            raise ValueError(f"Kota '{city}' belum terdaftar! Pilihan: {self.cities}")
+
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+
+        # Load per kota: kota lain tetap bisa dilayani selama index dibangun
+        with self._load_locks[key]:
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    self._engines.move_to_end(key)
+                    return engine
+
+            csv_path, options = self._datasets[key]
+            print(f"[INFO] Memuat engine kota '{key}' dari {csv_path}...")
+            engine = ChatbotEngine(csv_path, preprocessor=self.preprocessor, **options)
+            engine_bytes = estimate_engine_bytes(engine)
+
+            with self._lock:
+                self._engines[key] = engine
+                self._engine_bytes[key] = engine_bytes
+                self._evict_over_budget(keep=key)
+
+        return engine
+
+    def recommend(self, city, query, **kwargs):
+        """Routing query ke engine kota `city` (argumen lain diteruskan ke `recommend`)"""
+        return self.get(city).recommend(query, **kwargs)
+
+    def evict(self, city):
+        """Melepas index kota `city` dari memori (akan dimuat ulang saat dipakai lagi)"""
+        key = city_key(city)
+        with self._lock:
+            self._engines.pop(key, None)
+            self._engine_bytes.pop(key, None)
+
+    def memory_usage(self):
+        """Perkiraan memori per kota yang sedang dimuat (bytes)"""
+        with self._lock:
+            return dict(self._engine_bytes)
+
+    def _evict_over_budget(self, keep):
+        """Mengeluarkan kota yang paling lama tidak dipakai sampai total memori di bawah budget"""
+        if self.memory_budget is None:
+            return
+
+        while sum(self._engine_bytes.values()) > self.memory_budget and len(self._engines) > 1:
+            oldest = next(key for key in self._engines if key != keep)
+            self._engines.pop(oldest)
+            freed = self._engine_bytes.pop(oldest)
+            print(f"[INFO] Engine kota '{oldest}' dikeluarkan dari memori ({freed / 1024 / 1024:.1f} MB)")
@@ -0,0 +1,165 @@
+# ============================================================================
+# INDEX FACET (BITSET PER NILAI FACET)
+# ============================================================================
+# Setiap nilai facet (kategori, kategori harga, kecamatan, fasilitas) disimpan
+# sebagai bitset restoran yang dipadatkan ke array uint64 (64 restoran per
+# word). Filter gabungan dan jumlah restoran per nilai facet cukup dihitung
+# dengan AND/OR antar bitset + popcount, tanpa memindai teks dataset.
+
+import re
+
+import numpy as np
+
+
+FACET_NAMES = ('kategori', 'harga', 'kecamatan', 'fasilitas')
+
+_POPCOUNT_TABLE = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def facet_key(value):
+    """Key pencarian nilai facet: 'Wi-Fi' / 'wi fi' -> 'wifi', 'Bandung Wetan' -> 'bandungwetan'"""
+    return re.sub(r'[^a-z0-9]+', '', str(value).lower())
+
+
+def pack_mask(mask):
+    """Boolean mask -> bitset uint64 (bit ke-i = baris ke-i)"""
+    packed = np.packbits(np.asarray(mask, dtype=bool), bitorder='little')
+    padded = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    padded[:len(packed)] = packed
+    return padded.view(np.uint64)
+
+
+def unpack_bitset(bitset, size):
+    """Bitset uint64 -> boolean mask sepanjang `size`"""
+    return np.unpackbits(bitset.view(np.uint8), count=size, bitorder='little').astype(bool)
+
+
+def popcount(bitsets):
+    """Jumlah bit aktif per baris bitset (axis terakhir)"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(bitsets).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_TABLE[bitsets.view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+class Facet:
+    """Satu facet: daftar nilai beserta bitset restoran untuk setiap nilai.
+
+    Attributes:
+        name (str): Nama facet
+        labels (list): Label tampilan setiap nilai
+        bitsets (np.array): Bitset per nilai (jumlah nilai x jumlah word), uint64
+        match_all (bool): True jika beberapa nilai terpilih digabung dengan AND
+            (e.g., fasilitas: harus punya Wi-Fi DAN Parkiran), False untuk OR
+    """
+
+    def __init__(self, name, labels, masks, match_all=False):
+        self.name = name
+        self.labels = list(labels)
+        self.bitsets = np.array([pack_mask(mask) for mask in masks], dtype=np.uint64)
+        self.match_all = match_all
+        self._lookup = {facet_key(label): position for position, label in enumerate(self.labels)}
+
+    def positions(self, values):
+        """Posisi nilai facet untuk input user (string atau list string)"""
+        if isinstance(values, str):
+            values = [values]
+
+        positions = []
+        for value in values:
+            position = self._lookup.get(facet_key(value))
+            if position is None:
+                raise ValueError(f"Nilai '{value}' tidak dikenal untuk facet '{self.name}'!")
+            positions.append(position)
+        return positions
+
+    def filter_bitset(self, positions):
+        """Bitset restoran yang lolos filter facet ini"""
+        selected = self.bitsets[positions]
+        if self.match_all:
+            return np.bitwise_and.reduce(selected, axis=0)
+        return np.bitwise_or.reduce(selected, axis=0)
+
+
+class FacetIndex:
+    """Kumpulan facet untuk browse dengan filter gabungan & jumlah per nilai facet.
+
+    Attributes:
+        size (int): Jumlah restoran
+        facets (dict): Mapping nama facet -> Facet (urutan penambahan)
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.facets = {}
+        self._all_rows = pack_mask(np.ones(size, dtype=bool))
+
+    def add(self, name, labels, masks, match_all=False):
+        self.facets[name] = Facet(name, labels, masks, match_all)
+
+    def search(self, selection):
+        """Mask restoran yang cocok dengan seluruh filter, plus jumlah per nilai facet.
+
+        Nilai yang terpilih dalam satu facet digabung dengan OR (kecuali facet
+        `match_all`), antar facet dengan AND. Jumlah untuk facet OR dihitung
+        terhadap filter facet lain saja, sehingga UI tetap menampilkan berapa
+        restoran yang didapat jika user mengganti/menambah pilihan di facet tersebut.
+
+        Args:
+            selection (dict): Nama facet -> nilai terpilih (string atau list; None/kosong = semua)
+
+        Returns:
+            tuple: (mask restoran yang cocok, {facet: {label: jumlah}})
+
+        Raises:
+            ValueError: Jika nama facet atau nilainya tidak dikenal
+        """
+        for name in selection:
+            if name not in self.facets:
+                raise ValueError(f"Facet '{name}' tidak dikenal! Pilihan: {tuple(self.facets)}")
+
+        filters = {
+            name: facet.filter_bitset(facet.positions(selection[name]))
+            for name, facet in self.facets.items()
+            if selection.get(name)
+        }
+
+        matched = self._all_rows.copy()
+        for bitset in filters.values():
+            matched &= bitset
+
+        counts = {}
+        for name, facet in self.facets.items():
+            if facet.match_all:
+                base = matched
+            else:
+                base = self._all_rows.copy()
+                for other, bitset in filters.items():
+                    if other != name:
+                        base &= bitset
+            counts[name] = dict(zip(facet.labels, popcount(facet.bitsets & base).tolist()))
+
+        return unpack_bitset(matched, self.size), counts
+
+    @property
+    def nbytes(self):
+        return sum(facet.bitsets.nbytes for facet in self.facets.values())
+
+
+class BrowseResult:
+    """Hasil browse: satu halaman restoran, total yang cocok, dan jumlah per nilai facet.
+
+    Attributes:
+        page (DataFrame): Baris halaman yang diminta
+        total (int): Jumlah seluruh restoran yang cocok dengan filter
+        facets (dict): Nama facet -> {label nilai: jumlah restoran}
+    """
+
+    __slots__ = ('page', 'total', 'facets')
+
+    def __init__(self, page, total, facets):
+        self.page = page
+        self.total = total
+        self.facets = facets
+
+    def __len__(self):
+        return len(self.page)
@@ -0,0 +1,305 @@
+# ============================================================================
+# INDEX LOKASI (KECAMATAN & KELURAHAN TERKODE + GRAF KETETANGGAAN)
+# ============================================================================
+# Alamat bebas seperti "Jl. Cimanuk No.11, Kelurahan Citarum, Kecamatan Bandung
+# Wetan" diurai sekali saat load menjadi kode integer kecamatan, kelurahan,
+# dan nama jalan.
+# Filter lokasi per query cukup berupa perbandingan integer / mask yang sudah
+# dihitung, dan query "sekitar"/"dekat" (atau kecamatan tanpa data) memakai
+# kecamatan tetangga dari graf ketetanggaan.
+
+import re
+from collections import Counter
+
+import numpy as np
+
+
+DISTRICT_PATTERN = re.compile(r'kecamatan\s+([a-z ]+)', re.IGNORECASE)
+DISTRICT_TRAILING_WORDS = {'jawa', 'barat', 'kota', 'bandung'}
+
+VILLAGE_PATTERN = re.compile(r'kelurahan\s+([^,]+)', re.IGNORECASE)
+VILLAGE_SEGMENT_PATTERN = re.compile(r'[a-z. ]+')
+NON_VILLAGE_PREFIXES = ('jl', 'jalan', 'gg', 'gang', 'gedung', 'ruko', 'komplek', 'kompleks', 'bandung', 'seberang', 'belakang', 'depan')
+
+STREET_PATTERN = re.compile(r'^(?:jl\.?|jalan)\s+(.+?)(?:\s+(?:no\b|nomor\b|kav\b).*)?$', re.IGNORECASE)
+
+# Singkatan umum di alamat Google Maps
+ADDRESS_ABBREVIATIONS = {
+    'kb.': 'kebon',
+    'lb.': 'lebak',
+    'wr.': 'warung',
+    'ps.': 'pasar',
+    'lkr.': 'lingkar',
+    'sel.': 'selatan',
+}
+
+# Kata di query yang meminta hasil dari kecamatan sekitar
+NEARBY_TERMS = {'sekitar', 'sekitaran', 'dekat', 'deket'}
+
+# Kecamatan yang berbatasan langsung (Kota Bandung), cukup ditulis satu arah.
+# Graf dibuat simetris saat index dibangun.
+DISTRICT_ADJACENCY = {
+    'andir': ['cicendo', 'sukajadi', 'sumurbandung', 'astanaanyar', 'bojongloakaler', 'bandungkulon'],
+    'antapani': ['cibeunyingkidul', 'mandalajati', 'arcamanik', 'kiaracondong'],
+    'arcamanik': ['mandalajati', 'ujungberung', 'cinambo', 'gedebage', 'kiaracondong'],
+    'astanaanyar': ['sumurbandung', 'regol', 'bojongloakidul', 'bojongloakaler'],
+    'babakanciparay': ['bandungkulon', 'bojongloakaler', 'bojongloakidul'],
+    'bandungkidul': ['regol', 'lengkong', 'buahbatu', 'bojongloakidul'],
+    'bandungkulon': ['bojongloakaler'],
+    'bandungwetan': ['coblong', 'cibeunyingkaler', 'cibeunyingkidul', 'batununggal', 'sumurbandung', 'cicendo'],
+    'batununggal': ['sumurbandung', 'cibeunyingkidul', 'kiaracondong', 'buahbatu', 'lengkong'],
+    'bojongloakaler': ['bojongloakidul'],
+    'bojongloakidul': ['regol'],
+    'buahbatu': ['lengkong', 'kiaracondong', 'rancasari'],
+    'cibeunyingkaler': ['coblong', 'cibeunyingkidul'],
+    'cibeunyingkidul': ['kiaracondong', 'mandalajati'],
+    'cibiru': ['panyileukan', 'ujungberung'],
+    'cicendo': ['sukajadi', 'coblong', 'sumurbandung'],
+    'cidadap': ['sukasari', 'sukajadi', 'coblong'],
+    'cinambo': ['ujungberung', 'panyileukan', 'gedebage'],
+    'coblong': ['sukasari', 'sukajadi'],
+    'gedebage': ['rancasari', 'panyileukan'],
+    'kiaracondong': ['rancasari'],
+    'lengkong': ['regol', 'sumurbandung'],
+    'mandalajati': ['ujungberung'],
+    'panyileukan': ['ujungberung'],
+    'rancasari': [],
+    'regol': ['sumurbandung'],
+    'sukajadi': ['sukasari'],
+    'sukasari': [],
+    'sumurbandung': [],
+    'ujungberung': [],
+}
+
+
+# ============================================================================
+# PARSER ALAMAT
+# ============================================================================
+
+def location_key(name):
+    """Key ringkas untuk nama lokasi: lowercase tanpa spasi/tanda baca ('Sumur Bandung' -> 'sumurbandung')"""
+    return re.sub(r'[^a-z]', '', str(name).lower())
+
+
+def _expand_abbreviations(text):
+    words = [ADDRESS_ABBREVIATIONS.get(word.lower(), word) for word in text.split()]
+    return " ".join(words)
+
+
+def parse_district(alamat):
+    """Mengambil nama kecamatan terakhir yang disebut di alamat (atau None)"""
+    matches = DISTRICT_PATTERN.findall(str(alamat))
+    if not matches:
+        return None
+
+    words = matches[-1].split()
+    # Buang sisa alamat seperti 'Jawa Barat' (tapi pertahankan 'Sumur Bandung')
+    while len(words) > 1 and words[-1].lower() in DISTRICT_TRAILING_WORDS and words[-2].lower() != 'sumur':
+        words.pop()
+    return " ".join(words).title() or None
+
+
+def parse_village(alamat):
+    """Mengambil nama kelurahan dari alamat (atau None).
+
+    Memakai penanda "Kelurahan X" jika ada; jika tidak, segmen tepat sebelum
+    "Kecamatan ..." dipakai selama bukan nama jalan/gedung (e.g., "..., Braga, Kecamatan Sumur Bandung").
+    """
+    alamat = str(alamat)
+    matches = VILLAGE_PATTERN.findall(alamat)
+
+    if matches:
+        village = matches[-1]
+    else:
+        segments = [segment.strip() for segment in alamat.split(',')]
+        village = None
+        for position, segment in enumerate(segments):
+            if segment.lower().startswith('kecamatan') and position > 0:
+                candidate = segments[position - 1].lower()
+                if VILLAGE_SEGMENT_PATTERN.fullmatch(candidate) and not candidate.startswith(NON_VILLAGE_PREFIXES):
+                    village = segments[position - 1]
+        if village is None:
+            return None
+
+    village = re.sub(r'\s+', ' ', _expand_abbreviations(village)).strip()
+    return village.title() or None
+
+
+def parse_street(alamat):
+    """Mengambil nama jalan (tanpa gelar seperti 'Ir.', 'H.', 'Prof.') dari alamat (atau None)"""
+    for segment in str(alamat).split(','):
+        match = STREET_PATTERN.match(segment.strip())
+        if match:
+            words = [word for word in match.group(1).split() if not (word.endswith('.') and len(word) <= 5)]
+            street = " ".join(words).strip()
+            return street.title() or None
+    return None
+
+
+# ============================================================================
+# KELAS INDEX LOKASI
+# ============================================================================
+
+class LocationIndex:
+    """Kolom kecamatan & kelurahan terkode beserta mask yang dihitung sekali saat load.
+
+    Attributes:
+        district_keys (list): Key kecamatan (e.g., 'sumurbandung'); posisi = kode
+        district_names (dict): Key kecamatan -> nama tampilan (e.g., 'Sumur Bandung')
+        district_codes (np.array): Kode kecamatan per restoran (int16, -1 jika tidak diketahui)
+        village_keys (list): Key kelurahan; posisi = kode
+        village_codes (np.array): Kode kelurahan per restoran (int32, -1 jika tidak diketahui)
+        village_districts (dict): Key kelurahan -> key kecamatan tempat kelurahan berada
+        street_codes (np.array): Kode nama jalan per restoran (int32, -1 jika tidak diketahui)
+        neighbours (dict): Key kecamatan -> tuple key kecamatan tetangga
+    """
+
+    def __init__(self, alamat_series, district_aliases=None, adjacency=DISTRICT_ADJACENCY):
+        alamat_list = alamat_series.fillna('').astype(str).tolist()
+        districts = [parse_district(alamat) for alamat in alamat_list]
+        villages = [parse_village(alamat) for alamat in alamat_list]
+
+        # Kelurahan -> kecamatan dari daftar alias (untuk alamat tanpa "Kecamatan ...")
+        alias_districts = {}
+        for district_key, terms in (district_aliases or {}).items():
+            for term in terms:
+                alias_districts.setdefault(location_key(term), set()).add(district_key)
+
+        district_row_keys = []
+        for district, village in zip(districts, villages):
+            key = location_key(district) if district else None
+            if key is None and village:
+                inferred = alias_districts.get(location_key(village), set())
+                key = next(iter(inferred)) if len(inferred) == 1 else None
+            district_row_keys.append(key)
+
+        # Graf ketetanggaan simetris
+        neighbours = {key: set() for key in adjacency}
+        for key, adjacent in adjacency.items():
+            for other in adjacent:
+                neighbours[key].add(other)
+                neighbours.setdefault(other, set()).add(key)
+
+        self.district_keys = sorted(set(neighbours) | {key for key in district_row_keys if key})
+        self.neighbours = {key: tuple(sorted(neighbours.get(key, ()))) for key in self.district_keys}
+        district_lookup = {key: code for code, key in enumerate(self.district_keys)}
+
+        self.district_names = {key: key.title() for key in self.district_keys}
+        for district in districts:
+            if district:
+                self.district_names[location_key(district)] = district
+
+        self.district_codes = np.array(
+            [district_lookup[key] if key else -1 for key in district_row_keys], dtype=np.int16
+        )
+
+        village_row_keys = [location_key(village) if village else None for village in villages]
+        self.village_keys = sorted({key for key in village_row_keys if key})
+        self._village_lookup = {key: code for code, key in enumerate(self.village_keys)}
+        self.village_codes = np.array(
+            [self._village_lookup[key] if key else -1 for key in village_row_keys], dtype=np.int32
+        )
+
+        village_district_counts = {}
+        for village_key, district_key in zip(village_row_keys, district_row_keys):
+            if village_key and district_key:
+                village_district_counts.setdefault(village_key, Counter())[district_key] += 1
+        self.village_districts = {key: counts.most_common(1)[0][0] for key, counts in village_district_counts.items()}
+
+        street_row_keys = [location_key(parse_street(alamat) or '') or None for alamat in alamat_list]
+        self._street_lookup = {key: code for code, key in enumerate(sorted({key for key in street_row_keys if key}))}
+        self.street_codes = np.array(
+            [self._street_lookup[key] if key else -1 for key in street_row_keys], dtype=np.int32
+        )
+
+        # Mask per kecamatan & per kecamatan + tetangganya (perbandingan integer, sekali saat load)
+        self._district_masks = {key: self.district_codes == code for code, key in enumerate(self.district_keys)}
+        self._nearby_masks = {}
+        for key in self.district_keys:
+            mask = self._district_masks[key].copy()
+            for other in self.neighbours[key]:
+                mask |= self._district_masks[other]
+            self._nearby_masks[key] = mask
+
+    def __contains__(self, term):
+        key = location_key(term)
+        return key in self._district_masks or key in self._village_lookup or key in self._street_lookup
+
+    def is_district(self, term):
+        return location_key(term) in self._district_masks
+
+    def district_mask(self, term):
+        return self._district_masks[location_key(term)]
+
+    def nearby_mask(self, term):
+        """Mask kecamatan `term` beserta seluruh kecamatan tetangganya"""
+        return self._nearby_masks[location_key(term)]
+
+    def village_mask(self, term):
+        return self.village_codes == self._village_lookup[location_key(term)]
+
+    def street_mask(self, term):
+        return self.street_codes == self._street_lookup[location_key(term)]
+
+    def streets_containing_mask(self, term):
+        """Mask jalan yang key-nya memuat `term` (e.g., 'buahbatu' -> 'Jl. Terusan Buah Batu'), atau None"""
+        key = location_key(term)
+        codes = [code for street_key, code in self._street_lookup.items() if key in street_key]
+        if not key or not codes:
+            return None
+        return np.isin(self.street_codes, codes)
+
+    def neighbour_names(self, term):
+        """Nama tampilan kecamatan tetangga yang punya data"""
+        return [
+            self.district_names[other]
+            for other in self.neighbours.get(location_key(term), ())
+            if self._district_masks[other].any()
+        ]
+
+    def resolve(self, term, nearby=False):
+        """Mask lokasi untuk kecamatan/kelurahan/jalan `term`.
+
+        - Kecamatan: mask kecamatan tersebut, atau kecamatan + tetangganya jika
+          `nearby` atau kecamatan tersebut (dan jalan bernama sama) tidak punya data
+        - Kelurahan: mask kelurahan tersebut, atau seluruh kecamatannya jika `nearby`.
+          Kelurahan yang bernama sama dengan kecamatan (e.g., Kelurahan Batununggal di
+          Kecamatan Bandung Kidul) ikut digabungkan ke mask kecamatan
+        - Jalan yang namanya memuat `term` (e.g., 'Jl. Braga', 'Jl. Terusan Buah Batu')
+          selalu ikut digabungkan
+
+        Args:
+            term (str): Nama/key lokasi dari query (e.g., 'buahbatu', 'braga')
+            nearby (bool): Query meminta hasil di sekitar lokasi
+
+        Returns:
+            tuple or None: (mask, fallback) dengan fallback berupa daftar nama kecamatan
+                tetangga yang dipakai karena kecamatan kosong, atau None jika `term`
+                bukan kecamatan/kelurahan/jalan yang dikenal
+        """
+        key = location_key(term)
+        street_mask = self.streets_containing_mask(key)
+
+        if key in self._district_masks:
+            district_mask = self._district_masks[key]
+            if key in self._village_lookup:
+                district_mask = district_mask | self.village_mask(key)
+            if nearby:
+                mask = self._nearby_masks[key] | district_mask
+            elif not district_mask.any() and street_mask is None:
+                return self._nearby_masks[key], self.neighbour_names(key)
+            else:
+                mask = district_mask
+        elif key in self._village_lookup:
+            mask = self.village_mask(key)
+            district_key = self.village_districts.get(key)
+            if nearby and district_key:
+                mask = mask | self._district_masks[district_key]
+        elif street_mask is not None:
+            return street_mask, []
+        else:
+            return None
+
+        if street_mask is not None:
+            mask = mask | street_mask
+        return mask, []
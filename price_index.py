@@ -0,0 +1,231 @@
+# ============================================================================
+# INDEX HARGA NUMERIK (RANGE HARGA + QUERY BUDGET)
+# ============================================================================
+# Teks range_harga seperti "Rp. 25.000 - 50.000" atau "Rp. 250.000 +" diurai
+# sekali saat load menjadi kolom numerik harga minimum & maksimum, lengkap
+# dengan urutan terurut (argsort) untuk masing-masing kolom.
+# Ekspresi budget di query ("di bawah 30 ribu", "50rb-an", "25k - 50k")
+# diurai menjadi rentang harga, lalu dijawab dengan binary search
+# (np.searchsorted) di atas kolom terurut tanpa operasi string per baris.
+
+import math
+import re
+from dataclasses import dataclass
+
+import numpy as np
+
+
+PRICE_UNITS = {
+    'ribu': 1000,
+    'rebu': 1000,
+    'rb': 1000,
+    'k': 1000,
+    'juta': 1000000,
+    'jt': 1000000,
+}
+
+_UNIT = '|'.join(sorted(PRICE_UNITS, key=len, reverse=True))
+_END = r'(?![a-z0-9])'
+
+
+def _amount(tag):
+    """Pola nominal (setelah clean_text: "Rp. 30.000" -> "rp 30 000") dengan group bernama `tag`"""
+    return rf'(?P<{tag}_rp>rp\s*)?(?P<{tag}>\d+(?:\s000)*)\s*(?P<{tag}_unit>{_UNIT})?'
+
+
+PRICE_BETWEEN_PATTERN = re.compile(
+    rf'\b(?:antara\s+)?{_amount("low")}\s+(?P<connector>(?:sampai|sampe|hingga|s\s?d|dan|ke)\s+)?{_amount("high")}{_END}'
+)
+PRICE_UPPER_PATTERN = re.compile(
+    rf'\b(?:di\s*bawah|kurang\s+dari|maksimal|maks|max|budget|bujet|cuma|hanya|under|sampai|sampe)\s+{_amount("amount")}{_END}'
+)
+PRICE_LOWER_PATTERN = re.compile(
+    rf'\b(?:di\s*atas|lebih\s+dari|minimal|min|mulai\s+dari|mulai|over)\s+{_amount("amount")}{_END}'
+)
+PRICE_AROUND_PATTERN = re.compile(
+    rf'\b(?:(?P<about>sekitar|kisaran|kurang\s+lebih)\s+)?{_amount("amount")}(?:\s?(?P<suffix>an))?{_END}'
+)
+
+
+# ============================================================================
+# PARSING RANGE HARGA & QUERY
+# ============================================================================
+
+def format_rupiah(value):
+    """Format nominal untuk pesan, e.g. 30000 -> 'Rp30.000'"""
+    return f"Rp{int(value):,}".replace(',', '.')
+
+
+def parse_price_range(text):
+    """Mengurai teks range_harga menjadi (harga minimum, harga maksimum).
+
+    "Rp. 25.000 - 50.000" -> (25000.0, 50000.0), "Rp. 250.000 +" -> (250000.0, inf).
+    Teks yang tidak bisa diurai menghasilkan (nan, nan).
+    """
+    text = str(text)
+    numbers = [float(n.replace('.', '')) for n in re.findall(r'\d[\d.]*\d|\d', text)]
+
+    if len(numbers) >= 2:
+        return min(numbers[:2]), max(numbers[:2])
+    if len(numbers) == 1:
+        return numbers[0], (math.inf if '+' in text else numbers[0])
+    return math.nan, math.nan
+
+
+@dataclass(frozen=True)
+class PriceQuery:
+    """Rentang budget dari query user.
+
+    Attributes:
+        low (float): Batas bawah harga (0 jika tidak ada)
+        high (float): Batas atas harga (inf jika tidak ada)
+        around (bool): True untuk "50rb-an"/"sekitar 50 ribu": restoran cocok jika
+            range harganya beririsan dengan rentang; False: range harga restoran
+            harus berada di dalam rentang
+    """
+
+    low: float = 0.0
+    high: float = math.inf
+    around: bool = False
+
+    @property
+    def label(self):
+        """Deskripsi singkat rentang untuk pesan warning"""
+        if self.around:
+            if self.low == self.high:
+                return f"sekitar {format_rupiah(self.low)}"
+            return f"{format_rupiah(self.low)}-an"
+        if self.low <= 0:
+            return f"di bawah {format_rupiah(self.high)}"
+        if math.isinf(self.high):
+            return f"di atas {format_rupiah(self.low)}"
+        return f"{format_rupiah(self.low)} - {format_rupiah(self.high)}"
+
+
+def _match_amount(match, tag, default_multiplier=1000):
+    """Nominal rupiah dari group `tag`; angka kecil tanpa satuan dianggap ribuan ("di bawah 30")"""
+    value = float(match.group(tag).replace(' ', ''))
+    unit = match.group(f'{tag}_unit')
+    if unit:
+        return value * PRICE_UNITS[unit]
+    return value * default_multiplier if value < 1000 else value
+
+
+def _is_explicit_amount(match, tag):
+    """Nominal yang jelas berupa harga: ada satuan, awalan 'rp', atau kelipatan ribuan"""
+    if match.group(f'{tag}_unit') or match.group(f'{tag}_rp'):
+        return True
+    value = float(match.group(tag).replace(' ', ''))
+    return value >= 1000 and value % 1000 == 0
+
+
+def _price_band_step(value):
+    """Lebar rentang untuk "50rb-an" (puluhan ribu) atau "100rb-an" (ratusan ribu)"""
+    return 10 ** math.floor(math.log10(value)) if value > 0 else 0
+
+
+def parse_price_query(text):
+    """Mencari ekspresi budget di query yang sudah di-clean.
+
+    Contoh: "di bawah 30 ribu", "maksimal 50rb", "di atas 100k", "25rb sampai 50rb",
+    "rp 25 000 50 000", "50rb an", "sekitar 40 ribu", "makan 25k".
+
+    Args:
+        text (str): Query hasil `TextPreprocessor.clean_text` (lowercase, tanpa tanda baca)
+
+    Returns:
+        tuple: (PriceQuery atau None, teks query tanpa ekspresi harga)
+    """
+    match = PRICE_BETWEEN_PATTERN.search(text)
+    if match and (match.group('connector') or _is_explicit_amount(match, 'low')) and _is_explicit_amount(match, 'high'):
+        high = _match_amount(match, 'high')
+        # "25 sampai 50 ribu": satuan angka pertama mengikuti angka kedua
+        high_unit = match.group('high_unit')
+        low_multiplier = PRICE_UNITS[high_unit] if high_unit and not match.group('low_unit') else 1000
+        low = _match_amount(match, 'low', low_multiplier)
+        return PriceQuery(min(low, high), max(low, high)), _strip_match(text, match)
+
+    match = PRICE_UPPER_PATTERN.search(text)
+    if match:
+        return PriceQuery(high=_match_amount(match, 'amount')), _strip_match(text, match)
+
+    match = PRICE_LOWER_PATTERN.search(text)
+    if match:
+        return PriceQuery(low=_match_amount(match, 'amount')), _strip_match(text, match)
+
+    for match in PRICE_AROUND_PATTERN.finditer(text):
+        if match.group('suffix'):
+            value = _match_amount(match, 'amount')
+            return PriceQuery(value, value + _price_band_step(value) - 1, around=True), _strip_match(text, match)
+        if match.group('about') and _is_explicit_amount(match, 'amount'):
+            value = _match_amount(match, 'amount')
+            return PriceQuery(value, value, around=True), _strip_match(text, match)
+        if _is_explicit_amount(match, 'amount'):
+            # Nominal tanpa kata kunci ("makan 25k") dianggap budget maksimal
+            return PriceQuery(high=_match_amount(match, 'amount')), _strip_match(text, match)
+
+    return None, text
+
+
+def _strip_match(text, match):
+    return re.sub(r'\s+', ' ', text[:match.start()] + ' ' + text[match.end():]).strip()
+
+
+# ============================================================================
+# KELAS INDEX HARGA
+# ============================================================================
+
+class PriceIndex:
+    """Kolom harga minimum & maksimum beserta urutan terurutnya.
+
+    Attributes:
+        min_prices (np.array): Harga minimum per restoran (float64, nan jika tidak diketahui)
+        max_prices (np.array): Harga maksimum per restoran (float64, inf untuk "Rp. 250.000 +")
+        min_order (np.array): Posisi baris terurut menurut harga minimum (int32, tanpa nan)
+        max_order (np.array): Posisi baris terurut menurut harga maksimum (int32, tanpa nan)
+        sorted_min (np.array): Harga minimum sesuai urutan `min_order`
+        sorted_max (np.array): Harga maksimum sesuai urutan `max_order`
+    """
+
+    def __init__(self, range_series):
+        values = [str(value) for value in range_series]
+        parsed = {value: parse_price_range(value) for value in set(values)}
+
+        self.min_prices = np.array([parsed[value][0] for value in values], dtype=np.float64)
+        self.max_prices = np.array([parsed[value][1] for value in values], dtype=np.float64)
+
+        known = np.flatnonzero(~np.isnan(self.min_prices))
+        self.min_order = known[np.argsort(self.min_prices[known], kind='stable')].astype(np.int32)
+        self.max_order = known[np.argsort(self.max_prices[known], kind='stable')].astype(np.int32)
+        self.sorted_min = self.min_prices[self.min_order]
+        self.sorted_max = self.max_prices[self.max_order]
+
+    def __len__(self):
+        return len(self.min_prices)
+
+    def _rows_min_at_least(self, value):
+        return self.min_order[np.searchsorted(self.sorted_min, value, side='left'):]
+
+    def _rows_min_at_most(self, value):
+        return self.min_order[:np.searchsorted(self.sorted_min, value, side='right')]
+
+    def _rows_max_at_least(self, value):
+        return self.max_order[np.searchsorted(self.sorted_max, value, side='left'):]
+
+    def _rows_max_at_most(self, value):
+        return self.max_order[:np.searchsorted(self.sorted_max, value, side='right')]
+
+    def mask(self, price_query):
+        """Mask restoran yang cocok dengan rentang budget (dua binary search + satu AND)"""
+        if price_query.around:
+            # Range harga restoran beririsan dengan rentang query
+            first, second = self._rows_min_at_most(price_query.high), self._rows_max_at_least(price_query.low)
+        else:
+            # Range harga restoran berada di dalam rentang query
+            first, second = self._rows_min_at_least(price_query.low), self._rows_max_at_most(price_query.high)
+
+        first_mask = np.zeros(len(self), dtype=bool)
+        second_mask = np.zeros(len(self), dtype=bool)
+        first_mask[first] = True
+        second_mask[second] = True
+        return first_mask & second_mask
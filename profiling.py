@@ -0,0 +1,172 @@
+# ============================================================================
+# PROFILING QUERY ON-DEMAND
+# ============================================================================
+# Merekam profil cProfile (dan opsional alokasi memori tracemalloc) untuk query
+# tertentu, per panggilan (`profile=True`) atau sampling acak dengan rate
+# tertentu. Setiap profil ditulis ke folder lokal dalam format standar:
+#   <nama>.prof        -> pstats / snakeviz (python -m pstats <nama>.prof)
+#   <nama>.tracemalloc -> tracemalloc.Snapshot.load(...) (jika memory=True)
+#   <nama>.json        -> query, parameter, latency, fungsi & alokasi teratas
+# Jika profiler tidak aktif, engine hanya melakukan satu pengecekan boolean.
+# Query dianonimkan seperti di query log (tanpa URL, email, atau nomor panjang)
+# sebelum dipakai di nama file maupun metadata.
+
+import cProfile
+import json
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+from query_log import anonymize_query
+
+
+DEFAULT_PROFILE_DIR = 'profiles'
+
+# Jumlah fungsi / lokasi alokasi teratas yang diringkas di metadata JSON
+TOP_ENTRIES = 15
+
+
+def profile_slug(query, max_length=40):
+    """Bagian nama file dari query (anonim): 'Kopi murah di Dago! 08123456789' -> 'kopi-murah-di-dago'"""
+    slug = re.sub(r'[^a-z0-9]+', '-', anonymize_query(query)).strip('-')
+    return slug[:max_length].rstrip('-') or 'query'
+
+
+def top_functions(profile, limit=TOP_ENTRIES):
+    """Fungsi dengan waktu kumulatif terbesar dari hasil cProfile"""
+    stats = pstats.Stats(profile).stats
+    ranked = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+    return [
+        {
+            'function': f"{os.path.basename(filename)}:{line}({name})",
+            'calls': calls,
+            'tottime_ms': round(tottime * 1000, 3),
+            'cumtime_ms': round(cumtime * 1000, 3),
+        }
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in ranked
+    ]
+
+
+def top_allocations(snapshot, limit=TOP_ENTRIES):
+    """Lokasi alokasi memori terbesar dari snapshot tracemalloc (tanpa alokasi mesin import)"""
+    snapshot = snapshot.filter_traces((
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        tracemalloc.Filter(False, tracemalloc.__file__),
+    ))
+    return [
+        {'location': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+        for stat in snapshot.statistics('lineno')[:limit]
+    ]
+
+
+class QueryProfiler:
+    """Perekam profil query ke folder lokal.
+
+    Hanya satu query yang diprofil pada satu waktu (cProfile & tracemalloc bersifat
+    global per proses); query lain yang terpilih saat profil sedang berjalan
+    diproses biasa tanpa profil.
+
+    Attributes:
+        output_dir (str): Folder tujuan file profil
+        sample_rate (float): Peluang setiap query diprofil otomatis (0 = hanya `profile=True`)
+        memory (bool): Ikut merekam alokasi memori dengan tracemalloc
+        last_path (str): Path dasar (tanpa ekstensi) profil terakhir yang ditulis
+    """
+
+    def __init__(self, output_dir=DEFAULT_PROFILE_DIR, sample_rate=0.0, memory=False):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate harus di antara 0 dan 1!")
+
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.memory = memory
+        self.last_path = None
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self._sequence = 0
+
+    def should_sample(self):
+        return self.sample_rate > 0.0 and self._random.random() < self.sample_rate
+
+    def run(self, fn, query, params):
+        """Menjalankan `fn()` sambil merekam profilnya.
+
+        Args:
+            fn (callable): Pekerjaan yang diprofil (e.g., pipeline rekomendasi)
+            query (str): Query yang diprofil (disimpan di metadata dalam bentuk anonim)
+            params (dict): Parameter panggilan (disimpan di metadata)
+
+        Returns:
+            Hasil `fn()`. Exception dari `fn` tetap diteruskan setelah profil ditulis.
+        """
+        query = anonymize_query(query)
+        if not self._lock.acquire(blocking=False):
+            print(f"[WARNING] Profil lain sedang berjalan, query '{query}' diproses tanpa profil")
+            return fn()
+
+        try:
+            trace_memory = self.memory and not tracemalloc.is_tracing()
+            if trace_memory:
+                tracemalloc.start()
+
+            profile = cProfile.Profile()
+            started_at = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+            error = None
+            start = time.perf_counter()
+            profile.enable()
+            try:
+                return fn()
+            except Exception as e:
+                error = str(e)
+                raise
+            finally:
+                profile.disable()
+                elapsed = time.perf_counter() - start
+                snapshot = peak = None
+                if trace_memory:
+                    snapshot = tracemalloc.take_snapshot()
+                    peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                self._write(profile, snapshot, peak, query, params, started_at, elapsed, error)
+        finally:
+            self._lock.release()
+
+    def _write(self, profile, snapshot, peak, query, params, started_at, elapsed, error):
+        """Menulis .prof, .tracemalloc, dan metadata .json untuk satu profil"""
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            self._sequence += 1
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._sequence:04d}-{profile_slug(query)}"
+            base_path = os.path.join(self.output_dir, name)
+
+            profile.dump_stats(f"{base_path}.prof")
+            metadata = {
+                'query': query,
+                'params': params,
+                'started_at': started_at,
+                'elapsed_ms': round(elapsed * 1000, 3),
+                'error': error,
+                'profile_file': f"{name}.prof",
+                'top_functions': top_functions(profile),
+            }
+
+            if snapshot is not None:
+                snapshot.dump(f"{base_path}.tracemalloc")
+                metadata['memory'] = {
+                    'peak_kb': round(peak / 1024, 1),
+                    'snapshot_file': f"{name}.tracemalloc",
+                    'top_allocations': top_allocations(snapshot),
+                }
+
+            with open(f"{base_path}.json", 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+
+            self.last_path = base_path
+            print(f"[INFO] Profil query '{query}' ({elapsed * 1000:.1f} ms) disimpan ke {base_path}.prof")
+        except OSError as e:
+            print(f"[WARNING] Gagal menyimpan profil query '{query}': {str(e)}")
@@ -0,0 +1,116 @@
+# ============================================================================
+# CACHE LRU THREAD-SAFE & HASIL PARSING QUERY
+# ============================================================================
+# Cache kecil berbatas jumlah entri yang dipakai bersama oleh semua thread
+# session: hasil rekomendasi (per versi ranking plan) dan hasil parsing query
+# (hanya bergantung pada teks query). Entri yang paling lama tidak dipakai
+# dibuang lebih dulu; jumlah hit/miss dicatat untuk memantau efektivitasnya.
+
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Cache LRU dengan lock (aman dipakai bersamaan oleh banyak thread).
+
+    Attributes:
+        maxsize (int): Jumlah entri maksimal
+    """
+
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("maxsize minimal 1!")
+
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        # Tanpa menghitung hit/miss & tanpa mengubah urutan LRU
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, default)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Ringkasan hit/miss sejak cache dibuat"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': self._hits / lookups if lookups else 0.0,
+            }
+
+
+class ParsedQuery:
+    """Hasil pemahaman query yang hanya bergantung pada teks query.
+
+    Dibagikan antar request (dan antar thread) lewat cache parsing, sehingga
+    perubahan filter harga sidebar, top_n, atau retrieval mode tidak mengulang
+    clean -> autocorrect -> sinonim -> ekspansi -> stemming -> ekstraksi filter
+    -> transform vectorizer. Objek ini tidak boleh diubah setelah dibuat.
+
+    Attributes:
+        raw_match_exists (bool): Query persis sama dengan nama restoran
+        price_range (PriceQuery): Rentang budget dari query (atau None)
+        query_corrected (str): Query setelah autocorrect (tanpa ekspresi budget)
+        query_display (str): Query yang ditampilkan ke user; sama dengan `query_corrected`,
+            kecuali query yang hanya berisi budget ("di bawah 30 ribu")
+        query_normalized (str): Query setelah normalisasi sinonim
+        query_expanded (str): Query setelah ekspansi semantik
+        processed_query (str): Query setelah stopword removal & stemming
+        skip_reason (str): Alasan query tidak diproses lebih lanjut (None jika diproses)
+        active_filters (tuple): Filter lokasi/fasilitas/suasana yang terdeteksi
+        detected_category (str): Kategori yang terdeteksi (atau None)
+        detected_tipe (str): Tipe pengunjung yang terdeteksi (atau None)
+        nearby (bool): Query meminta hasil di sekitar lokasi
+        query_vector (sparse matrix): Vektor TF-IDF query (None jika query dilewati)
+    """
+
+    __slots__ = (
+        'raw_match_exists', 'price_range', 'query_corrected', 'query_display', 'query_normalized',
+        'query_expanded', 'processed_query', 'skip_reason', 'active_filters',
+        'detected_category', 'detected_tipe', 'nearby', 'query_vector',
+    )
+
+    def __init__(self, raw_match_exists, price_range, query_corrected, query_normalized,
+                 query_expanded, processed_query, skip_reason=None):
+        self.raw_match_exists = raw_match_exists
+        self.price_range = price_range
+        self.query_corrected = query_corrected
+        self.query_display = query_corrected
+        self.query_normalized = query_normalized
+        self.query_expanded = query_expanded
+        self.processed_query = processed_query
+        self.skip_reason = skip_reason
+        self.active_filters = ()
+        self.detected_category = None
+        self.detected_tipe = None
+        self.nearby = False
+        self.query_vector = None
@@ -0,0 +1,141 @@
+# ============================================================================
+# LOG QUERY ANONIM (UNTUK WARM-UP CACHE)
+# ============================================================================
+# Menyimpan query yang sudah dinormalisasi beserta frekuensinya, tanpa
+# identitas session, waktu, atau data pribadi (URL, email, nomor panjang
+# seperti nomor telepon dibuang). Query terpopuler diputar ulang saat startup
+# atau setelah hot reload agar request pertama user langsung kena cache hangat.
+#
+# Format file:
+#   {"version": 1, "queries": {"kopi": 120, "ramen di dago": 35, ...}}
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+
+
+QUERY_LOG_VERSION = 1
+
+# Panjang maksimal query yang dicatat (query yang lebih panjang dipotong per kata)
+MAX_LOGGED_QUERY_LENGTH = 80
+
+# Angka sepanjang ini atau lebih dianggap data pribadi (nomor telepon, NIK, ...)
+MIN_PRIVATE_DIGITS = 6
+
+
+def anonymize_query(query):
+    """Normalisasi query untuk log: huruf kecil, tanpa tanda baca & data pribadi.
+
+    'Kopi  Murah di Dago!' -> 'kopi murah di dago'
+    'sate 0812345678 ya'   -> 'sate ya'
+
+    Returns:
+        str: Query ternormalisasi ('' jika tidak ada yang layak dicatat)
+    """
+    if not isinstance(query, str):
+        return ''
+
+    text = query.lower()
+    text = re.sub(r'http\S+|www\S+|\S+@\S+', ' ', text)
+    text = re.sub(r'\d{%d,}' % MIN_PRIVATE_DIGITS, ' ', text)
+    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    words = text.split()
+
+    kept = []
+    length = 0
+    for word in words:
+        length += len(word) + (1 if kept else 0)
+        if length > MAX_LOGGED_QUERY_LENGTH:
+            break
+        kept.append(word)
+
+    normalized = ' '.join(kept)
+    return normalized if len(normalized) >= 2 else ''
+
+
+class QueryLog:
+    """Frekuensi query anonim, opsional disimpan ke file JSON.
+
+    Attributes:
+        path (str): File JSON log (None = hanya di memori)
+        max_entries (int): Jumlah query unik maksimal; query paling jarang dibuang lebih dulu
+        flush_every (int): Log ditulis ke file setiap sekian query baru
+    """
+
+    def __init__(self, path=None, max_entries=2000, flush_every=25):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self._counts = Counter()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+        if path and os.path.isfile(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._counts)
+
+    def record(self, query):
+        """Mencatat satu query (dinormalisasi & dianonimkan lebih dulu)"""
+        normalized = anonymize_query(query)
+        if not normalized:
+            return
+
+        with self._lock:
+            self._counts[normalized] += 1
+            if len(self._counts) > self.max_entries:
+                self._counts = Counter(dict(self._counts.most_common(self.max_entries * 3 // 4)))
+            self._pending += 1
+            flush = self.path is not None and self._pending >= self.flush_every
+
+        if flush:
+            self.save()
+
+    def top(self, n):
+        """`n` query terpopuler, dari yang paling sering"""
+        with self._lock:
+            return [query for query, _ in self._counts.most_common(n)]
+
+    def counts(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def load(self):
+        """Memuat frekuensi dari file (ditambahkan ke frekuensi yang sudah ada)"""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+
+            if data.get('version') != QUERY_LOG_VERSION:
+                print(f"[WARNING] Versi query log '{self.path}' tidak dikenal, diabaikan")
+                return
+
+            with self._lock:
+                for query, count in data.get('queries', {}).items():
+                    normalized = anonymize_query(query)
+                    if normalized:
+                        self._counts[normalized] += int(count)
+        except Exception as e:
+            raise Exception(f"Error memuat query log '{self.path}': {str(e)}")
+
+    def save(self):
+        """Menulis log ke file (file sementara lalu rename, aman dari penulisan setengah jadi)"""
+        if self.path is None:
+            return
+
+        with self._lock:
+            data = {'version': QUERY_LOG_VERSION, 'queries': dict(self._counts.most_common())}
+            self._pending = 0
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp-{os.getpid()}-{threading.get_ident()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[WARNING] Gagal menyimpan query log '{self.path}': {str(e)}")
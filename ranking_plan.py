@@ -0,0 +1,211 @@
+# ============================================================================
+# RANKING PLAN - ATURAN & BOBOT RANKING DEKLARATIF
+# ============================================================================
+
+import json
+import os
+
+import numpy as np
+
+
+DEFAULT_PLAN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'ranking_plan.json')
+
+
+# ============================================================================
+# KONTEKS QUERY
+# ============================================================================
+
+class RankingContext:
+    """State satu query yang dibagikan ke seluruh tahap ranking.
+
+    Setiap tahap membaca input query dari konteks, menambah skor secara vektor
+    pada `scores`, dan menyimpan mask antara di `masks` sehingga tahap lain
+    (dan warning) tidak perlu menghitung ulang mask yang sama.
+
+    Jika `rows` diisi (kandidat dari fase candidate generation), `scores`
+    hanya berisi skor untuk baris-baris tersebut. Mask tetap dibangun untuk
+    seluruh dataset; tahap memakai `view(mask)` untuk mengambil bagian kandidat.
+
+    Attributes:
+        scores (np.array): Skor tiap restoran (atau tiap kandidat), dimodifikasi in-place oleh tiap tahap
+        rows (np.array): Posisi baris kandidat terurut naik, atau None untuk seluruh dataset
+        query (str): Query hasil autocorrect
+        query_normalized (str): Query setelah normalisasi sinonim
+        query_expanded (str): Query setelah ekspansi semantik
+        active_filters (list): Filter lokasi/fasilitas/suasana yang terdeteksi
+        price_filter (str): Filter harga dari sidebar ('Semua', 'Murah', ...)
+        masks (dict): Mask antar tahap, dengan key seperti ('location', 'dago')
+        detected_category (str): Kategori yang terdeteksi di query (atau None)
+        detected_tipe (str): Tipe pengunjung yang terdeteksi di query (atau None)
+        nearby (bool): Query meminta hasil di sekitar lokasi ("sekitar", "dekat")
+        location_fallbacks (dict): Filter lokasi -> kecamatan tetangga yang dipakai karena kecamatannya kosong
+        price_range (PriceQuery): Rentang budget numerik dari query (atau None)
+    """
+
+    def __init__(self, scores, query, query_normalized, query_expanded, active_filters, price_filter, rows=None):
+        self.scores = scores
+        self.rows = rows
+        self.query = query
+        self.query_normalized = query_normalized
+        self.query_expanded = query_expanded
+        self.active_filters = active_filters
+        self.price_filter = price_filter
+        self.masks = {}
+
+        self.detected_category = None
+        self.detected_tipe = None
+        self.nearby = False
+        self.location_fallbacks = {}
+        self.price_range = None
+        self.matched_category = None
+        self.strict_mode = False
+        self.is_murah = False
+        self.is_sedang = False
+        self.is_mahal = False
+
+    def mask(self, key, builder):
+        """Mengambil mask dari cache konteks, atau membangunnya sekali dengan `builder()`"""
+        cached = self.masks.get(key)
+        if cached is None:
+            cached = builder()
+            self.masks[key] = cached
+        return cached
+
+    def view(self, mask):
+        """Bagian mask (seukuran dataset) yang sejajar dengan `scores`"""
+        return mask if self.rows is None else mask[self.rows]
+
+    def positions(self, row_ids):
+        """Posisi di `scores` untuk baris dataset `row_ids` (baris di luar kandidat dibuang)"""
+        row_ids = np.asarray(row_ids, dtype=np.int64)
+        if self.rows is None:
+            return row_ids
+        positions = np.searchsorted(self.rows, row_ids)
+        in_range = positions < len(self.rows)
+        positions, row_ids = positions[in_range], row_ids[in_range]
+        return positions[self.rows[positions] == row_ids]
+
+    def row_ids(self, positions):
+        """Posisi baris dataset untuk posisi di `scores`"""
+        return positions if self.rows is None else self.rows[positions]
+
+    @property
+    def detected_price(self):
+        """Kategori harga yang aktif untuk query ini (atau None)"""
+        if self.is_murah:
+            return "Murah"
+        if self.is_sedang:
+            return "Sedang"
+        if self.is_mahal:
+            return "Mahal"
+        return None
+
+
+# ============================================================================
+# KELAS RANKING PLAN
+# ============================================================================
+
+class RankingPlan:
+    """Daftar tahap ranking beserta bobotnya, dimuat dari file konfigurasi JSON.
+
+    Plan bersifat immutable: mengubah bobot menghasilkan plan baru lewat
+    `with_weights`, sehingga engine cukup mengganti referensi plan secara atomik
+    tanpa membangun ulang index TF-IDF.
+
+    Selain bobot tahap, `weights` boleh berisi grup non-tahap seperti
+    'candidates' (budget kandidat) yang dibaca langsung oleh engine.
+
+    Attributes:
+        stages (tuple): Urutan nama tahap yang dijalankan
+        weights (dict): Bobot per tahap, e.g. {'location': {'match': 15.0, ...}}
+        version (int): Versi plan, bertambah setiap kali bobot diganti
+    """
+
+    def __init__(self, stages, weights, version=1):
+        self.stages = tuple(stages)
+        self.weights = {stage: dict(values) for stage, values in weights.items()}
+        self.version = version
+        self._validate()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_PLAN_PATH):
+        """Memuat ranking plan dari file JSON"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                config = json.load(f)
+            return cls(config['stages'], config['weights'], config.get('version', 1))
+        except Exception as e:
+            raise Exception(f"Error memuat ranking plan '{path}': {str(e)}")
+
+    def _validate(self):
+        """Validasi bahwa setiap tahap punya bobot dan semua bobot berupa angka"""
+        for stage in self.stages:
+            if stage not in self.weights:
+                raise ValueError(f"Bobot untuk tahap '{stage}' tidak ditemukan!")
+
+        for stage, values in self.weights.items():
+            for name, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"Bobot '{stage}.{name}' harus berupa angka!")
+
+    def with_weights(self, overrides):
+        """Membuat plan baru dengan sebagian bobot diganti.
+
+        Args:
+            overrides (dict): Bobot pengganti per tahap, e.g. {'location': {'match': 20.0}}
+
+        Returns:
+            RankingPlan: Plan baru dengan versi yang dinaikkan
+
+        Raises:
+            ValueError: Jika tahap atau nama bobot tidak dikenal
+        """
+        weights = {stage: dict(values) for stage, values in self.weights.items()}
+
+        for stage, values in overrides.items():
+            if stage not in weights:
+                raise ValueError(f"Tahap ranking '{stage}' tidak dikenal!")
+            for name, value in values.items():
+                if name not in weights[stage]:
+                    raise ValueError(f"Bobot '{stage}.{name}' tidak dikenal!")
+                weights[stage][name] = value
+
+        return RankingPlan(self.stages, weights, self.version + 1)
+
+    def compile(self, stage_functions):
+        """Menyusun plan menjadi daftar (nama, fungsi, bobot) yang siap dieksekusi.
+
+        Args:
+            stage_functions (dict): Mapping nama tahap -> fungsi `fn(context, weights)`
+
+        Returns:
+            CompiledRankingPlan: Plan terurut yang siap dijalankan per query
+        """
+        steps = []
+        for stage in self.stages:
+            if stage not in stage_functions:
+                raise ValueError(f"Tahap ranking '{stage}' tidak didukung engine!")
+            steps.append((stage, stage_functions[stage], self.weights[stage]))
+        return CompiledRankingPlan(self, steps)
+
+
+class CompiledRankingPlan:
+    """Plan yang sudah terikat ke fungsi tahap milik engine"""
+
+    def __init__(self, plan, steps):
+        self.plan = plan
+        self.steps = tuple(steps)
+
+    @property
+    def version(self):
+        return self.plan.version
+
+    @property
+    def weights(self):
+        return self.plan.weights
+
+    def run(self, context):
+        """Menjalankan seluruh tahap secara berurutan pada konteks query"""
+        for _, stage_fn, weights in self.steps:
+            stage_fn(context, weights)
+        return context
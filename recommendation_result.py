@@ -0,0 +1,87 @@
+# ============================================================================
+# HANDLE HASIL REKOMENDASI & CURSOR PAGINASI
+# ============================================================================
+
+import numpy as np
+
+
+# Kolom yang dibutuhkan UI untuk menampilkan kartu rekomendasi
+DISPLAY_COLUMNS = (
+    'nama_rumah_makan', 'alamat', 'kategori', 'menu',
+    'range_harga', 'kategori_harga', 'deskripsi'
+)
+
+
+# ============================================================================
+# KELAS HANDLE HASIL
+# ============================================================================
+
+class RecommendationResult:
+    """Handle ringkas hasil rekomendasi.
+
+    Hanya menyimpan posisi baris dan skor hasil ranking, bukan DataFrame.
+    Kolom tampilan diambil dari engine secara lazy lewat `ChatbotEngine.fetch_page`
+    atau `ResultCursor`, sehingga handle aman disimpan di session state.
+
+    Attributes:
+        row_ids (np.array): Posisi baris di dataset engine, urut sesuai ranking
+        scores (np.array): Skor akhir untuk setiap baris di `row_ids`
+        warning (str): Pesan warning untuk user (atau None)
+        corrected_query (str): Query setelah autocorrect
+    """
+
+    __slots__ = ('row_ids', 'scores', 'warning', 'corrected_query')
+
+    def __init__(self, row_ids, scores, warning=None, corrected_query=None):
+        self.row_ids = np.asarray(row_ids, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.warning = warning
+        self.corrected_query = corrected_query
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @property
+    def empty(self):
+        return len(self.row_ids) == 0
+
+    def cursor(self, engine, page_size=5, position=0):
+        """Membuat cursor paginasi di atas hasil ini"""
+        return ResultCursor(engine, self, page_size=page_size, position=position)
+
+
+# ============================================================================
+# KELAS CURSOR
+# ============================================================================
+
+class ResultCursor:
+    """Cursor untuk mengambil hasil rekomendasi per halaman.
+
+    Setiap pemanggilan `next_page` hanya mematerialisasi kolom tampilan untuk
+    baris di halaman tersebut.
+
+    Attributes:
+        position (int): Jumlah baris yang sudah diambil
+        page_size (int): Jumlah baris per halaman
+    """
+
+    def __init__(self, engine, result, page_size=5, position=0):
+        self.engine = engine
+        self.result = result
+        self.page_size = page_size
+        self.position = position
+
+    @property
+    def remaining(self):
+        """Jumlah baris yang belum diambil"""
+        return max(len(self.result) - self.position, 0)
+
+    @property
+    def has_more(self):
+        return self.remaining > 0
+
+    def next_page(self, limit=None):
+        """Mengambil halaman berikutnya sebagai DataFrame dan memajukan cursor"""
+        page = self.engine.fetch_page(self.result, self.position, limit or self.page_size)
+        self.position += len(page)
+        return page
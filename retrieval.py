@@ -0,0 +1,325 @@
+# ============================================================================
+# FIRST-STAGE SCORER (TF-IDF, LSA, BLEND, BM25)
+# ============================================================================
+# Setiap scorer menerima query yang sudah dipreprocess (`score(processed_query)`,
+# opsional beserta vektor TF-IDF query yang sudah di-cache: `query_vector=...`)
+# dan mengembalikan salah satu dari:
+# - np.array dense berisi satu skor per restoran, atau
+# - CandidateScores berisi skor hanya untuk dokumen kandidat.
+
+import threading
+from collections import Counter
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import normalize
+
+try:
+    # Kernel CSR x vektor milik scipy (API privat): menulis langsung ke buffer output
+    from scipy.sparse._sparsetools import csr_matvec
+except ImportError:
+    csr_matvec = None
+
+
+def _csr_matvec_works():
+    """Self-check saat import: hasil `csr_matvec` harus sama dengan `matrix @ vector`.
+
+    API privat bisa berubah signature/perilaku antar versi scipy; jika pengecekan
+    gagal (exception atau hasil berbeda), scorer memakai `matrix @ vector`.
+    """
+    if csr_matvec is None:
+        return False
+    try:
+        matrix = csr_matrix(np.array([[1.0, 0.0, 2.0], [0.0, 3.0, 0.0]], dtype=np.float32))
+        matrix.indptr = matrix.indptr.astype(np.int32)
+        matrix.indices = matrix.indices.astype(np.int32)
+        vector = np.array([0.5, 1.0, 2.0], dtype=np.float32)
+        output = np.zeros(matrix.shape[0], dtype=np.float32)
+        csr_matvec(matrix.shape[0], matrix.shape[1], matrix.indptr, matrix.indices, matrix.data, vector, output)
+        return bool(np.allclose(output, matrix @ vector))
+    except Exception as e:
+        print(f"[WARNING] Kernel csr_matvec scipy tidak kompatibel ({str(e)}), memakai matrix @ vector")
+        return False
+
+
+if not _csr_matvec_works():
+    csr_matvec = None
+
+
+RETRIEVAL_MODES = ('tfidf', 'lsa', 'blend', 'bm25')
+
+LSA_COMPONENTS = 100
+LSA_BLEND_WEIGHT = 0.5
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+# ============================================================================
+# SKOR KANDIDAT (SPARSE)
+# ============================================================================
+
+class CandidateScores:
+    """Skor sparse: hanya dokumen kandidat beserta skornya.
+
+    Attributes:
+        row_ids (np.array): Posisi baris kandidat, terurut naik (int32)
+        scores (np.array): Skor untuk setiap kandidat (float64)
+    """
+
+    __slots__ = ('row_ids', 'scores')
+
+    def __init__(self, row_ids, scores):
+        self.row_ids = np.asarray(row_ids, dtype=np.int32)
+        self.scores = np.asarray(scores, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    def to_dense(self, size):
+        dense = np.zeros(size)
+        dense[self.row_ids] = self.scores
+        return dense
+
+
+# ============================================================================
+# SCORER TF-IDF
+# ============================================================================
+
+def prepare_document_matrix(tfidf_matrix):
+    """Matrix dokumen CSR float32 yang setiap barisnya sudah dinormalisasi L2"""
+    matrix = normalize(tfidf_matrix.tocsr(), norm='l2', copy=True).astype(np.float32)
+    matrix.sort_indices()
+    matrix.indptr = matrix.indptr.astype(np.int32, copy=False)
+    matrix.indices = matrix.indices.astype(np.int32, copy=False)
+    return matrix
+
+
+class TfidfScorer:
+    """Skor cosine similarity antara vektor TF-IDF query dan seluruh dokumen.
+
+    Baris dokumen disimpan sebagai CSR float32 yang sudah dinormalisasi L2 dan
+    vektor query dari vectorizer juga ternormalisasi, sehingga cosine similarity
+    cukup berupa perkalian sparse matrix x vektor. Perkalian ditulis langsung ke
+    buffer output per thread yang dipakai ulang (tanpa validasi & alokasi per query).
+    """
+
+    name = 'tfidf'
+
+    def __init__(self, vectorizer, tfidf_matrix):
+        self.vectorizer = vectorizer
+        if tfidf_matrix.format != 'csr' or tfidf_matrix.dtype != np.float32:
+            tfidf_matrix = prepare_document_matrix(tfidf_matrix)
+        self.tfidf_matrix = tfidf_matrix
+        self._buffers = threading.local()
+
+    @property
+    def nbytes(self):
+        matrix = self.tfidf_matrix
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    def transform(self, processed_query):
+        """Vektor TF-IDF (sparse) untuk query"""
+        return self.vectorizer.transform([processed_query])
+
+    def _thread_buffers(self):
+        """Buffer (vektor query dense, skor output) milik thread pemanggil"""
+        buffers = getattr(self._buffers, 'value', None)
+        if buffers is None:
+            n_docs, n_features = self.tfidf_matrix.shape
+            buffers = (np.zeros(n_features, dtype=np.float32), np.zeros(n_docs, dtype=np.float32))
+            self._buffers.value = buffers
+        return buffers
+
+    def score_vector(self, query_vector):
+        """Mengembalikan array skor (satu nilai per restoran) dari vektor TF-IDF query.
+
+        Array yang dikembalikan adalah buffer milik thread pemanggil dan akan
+        ditimpa oleh query berikutnya di thread yang sama; salin jika perlu disimpan.
+        """
+        query_dense, scores = self._thread_buffers()
+        matrix = self.tfidf_matrix
+        terms = query_vector.indices
+
+        query_dense[terms] = query_vector.data
+        if csr_matvec is not None:
+            scores.fill(0.0)
+            csr_matvec(matrix.shape[0], matrix.shape[1], matrix.indptr, matrix.indices, matrix.data, query_dense, scores)
+        else:
+            scores[:] = matrix @ query_dense
+        query_dense[terms] = 0.0
+
+        return scores
+
+    def score(self, processed_query, query_vector=None):
+        if query_vector is None:
+            query_vector = self.transform(processed_query)
+        return self.score_vector(query_vector)
+
+
+# ============================================================================
+# SCORER LSA (LATENT SEMANTIC ANALYSIS)
+# ============================================================================
+
+class LsaScorer:
+    """Skor kemiripan di ruang laten hasil truncated SVD dari matrix TF-IDF.
+
+    Dokumen disimpan sebagai matrix dense float32 berdimensi rendah yang sudah
+    dinormalisasi L2, sehingga skor query cukup dihitung dengan satu perkalian
+    matrix-vektor kecil. Term yang sering muncul bersama (e.g., 'ramen' & 'udon')
+    ikut berdekatan walaupun tidak ada di SYNONYM_MAP.
+
+    Attributes:
+        components (np.array): Matrix proyeksi term -> ruang laten (k x jumlah fitur), float32
+        doc_vectors (np.array): Vektor laten dokumen (jumlah dokumen x k), float32
+        explained_variance (float): Proporsi varians TF-IDF yang tertangkap
+    """
+
+    name = 'lsa'
+
+    def __init__(self, tfidf_scorer, n_components=LSA_COMPONENTS, random_state=42):
+        self.tfidf_scorer = tfidf_scorer
+        tfidf_matrix = tfidf_scorer.tfidf_matrix
+        n_components = max(1, min(n_components, tfidf_matrix.shape[1] - 1, tfidf_matrix.shape[0] - 1))
+
+        svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+        doc_vectors = svd.fit_transform(tfidf_matrix)
+
+        self.components = svd.components_.astype(np.float32)
+        self.doc_vectors = self._normalize_rows(doc_vectors).astype(np.float32)
+        self.explained_variance = float(svd.explained_variance_ratio_.sum())
+
+    @staticmethod
+    def _normalize_rows(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    @property
+    def n_components(self):
+        return self.components.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.components.nbytes + self.doc_vectors.nbytes
+
+    def score(self, processed_query, query_vector=None):
+        if query_vector is None:
+            query_vector = self.tfidf_scorer.transform(processed_query)
+        return self.score_vector(query_vector)
+
+    def score_vector(self, query_vector):
+        """Mengembalikan array skor (satu nilai per restoran), dipotong ke rentang [0, 1]"""
+        latent_query = np.asarray(query_vector @ self.components.T, dtype=np.float32).ravel()
+        norm = np.linalg.norm(latent_query)
+        if norm == 0:
+            return np.zeros(self.doc_vectors.shape[0])
+
+        scores = self.doc_vectors @ (latent_query / norm)
+        return np.clip(scores, 0.0, 1.0).astype(np.float64)
+
+
+# ============================================================================
+# SCORER BLEND
+# ============================================================================
+
+class BlendedScorer:
+    """Kombinasi linear skor TF-IDF dan LSA"""
+
+    name = 'blend'
+
+    def __init__(self, tfidf_scorer, lsa_scorer, lsa_weight=LSA_BLEND_WEIGHT):
+        if not 0.0 <= lsa_weight <= 1.0:
+            raise ValueError("Bobot LSA harus di antara 0 dan 1!")
+
+        self.tfidf_scorer = tfidf_scorer
+        self.lsa_scorer = lsa_scorer
+        self.lsa_weight = lsa_weight
+
+    def score(self, processed_query, query_vector=None):
+        if query_vector is None:
+            query_vector = self.tfidf_scorer.transform(processed_query)
+        tfidf_scores = self.tfidf_scorer.score_vector(query_vector)
+        lsa_scores = self.lsa_scorer.score_vector(query_vector)
+        return (1.0 - self.lsa_weight) * tfidf_scores + self.lsa_weight * lsa_scores
+
+
+# ============================================================================
+# SCORER BM25 (INVERTED INDEX)
+# ============================================================================
+
+class Bm25Scorer:
+    """Skor BM25 di atas inverted index term -> posting list.
+
+    Bobot BM25 setiap posting (idf x saturasi tf dengan normalisasi panjang
+    dokumen) dihitung sekali saat build. Query hanya menyentuh posting list
+    dari term yang ada di query, sehingga latency bergantung pada panjang
+    posting list, bukan jumlah restoran. Hasilnya berupa CandidateScores yang
+    dinormalisasi ke [0, 1] (dibagi skor tertinggi) agar setara dengan skala cosine.
+
+    Attributes:
+        vocabulary (dict): Mapping term -> term id
+        indptr (np.array): Batas posting list per term (int64, gaya CSR)
+        postings (np.array): Posisi dokumen di setiap posting list (int32)
+        weights (np.array): Bobot BM25 setiap posting (float32)
+    """
+
+    name = 'bm25'
+
+    def __init__(self, documents, k1=BM25_K1, b=BM25_B):
+        term_docs = {}
+        doc_lengths = np.zeros(len(documents), dtype=np.float64)
+
+        for doc_id, text in enumerate(documents):
+            tokens = str(text).split()
+            doc_lengths[doc_id] = len(tokens)
+            for term, tf in Counter(tokens).items():
+                term_docs.setdefault(term, []).append((doc_id, tf))
+
+        n_docs = max(len(documents), 1)
+        avg_length = doc_lengths.mean() if len(documents) else 0.0
+        length_norm = k1 * (1.0 - b + b * doc_lengths / (avg_length or 1.0))
+
+        self.vocabulary = {}
+        indptr = [0]
+        postings, weights = [], []
+
+        for term_id, term in enumerate(sorted(term_docs)):
+            entries = term_docs[term]
+            doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int32)
+            tfs = np.array([tf for _, tf in entries], dtype=np.float64)
+
+            idf = np.log(1.0 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+            self.vocabulary[term] = term_id
+            postings.append(doc_ids)
+            weights.append((idf * tfs * (k1 + 1.0) / (tfs + length_norm[doc_ids])).astype(np.float32))
+            indptr.append(indptr[-1] + len(entries))
+
+        self.indptr = np.array(indptr, dtype=np.int64)
+        self.postings = np.concatenate(postings) if postings else np.array([], dtype=np.int32)
+        self.weights = np.concatenate(weights) if weights else np.array([], dtype=np.float32)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.postings.nbytes + self.weights.nbytes
+
+    def score(self, processed_query, query_vector=None):
+        """Mengembalikan CandidateScores untuk dokumen yang memuat minimal satu term query
+        (BM25 memakai term query langsung; `query_vector` diabaikan)"""
+        doc_parts, weight_parts = [], []
+
+        for term, qtf in Counter(processed_query.split()).items():
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            doc_parts.append(self.postings[start:end])
+            weight_parts.append(self.weights[start:end] * qtf)
+
+        if not doc_parts:
+            return CandidateScores([], [])
+
+        row_ids, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weight_parts))
+        return CandidateScores(row_ids, scores / scores.max())
@@ -0,0 +1,171 @@
+# ============================================================================
+# RIWAYAT CHAT PER SESSION (RINGKAS & TERBATAS)
+# ============================================================================
+
+import sys
+from collections import deque
+
+import numpy as np
+
+from recommendation_result import RecommendationResult
+
+
+# ============================================================================
+# KELAS RECORD PENCARIAN
+# ============================================================================
+
+class ChatTurn:
+    """Satu giliran pencarian dalam riwayat chat, disimpan dalam bentuk ringkas.
+
+    Hanya menyimpan query, posisi baris & skor hasil, warning, dan jumlah kartu
+    yang sedang ditampilkan. Kartu dibangun ulang dari engine bersama saat dirender;
+    blok HTML hasil render disimpan di record ini (ikut dihitung & dibuang bersamanya).
+
+    Attributes:
+        turn_id (int): ID unik giliran (dipakai untuk key widget Streamlit)
+        query (str): Input asli user
+        corrected_query (str): Query setelah autocorrect
+        row_ids (np.array): Posisi baris hasil di dataset engine
+        scores (np.array): Skor hasil (float32)
+        warning (str): Pesan warning (atau None)
+        display_count (int): Jumlah kartu yang sedang ditampilkan (posisi cursor)
+        rendered (tuple): (jumlah kartu, dengan pemisah, HTML) dari render terakhir, atau None
+    """
+
+    __slots__ = ('turn_id', 'query', 'corrected_query', 'row_ids', 'scores', 'warning', 'display_count', 'rendered')
+
+    def __init__(self, turn_id, query, result, display_count=5):
+        self.turn_id = turn_id
+        self.query = query
+        self.corrected_query = result.corrected_query
+        self.row_ids = np.asarray(result.row_ids, dtype=np.int32)
+        self.scores = np.asarray(result.scores, dtype=np.float32)
+        self.warning = result.warning
+        self.display_count = display_count
+        self.rendered = None
+
+    def __len__(self):
+        return len(self.row_ids)
+
+    @property
+    def empty(self):
+        return len(self.row_ids) == 0
+
+    @property
+    def remaining(self):
+        """Jumlah hasil yang belum ditampilkan"""
+        return max(len(self.row_ids) - self.display_count, 0)
+
+    def to_result(self):
+        """Mengembalikan handle hasil untuk diambil kartunya dari engine"""
+        return RecommendationResult(self.row_ids, self.scores, self.warning, self.corrected_query)
+
+    def nbytes(self):
+        """Perkiraan memori record ini (byte)"""
+        size = self.row_ids.nbytes + self.scores.nbytes
+        for text in (self.query, self.corrected_query, self.warning):
+            if text:
+                size += sys.getsizeof(text)
+        if self.rendered is not None:
+            size += sys.getsizeof(self.rendered[2])
+        return size
+
+
+# ============================================================================
+# KELAS RIWAYAT CHAT
+# ============================================================================
+
+class ChatHistory:
+    """Riwayat pencarian satu session dengan batas jumlah giliran dan memori.
+
+    Jika batas terlampaui, giliran paling lama dibuang (eviction) terlebih dahulu.
+    Giliran terbaru selalu dipertahankan walaupun melebihi batas memori. Blok HTML
+    yang di-cache di setiap giliran ikut dihitung dalam batas memori.
+
+    Attributes:
+        max_turns (int): Jumlah giliran maksimal yang disimpan
+        max_bytes (int): Batas perkiraan memori seluruh giliran (byte)
+        evicted_count (int): Jumlah giliran yang sudah dibuang sejak session dimulai
+    """
+
+    def __init__(self, max_turns=20, max_bytes=64 * 1024):
+        if max_turns < 1:
+            raise ValueError("max_turns minimal 1!")
+
+        self.max_turns = max_turns
+        self.max_bytes = max_bytes
+        self.evicted_count = 0
+        self._turns = deque()
+        self._next_id = 0
+        self._total_bytes = 0
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __iter__(self):
+        return iter(self._turns)
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def append(self, query, result, display_count=5):
+        """Menambahkan hasil pencarian baru ke riwayat.
+
+        Args:
+            query (str): Input asli user
+            result (RecommendationResult): Handle hasil dari `ChatbotEngine.recommend`
+            display_count (int): Jumlah kartu awal yang ditampilkan
+
+        Returns:
+            ChatTurn: Record giliran yang baru ditambahkan
+        """
+        turn = ChatTurn(self._next_id, query, result, display_count)
+        self._next_id += 1
+
+        self._turns.append(turn)
+        self._total_bytes += turn.nbytes()
+        self._evict()
+        return turn
+
+    def get(self, turn_id):
+        """Mencari giliran berdasarkan ID (None jika sudah dibuang)"""
+        for turn in self._turns:
+            if turn.turn_id == turn_id:
+                return turn
+        return None
+
+    def expand(self, turn_id, step=5):
+        """Menambah jumlah kartu yang ditampilkan untuk satu giliran"""
+        turn = self.get(turn_id)
+        if turn is not None:
+            turn.display_count = min(turn.display_count + step, len(turn))
+        return turn
+
+    def store_rendered(self, turn, card_count, with_separator, html):
+        """Menyimpan blok HTML hasil render di giliran dan memperbarui hitungan memori.
+
+        Eviction tidak dijalankan di sini (riwayat bisa sedang di-iterasi saat render);
+        batas diterapkan ulang oleh `trim` atau `append` berikutnya.
+        """
+        self._total_bytes -= turn.nbytes()
+        turn.rendered = (card_count, with_separator, html)
+        self._total_bytes += turn.nbytes()
+
+    def trim(self):
+        """Menerapkan ulang batas jumlah & memori (e.g., setelah blok HTML bertambah besar)"""
+        self._evict()
+
+    def clear(self):
+        """Menghapus seluruh riwayat"""
+        self._turns.clear()
+        self._total_bytes = 0
+
+    def _evict(self):
+        """Membuang giliran paling lama sampai batas jumlah & memori terpenuhi"""
+        while len(self._turns) > 1 and (
+            len(self._turns) > self.max_turns or self._total_bytes > self.max_bytes
+        ):
+            evicted = self._turns.popleft()
+            self._total_bytes -= evicted.nbytes()
+            self.evicted_count += 1
@@ -0,0 +1,157 @@
+# ============================================================================
+# INDEX BERSAMA (MEMORY-MAPPED, READ-ONLY)
+# ============================================================================
+# Array index yang immutable (matrix TF-IDF, index LSA/BM25, mask statis,
+# kode lokasi/harga/atribut, bitset facet, index token) disimpan sebagai file
+# .npy di satu folder per versi dataset. Setiap proses (e.g., beberapa replika
+# Streamlit di host yang sama) membukanya dengan np.load(mmap_mode='r'),
+# sehingga page memorinya dibagikan OS antar proses dan memori privat per
+# replika tinggal state query.
+#
+# Struktur folder:
+#   <index_dir>/<fingerprint>/manifest.json
+#   <index_dir>/<fingerprint>/vectorizer.pkl
+#   <index_dir>/<fingerprint>/arrays/<nama>.npy
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+import numpy as np
+
+
+# Naikkan setiap kali slot array/grup index bersama bertambah atau berubah arti
+INDEX_FORMAT_VERSION = 3
+
+
+def dataset_fingerprint(csv_path, vectorizer_config, build_params=None):
+    """Hash isi dataset + konfigurasi vectorizer + versi format index.
+
+    Args:
+        build_params (dict, optional): Parameter & leksikon lain yang menentukan isi
+            array index (e.g., dimensi LSA, parameter BM25, alias lokasi). Harus bisa
+            diserialisasi JSON; set diurutkan agar hash stabil antar proses
+    """
+    digest = hashlib.sha1()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    digest.update(repr((INDEX_FORMAT_VERSION, vectorizer_config)).encode('utf-8'))
+    if build_params is not None:
+        digest.update(json.dumps(build_params, sort_keys=True, default=sorted).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def pack_group(group):
+    """Dict key -> array 1D menjadi (keys, array gabungan, indptr) gaya CSR"""
+    keys = list(group)
+    values = [np.asarray(group[key]) for key in keys]
+    indptr = np.zeros(len(values) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(value) for value in values])
+    flat = np.concatenate(values) if values else np.array([])
+    return keys, flat, indptr
+
+
+def unpack_group(keys, flat, indptr):
+    """Kebalikan `pack_group`: setiap value berupa view ke array gabungan (tanpa salinan)"""
+    return {key: flat[indptr[position]:indptr[position + 1]] for position, key in enumerate(keys)}
+
+
+class SharedIndex:
+    """Folder index read-only untuk satu versi dataset.
+
+    Attributes:
+        path (str): Folder index versi ini (<index_dir>/<fingerprint>)
+        fingerprint (str): Hash dataset + konfigurasi vectorizer
+    """
+
+    def __init__(self, index_dir, fingerprint):
+        self.index_dir = index_dir
+        self.fingerprint = fingerprint
+        self.path = os.path.join(index_dir, fingerprint)
+
+    def exists(self):
+        return os.path.isfile(os.path.join(self.path, 'manifest.json'))
+
+    def write(self, arrays, groups, vectorizer, metadata=None):
+        """Menulis index ke folder sementara lalu me-rename secara atomik.
+
+        Jika proses lain sudah lebih dulu menulis versi yang sama, hasil proses
+        ini dibuang dan index milik proses lain yang dipakai.
+
+        Args:
+            arrays (dict): Nama -> np.array
+            groups (dict): Nama -> dict (key -> array 1D), disimpan gaya CSR
+            vectorizer: Vectorizer TF-IDF yang sudah di-fit
+            metadata (dict, optional): Data kecil tambahan (e.g., shape matrix)
+        """
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp-{os.getpid()}"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(os.path.join(tmp_path, 'arrays'))
+
+        try:
+            manifest = {
+                'format_version': INDEX_FORMAT_VERSION,
+                'fingerprint': self.fingerprint,
+                'arrays': sorted(arrays),
+                'groups': {},
+                'metadata': metadata or {},
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, 'arrays', f'{name}.npy'), np.ascontiguousarray(array))
+
+            for name, group in groups.items():
+                keys, flat, indptr = pack_group(group)
+                np.save(os.path.join(tmp_path, 'arrays', f'{name}.values.npy'), flat)
+                np.save(os.path.join(tmp_path, 'arrays', f'{name}.indptr.npy'), indptr)
+                manifest['groups'][name] = keys
+
+            with open(os.path.join(tmp_path, 'vectorizer.pkl'), 'wb') as f:
+                pickle.dump(vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            # Manifest ditulis terakhir: folder tanpa manifest dianggap belum selesai
+            with open(os.path.join(tmp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+
+            os.rename(tmp_path, self.path)
+        except OSError:
+            if not self.exists():
+                raise
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def remove(self):
+        """Menghapus folder versi ini (proses yang sudah membuka array-nya tetap memakai file lama)"""
+        stale_path = f"{self.path}.stale-{os.getpid()}"
+        try:
+            os.rename(self.path, stale_path)
+        except OSError:
+            # Sudah dihapus atau diganti proses lain
+            return
+        shutil.rmtree(stale_path, ignore_errors=True)
+
+    def load(self):
+        """Membuka seluruh array index secara memory-mapped (read-only).
+
+        Returns:
+            tuple: (arrays {nama: np.memmap}, groups {nama: {key: view}}, metadata dict)
+        """
+        with open(os.path.join(self.path, 'manifest.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+
+        def open_array(name):
+            return np.load(os.path.join(self.path, 'arrays', f'{name}.npy'), mmap_mode='r')
+
+        arrays = {name: open_array(name) for name in manifest['arrays']}
+        groups = {
+            name: unpack_group(keys, open_array(f'{name}.values'), np.asarray(open_array(f'{name}.indptr')))
+            for name, keys in manifest['groups'].items()
+        }
+        return arrays, groups, manifest['metadata']
+
+    def load_vectorizer(self):
+        with open(os.path.join(self.path, 'vectorizer.pkl'), 'rb') as f:
+            return pickle.load(f)
@@ -0,0 +1,92 @@
+# ============================================================================
+# INDEX TRIGRAM KARAKTER (PENCARIAN SUBSTRING)
+# ============================================================================
+# Inverted index dari setiap 3 karakter berurutan ke baris yang memuatnya.
+# Baris yang memuat substring `term` pasti memuat seluruh trigram `term`,
+# sehingga irisan posting list trigram-trigram tersebut adalah kandidat yang
+# lengkap; hanya kandidat itu yang perlu dicek ulang dengan `term in text`.
+# Biaya pencarian mengikuti panjang posting list, bukan ukuran katalog.
+
+import numpy as np
+
+
+# Panjang n-gram karakter (term yang lebih pendek tidak bisa difilter index)
+GRAM_LENGTH = 3
+
+
+def char_trigrams(text):
+    """Trigram unik dari teks: 'kopi' -> {'kop', 'opi'}"""
+    return {text[i:i + GRAM_LENGTH] for i in range(len(text) - GRAM_LENGTH + 1)}
+
+
+def _row_dtype(size):
+    """dtype posisi baris terkecil yang cukup untuk `size` baris"""
+    return np.uint16 if size <= np.iinfo(np.uint16).max + 1 else np.int32
+
+
+class TrigramIndex:
+    """Posting list trigram -> posisi baris (urut naik) dalam satu array datar.
+
+    Attributes:
+        size (int): Jumlah baris yang diindex
+        indptr (np.array): Batas posting list setiap trigram di `postings`
+        postings (np.array): Posisi baris untuk seluruh trigram (uint16 jika baris <= 65536)
+    """
+
+    def __init__(self, texts):
+        """
+        Args:
+            texts (iterable): Teks per baris yang sudah di-lowercase
+        """
+        rows_by_gram = {}
+        size = 0
+        for row_id, text in enumerate(texts):
+            for gram in char_trigrams(text):
+                rows_by_gram.setdefault(gram, []).append(row_id)
+            size += 1
+
+        self.size = size
+        self._slots = {gram: slot for slot, gram in enumerate(rows_by_gram)}
+        lengths = [len(rows) for rows in rows_by_gram.values()]
+        self.indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.postings = np.fromiter(
+            (row_id for rows in rows_by_gram.values() for row_id in rows),
+            dtype=_row_dtype(size), count=int(self.indptr[-1]),
+        )
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _posting(self, gram):
+        slot = self._slots.get(gram)
+        if slot is None:
+            return self.postings[:0]
+        return self.postings[self.indptr[slot]:self.indptr[slot + 1]]
+
+    def candidates(self, term):
+        """Posisi baris (urut naik) yang mungkin memuat `term`.
+
+        Hasil belum diverifikasi: baris yang memuat seluruh trigram `term` belum
+        tentu memuat `term` utuh.
+
+        Returns:
+            np.array: Kandidat baris, atau None jika `term` lebih pendek dari satu
+                trigram (index tidak bisa memfilter, seluruh baris harus dicek)
+        """
+        grams = char_trigrams(term)
+        if not grams:
+            return None
+
+        # Irisan dimulai dari posting list terpendek, berhenti begitu kosong
+        postings = sorted((self._posting(gram) for gram in grams), key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, posting, assume_unique=True)
+        return rows
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.postings.nbytes
@@ -0,0 +1,165 @@
+# ============================================================================
+# BENCHMARK RETRIEVAL MODE (LATENCY & RECALL)
+# ============================================================================
+# Membandingkan scorer tahap pertama TF-IDF, LSA, blend, dan BM25.
+#
+# Contoh:
+#   python utility/benchmark_retrieval.py --components 50 100 200 --k 10
+# ============================================================================
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chatbot_engine import ChatbotEngine  # noqa: E402
+from retrieval import RETRIEVAL_MODES, CandidateScores  # noqa: E402
+
+
+# Path absolut dari root repo agar utility bisa dijalankan dari direktori mana pun
+DEFAULT_DATASET = str(Path(__file__).resolve().parent.parent / 'dataset' / 'dataset-kuliner-umkm-optimized.csv')
+
+# Query berlabel: restoran dianggap relevan jika nama/menu mengandung salah satu term
+LABELED_QUERIES = [
+    ("ramen", ["ramen"]),
+    ("sushi", ["sushi"]),
+    ("kopi susu", ["kopi susu"]),
+    ("ayam geprek", ["geprek"]),
+    ("nasi goreng", ["nasi goreng"]),
+    ("steak", ["steak"]),
+    ("dimsum", ["dimsum", "dim sum"]),
+    ("bakso", ["bakso"]),
+    ("pasta", ["pasta", "spaghetti", "fettuccine", "carbonara"]),
+    ("es krim", ["ice cream", "es krim", "gelato"]),
+    ("sate", ["sate"]),
+    ("mie ayam", ["mie ayam"]),
+    ("pizza", ["pizza"]),
+    ("burger", ["burger"]),
+    ("roti bakar", ["roti bakar"]),
+    ("matcha latte", ["matcha"]),
+    ("bebek goreng", ["bebek"]),
+    ("seafood", ["seafood", "udang", "cumi", "kepiting"]),
+]
+
+
+def quiet(fn, *args, **kwargs):
+    """Menjalankan fungsi engine tanpa log ke stdout"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def relevant_rows(engine, terms):
+    """Posisi baris yang nama atau menunya mengandung salah satu term"""
+    mask = np.zeros(len(engine.df), dtype=bool)
+    for term in terms:
+        mask |= engine._name_menu_mask(term)
+    return set(np.flatnonzero(mask).tolist())
+
+
+def recall_at_k(ranked_ids, relevant, k):
+    if not relevant:
+        return None
+    hits = len(set(ranked_ids[:k]) & relevant)
+    return hits / min(k, len(relevant))
+
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q)) * 1000
+
+
+def benchmark_mode(engine, mode, k, repeat):
+    """Mengukur latency scorer & pipeline penuh serta recall@k untuk satu mode"""
+    scorer = quiet(engine._get_scorer, mode)
+    first_stage_times, pipeline_times = [], []
+    first_stage_recalls, pipeline_recalls = [], []
+    full_agreement = []
+
+    for query, terms in LABELED_QUERIES:
+        relevant = relevant_rows(engine, terms)
+        processed = engine.preprocessor.preprocess(engine._apply_synonym_normalization(query))
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scores = scorer.score(processed)
+            first_stage_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            result = quiet(engine.recommend, query, top_n=k, retrieval_mode=mode)
+            pipeline_times.append(time.perf_counter() - start)
+
+        # Bandingkan dengan scoring penuh (tanpa batas kandidat)
+        budget = engine.get_ranking_weights()['candidates']['budget']
+        quiet(engine.set_ranking_weights, {'candidates': {'budget': 0}})
+        full_result = quiet(engine.recommend, query, top_n=k, retrieval_mode=mode)
+        quiet(engine.set_ranking_weights, {'candidates': {'budget': budget}})
+        full_agreement.append(result.row_ids.tolist() == full_result.row_ids.tolist())
+
+        if isinstance(scores, CandidateScores):
+            first_stage_ids = scores.row_ids[np.argsort(-scores.scores, kind='stable')[:k]].tolist()
+        else:
+            first_stage_ids = np.argsort(-scores, kind='stable')[:k].tolist()
+        for recalls, ranked in ((first_stage_recalls, first_stage_ids), (pipeline_recalls, result.row_ids.tolist())):
+            value = recall_at_k(ranked, relevant, k)
+            if value is not None:
+                recalls.append(value)
+
+    return {
+        'first_stage_p50': percentile_ms(first_stage_times, 50),
+        'first_stage_p95': percentile_ms(first_stage_times, 95),
+        'pipeline_p50': percentile_ms(pipeline_times, 50),
+        'pipeline_p95': percentile_ms(pipeline_times, 95),
+        'first_stage_recall': float(np.mean(first_stage_recalls)),
+        'pipeline_recall': float(np.mean(pipeline_recalls)),
+        'full_agreement': float(np.mean(full_agreement)),
+    }
+
+
+def index_kilobytes(engine, mode):
+    """Ukuran index yang dipakai scorer (KB)"""
+    if mode in ('lsa', 'blend'):
+        return engine.scorers['lsa'].nbytes / 1024
+    if mode == 'bm25':
+        return engine.scorers['bm25'].nbytes / 1024
+    matrix = engine.tfidf_matrix
+    return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark latency & recall retrieval mode TF-IDF / LSA / blend / BM25")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--components', type=int, nargs='+', default=[100])
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = quiet(ChatbotEngine, args.dataset)
+
+    print(f"{'mode':<14}{'dim':>6}{'score p50':>12}{'score p95':>12}{'pipe p50':>11}{'pipe p95':>11}"
+          f"{'recall@' + str(args.k) + ' 1st':>15}{'recall@' + str(args.k) + ' final':>17}{'= full':>8}{'index KB':>10}")
+
+    for n_components in args.components:
+        quiet(engine.build_lsa_index, n_components)
+
+        for mode in RETRIEVAL_MODES:
+            if mode in ('tfidf', 'bm25') and n_components != args.components[0]:
+                continue
+
+            stats = benchmark_mode(engine, mode, args.k, args.repeat)
+            index_kb = index_kilobytes(engine, mode)
+            dim = str(engine.scorers['lsa'].n_components) if mode in ('lsa', 'blend') else '-'
+
+
+            print(f"{mode:<14}{dim:>6}{stats['first_stage_p50']:>10.3f}ms{stats['first_stage_p95']:>10.3f}ms"
+                  f"{stats['pipeline_p50']:>9.2f}ms{stats['pipeline_p95']:>9.2f}ms"
+                  f"{stats['first_stage_recall']:>15.3f}{stats['pipeline_recall']:>17.3f}{stats['full_agreement']:>8.0%}{index_kb:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
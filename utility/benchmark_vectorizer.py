@@ -0,0 +1,107 @@
+# ============================================================================
+# LAPORAN VECTORIZER (UKURAN INDEX, WAKTU BUILD & LATENCY QUERY)
+# ============================================================================
+# Membandingkan mode vectorizer 'fitted' dan 'hashing' dengan berbagai
+# n-gram & budget fitur. `--scale` menggandakan korpus untuk meniru
+# ukuran katalog target.
+#
+# Contoh:
+#   python utility/benchmark_vectorizer.py --scale 1 10 --features 1000 20000
+# ============================================================================
+
+import argparse
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_retrieval import DEFAULT_DATASET, LABELED_QUERIES, percentile_ms, quiet, recall_at_k, relevant_rows  # noqa: E402
+from chatbot_engine import ChatbotEngine  # noqa: E402
+from retrieval import TfidfScorer  # noqa: E402
+from vectorization import VECTORIZER_MODES, VectorizerConfig, vocabulary_size  # noqa: E402
+
+
+def parse_ngram(text):
+    low, high = text.split(',')
+    return int(low), int(high)
+
+
+def matrix_kilobytes(matrix):
+    return (matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes) / 1024
+
+
+def benchmark_config(engine, config, corpus, k, repeat):
+    """Build vectorizer pada korpus, lalu ukur ukuran, latency & recall@k tahap pertama"""
+    vectorizer = config.build()
+
+    start = time.perf_counter()
+    matrix = vectorizer.fit_transform(corpus)
+    build_seconds = time.perf_counter() - start
+
+    # Query hanya dinilai terhadap dokumen asli agar recall bisa dibandingkan antar skala
+    full_scorer = TfidfScorer(vectorizer, matrix)
+    scorer = TfidfScorer(vectorizer, matrix[:len(engine.df)])
+    times, recalls = [], []
+
+    for query, terms in LABELED_QUERIES:
+        processed = engine.preprocessor.preprocess(engine._apply_synonym_normalization(query))
+
+        for _ in range(repeat):
+            start = time.perf_counter()
+            full_scorer.score(processed)
+            times.append(time.perf_counter() - start)
+
+        ranked = np.argsort(-scorer.score(processed), kind='stable')[:k].tolist()
+        value = recall_at_k(ranked, relevant_rows(engine, terms), k)
+        if value is not None:
+            recalls.append(value)
+
+    return {
+        'build_ms': build_seconds * 1000,
+        'features': matrix.shape[1],
+        'vocabulary': vocabulary_size(vectorizer),
+        'matrix_kb': matrix_kilobytes(matrix),
+        'model_kb': len(pickle.dumps(vectorizer)) / 1024,
+        'query_p50': percentile_ms(times, 50),
+        'query_p95': percentile_ms(times, 95),
+        'recall': float(np.mean(recalls)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan ukuran index, waktu build & latency vectorizer fitted / hashing")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--modes', nargs='+', default=list(VECTORIZER_MODES), choices=VECTORIZER_MODES)
+    parser.add_argument('--ngrams', type=parse_ngram, nargs='+', default=[(1, 2)], help="e.g. 1,1 1,2 1,3")
+    parser.add_argument('--features', type=int, nargs='+', default=[None], help="Budget fitur (default per mode)")
+    parser.add_argument('--scale', type=int, nargs='+', default=[1], help="Faktor penggandaan korpus")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    engine = quiet(ChatbotEngine, args.dataset)
+    documents = engine.df['metadata_tfidf_processed'].tolist()
+
+    print(f"{'mode':<9}{'ngram':>7}{'fitur':>9}{'dok':>8}{'build':>11}{'vocab':>8}{'matrix KB':>11}{'model KB':>10}"
+          f"{'query p50':>11}{'query p95':>11}{'recall@' + str(args.k):>11}")
+
+    for scale in args.scale:
+        corpus = documents * scale
+
+        for mode in args.modes:
+            for ngram_range in args.ngrams:
+                for max_features in args.features:
+                    config = VectorizerConfig(mode=mode, ngram_range=ngram_range, max_features=max_features)
+                    stats = benchmark_config(engine, config, corpus, args.k, args.repeat)
+
+                    print(f"{mode:<9}{'%d-%d' % ngram_range:>7}{stats['features']:>9}{len(corpus):>8}"
+                          f"{stats['build_ms']:>9.1f}ms{stats['vocabulary']:>8}{stats['matrix_kb']:>11.1f}{stats['model_kb']:>10.1f}"
+                          f"{stats['query_p50']:>9.3f}ms{stats['query_p95']:>9.3f}ms{stats['recall']:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
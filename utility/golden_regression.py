@@ -0,0 +1,375 @@
+# ============================================================================
+# REGRESI RELEVANSI & LATENCY (GOLDEN QUERIES)
+# ============================================================================
+# Membandingkan ranking engine saat ini dengan hasil acuan (golden) yang
+# disimpan di utility/golden_queries.json: overlap@k, nDCG@k, warning, hasil
+# autocorrect, dan latency p50 per query. Keluar dengan kode 1 jika hasil
+# berubah melewati toleransi, sehingga optimasi performa yang diam-diam
+# mengubah ranking langsung ketahuan.
+#
+# Hasil acuan direkam dari kode baseline (sebelum seri optimasi). Perubahan
+# relevansi yang disengaja dicatat terpisah di `accepted_differences` beserta
+# request & alasannya; query tersebut dicek terhadap hasil yang diterima.
+#
+# Contoh:
+#   python utility/golden_regression.py                      # cek terhadap golden
+#   python utility/golden_regression.py --max-slowdown 1.5   # + gagal jika >1.5x lebih lambat
+#   python utility/golden_regression.py --lean-memory        # cek mode lean memory
+#   python utility/golden_regression.py --accept "ramen di sukajadi" --request user-037 --reason "..."
+#   python utility/golden_regression.py --update --note "re-baseline setelah filter atribut"
+# ============================================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attribute_index import AttributeIndex  # noqa: E402
+from benchmark_retrieval import DEFAULT_DATASET, percentile_ms  # noqa: E402
+from chatbot_engine import ChatbotEngine  # noqa: E402
+from price_index import parse_price_query  # noqa: E402
+from shared_index import dataset_fingerprint  # noqa: E402
+
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden_queries.json')
+GOLDEN_FORMAT_VERSION = 2
+DEFAULT_REPEAT = 5
+
+# Query acuan: (query, filter harga sidebar, tag perilaku yang dijaga)
+GOLDEN_QUERIES = [
+    # Pencarian cepat & menu umum
+    ("kopi", "Semua", ["quick_search"]),
+    ("ramen", "Semua", ["quick_search"]),
+    ("Sate", "Semua", ["quick_search"]),
+    ("roti", "Semua", ["quick_search"]),
+    ("nasi goreng", "Semua", ["menu"]),
+    ("ayam geprek enak", "Semua", ["menu"]),
+    ("es krim", "Semua", ["menu", "synonym"]),
+    ("seblak", "Semua", ["menu"]),
+    # Strict mode kategori
+    ("japanese food mahal", "Semua", ["strict_category", "price"]),
+    ("korean murah", "Semua", ["strict_category", "price"]),
+    ("western food sedang", "Semua", ["strict_category", "price"]),
+    ("cafe", "Murah", ["strict_category", "price_filter"]),
+    ("keluarga", "Semua", ["strict_tipe"]),
+    # Filter kecamatan / lokasi
+    ("ramen di sukajadi", "Semua", ["district"]),
+    ("bakso di buah batu", "Semua", ["district", "synonym"]),
+    ("sate di coblong", "Semua", ["district"]),
+    ("kopi di gedebage", "Semua", ["district", "district_fallback"]),
+    ("kafe bandung wetan", "Semua", ["district", "synonym"]),
+    ("makan enak dekat dago", "Semua", ["nearby"]),
+    ("cafe murah di dago", "Semua", ["district", "price"]),
+    # Nama restoran persis
+    ("1933 Dapur & Kopi", "Semua", ["exact_name"]),
+    ("Warung Nasi Ibu Imas", "Semua", ["exact_name"]),
+    # Koreksi typo
+    ("kopu murah", "Semua", ["typo"]),
+    ("ramem", "Semua", ["typo"]),
+    ("nasi gorng", "Semua", ["typo"]),
+    # Budget numerik, atribut & warning harga
+    ("ramen di bawah 30 ribu", "Semua", ["price_range"]),
+    ("steak di atas 100 ribu", "Semua", ["price_range"]),
+    ("tempat ngopi untuk nugas", "Semua", ["attributes", "semantic"]),
+    ("romantis", "Semua", ["attributes"]),
+    ("pizza mahal", "Semua", ["price", "warning"]),
+    ("sushi padang", "Semua", ["warning"]),
+    ("steak di antapani", "Mahal", ["district", "price_filter", "warning"]),
+    ("xyzabc", "Semua", ["no_result"]),
+]
+
+
+def check_attribute_wrappers(engine, dataset):
+    """'Toilet tersedia' / 'Memiliki bar' harus memakai bit yang sama dengan 'Toilet' / 'Bar'"""
+    index = AttributeIndex(pd.DataFrame({'fasilitas': ['Parkiran, Toilet tersedia', 'Toilet, Memiliki bar', 'Parkiran, Bar']}))
+    if index.values['fasilitas'] != ['bar', 'parkiran', 'toilet']:
+        return f"nilai fasilitas tidak kanonik: {index.values['fasilitas']}"
+    matched = np.flatnonzero(index.mask_all(index.find('parkiran toilet'))).tolist()
+    if matched != [0]:
+        return f"'Parkiran, Toilet tersedia' tidak lolos semua atribut 'parkiran toilet' (baris cocok: {matched})"
+    return None
+
+
+def check_budget_only_cheapest(engine, dataset, query='di bawah 100 ribu', top_n=10):
+    """Query yang hanya berisi budget harus mengembalikan restoran termurah di rentang.
+
+    Dataset diurutkan dari yang termahal, sehingga restoran termurah berada di luar
+    `budget` baris pertama rentang (dalam urutan dataset) yang dulu menjadi kandidat.
+    """
+    df = pd.read_csv(dataset)
+    df = df.iloc[np.argsort(-engine.price_index.min_prices, kind='stable')].reset_index(drop=True)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, os.path.basename(dataset))
+        df.to_csv(path, index=False)
+        reordered = ChatbotEngine(path, parse_cache_size=0)
+
+    price_index = reordered.price_index
+    in_range = price_index.min_order[price_index.mask(parse_price_query(query)[0])[price_index.min_order]]
+    budget = int(reordered.ranking_plan.weights.get('candidates', {}).get('budget', 0))
+    if len(in_range) <= budget:
+        return f"rentang '{query}' hanya {len(in_range)} restoran, tidak melebihi budget kandidat {budget}"
+
+    actual = price_index.min_prices[reordered.recommend(query, top_n=top_n).row_ids].tolist()
+    expected = price_index.min_prices[in_range[:top_n]].tolist()
+    if actual != expected:
+        return f"harga minimum hasil '{query}' {actual}, seharusnya yang termurah {expected}"
+    return None
+
+
+# Pemeriksaan perilaku di luar golden: fungsi(engine, dataset) -> pesan kegagalan atau None
+BEHAVIOUR_CHECKS = [
+    check_attribute_wrappers,
+    check_budget_only_cheapest,
+]
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def overlap_at_k(actual, expected, k):
+    expected = expected[:k]
+    if not expected:
+        return 1.0 if not actual[:k] else 0.0
+    return len(set(actual[:k]) & set(expected)) / min(k, len(expected))
+
+
+def ndcg_at_k(actual, expected, k):
+    """nDCG@k dengan relevansi bertingkat dari urutan golden (peringkat 1 = relevansi k)"""
+    expected = expected[:k]
+    if not expected:
+        return 1.0 if not actual[:k] else 0.0
+
+    relevance = {row_id: k - rank for rank, row_id in enumerate(expected)}
+    discounts = 1.0 / np.log2(np.arange(2, k + 2))
+    dcg = sum(relevance.get(row_id, 0) * discounts[rank] for rank, row_id in enumerate(actual[:k]))
+    idcg = sum(relevance[row_id] * discounts[rank] for rank, row_id in enumerate(expected))
+    return dcg / idcg
+
+
+def run_query(engine, query, price_filter, top_n, repeat):
+    """Hasil query + latency p50 (ms) dari `repeat` kali pipeline penuh"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = engine.recommend(query, price_filter=price_filter, top_n=top_n)
+        times.append(time.perf_counter() - start)
+    return result, percentile_ms(times, 50)
+
+
+def record_query(engine, query, price_filter, top_n, repeat):
+    """Hasil engine saat ini untuk satu query dalam format entri golden"""
+    names = engine.df['nama_rumah_makan'].astype(str).values
+    result, latency = run_query(engine, query, price_filter, top_n, repeat)
+    return {
+        'query': query,
+        'price_filter': price_filter,
+        'expected_row_ids': result.row_ids.tolist(),
+        'expected_names': [names[row_id] for row_id in result.row_ids],
+        'warning': result.warning,
+        'corrected_query': result.corrected_query,
+        'latency_p50_ms': round(latency, 3),
+    }
+
+
+def build_golden(engine, dataset, top_n, repeat, previous, note):
+    """Merekam perilaku engine saat ini sebagai golden baru (versi naik satu).
+
+    Perbedaan yang disengaja dari golden lama tidak dibawa: hasil saat ini menjadi acuan baru.
+    """
+    queries = []
+    for query, price_filter, tags in GOLDEN_QUERIES:
+        entry = record_query(engine, query, price_filter, top_n, repeat)
+        entry['tags'] = tags
+        queries.append(entry)
+
+    return {
+        'format_version': GOLDEN_FORMAT_VERSION,
+        'version': (previous or {}).get('version', 0) + 1,
+        'created_at': time.strftime('%Y-%m-%d'),
+        'note': note,
+        'dataset': os.path.basename(dataset),
+        'dataset_fingerprint': dataset_fingerprint(dataset, engine.vectorizer_config),
+        'top_n': top_n,
+        'repeat': repeat,
+        'queries': queries,
+        'accepted_differences': [],
+    }
+
+
+def accept_difference(engine, golden, query, request, reason):
+    """Mencatat hasil engine saat ini untuk `query` sebagai perbedaan disengaja dari golden"""
+    entry = next((entry for entry in golden['queries'] if entry['query'] == query), None)
+    if entry is None:
+        raise ValueError(f"Query '{query}' tidak ada di golden!")
+
+    accepted = record_query(engine, query, entry['price_filter'], golden['top_n'], golden['repeat'])
+    accepted.update({'request': request, 'reason': reason})
+    differences = [item for item in golden.get('accepted_differences', []) if item['query'] != query] + [accepted]
+    order = [entry['query'] for entry in golden['queries']]
+    golden['accepted_differences'] = sorted(differences, key=lambda item: order.index(item['query']))
+    return accepted
+
+
+def accepted_for(golden, entry):
+    """Perbedaan disengaja yang tercatat untuk entri golden (None jika tidak ada)"""
+    for accepted in golden.get('accepted_differences', []):
+        if accepted['query'] == entry['query'] and accepted['price_filter'] == entry['price_filter']:
+            return accepted
+    return None
+
+
+def compare(engine, golden, k, repeat):
+    """Membandingkan engine dengan setiap query golden"""
+    rows = []
+    for entry in golden['queries']:
+        result, latency = run_query(engine, entry['query'], entry['price_filter'], golden['top_n'], repeat)
+        # Latency tetap dibandingkan dengan baseline, hasil dengan perbedaan yang diterima (jika ada)
+        accepted = accepted_for(golden, entry)
+        expected_entry = accepted or entry
+        actual = result.row_ids.tolist()
+        expected = expected_entry['expected_row_ids']
+        rows.append({
+            'entry': entry,
+            'accepted': accepted,
+            'overlap': overlap_at_k(actual, expected, k),
+            'ndcg': ndcg_at_k(actual, expected, k),
+            'exact': actual[:k] == expected[:k],
+            'warning_ok': result.warning == expected_entry['warning'],
+            'corrected_ok': result.corrected_query == expected_entry['corrected_query'],
+            'latency': latency,
+            'baseline_latency': entry['latency_p50_ms'],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regresi relevansi & latency terhadap golden queries")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--golden', default=GOLDEN_PATH)
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=None,
+                        help=f"Pengulangan per query untuk latency p50 (default: sama dengan golden, atau {DEFAULT_REPEAT})")
+    parser.add_argument('--min-overlap', type=float, default=0.9, help="Overlap@k minimal per query")
+    parser.add_argument('--min-ndcg', type=float, default=0.95, help="nDCG@k minimal per query")
+    parser.add_argument('--ignore-warnings', action='store_true', help="Perbedaan warning/autocorrect tidak menggagalkan")
+    parser.add_argument('--max-slowdown', type=float, default=None,
+                        help="Gagal jika latency p50 total lebih lambat dari golden sebanyak faktor ini")
+    parser.add_argument('--update', action='store_true', help="Rekam perilaku saat ini sebagai golden versi baru")
+    parser.add_argument('--note', default='', help="Catatan perubahan untuk --update")
+    parser.add_argument('--top-n', type=int, default=10, help="top_n yang direkam saat --update")
+    parser.add_argument('--lean-memory', action='store_true', help="Cek engine dalam mode lean memory")
+    parser.add_argument('--accept', metavar='QUERY', help="Catat hasil saat ini untuk QUERY sebagai perbedaan disengaja")
+    parser.add_argument('--request', default='', help="Request yang menyebabkan perbedaan (untuk --accept)")
+    parser.add_argument('--reason', default='', help="Alasan perbedaan (wajib untuk --accept)")
+    args = parser.parse_args()
+
+    # Cache parsing dimatikan agar setiap pengulangan mengukur pipeline penuh
+    engine = quiet(ChatbotEngine, args.dataset, parse_cache_size=0, lean_memory=args.lean_memory)
+
+    previous = None
+    if os.path.isfile(args.golden):
+        with open(args.golden, encoding='utf-8') as f:
+            previous = json.load(f)
+
+    if args.update:
+        golden = quiet(build_golden, engine, args.dataset, args.top_n, args.repeat or DEFAULT_REPEAT, previous, args.note)
+        with open(args.golden, 'w', encoding='utf-8') as f:
+            json.dump(golden, f, ensure_ascii=False, indent=1)
+        print(f"[INFO] Golden v{golden['version']} ({len(golden['queries'])} query) disimpan ke {args.golden}")
+        return
+
+    if previous is None:
+        print(f"[ERROR] Golden '{args.golden}' belum ada. Jalankan dengan --update terlebih dahulu.")
+        sys.exit(2)
+
+    golden = previous
+    if golden.get('format_version') != GOLDEN_FORMAT_VERSION:
+        print(f"[ERROR] Format golden v{golden.get('format_version')} tidak didukung (butuh v{GOLDEN_FORMAT_VERSION})")
+        sys.exit(2)
+
+    if args.accept:
+        if not args.reason:
+            print("[ERROR] --accept membutuhkan --reason")
+            sys.exit(2)
+        accepted = quiet(accept_difference, engine, golden, args.accept, args.request, args.reason)
+        with open(args.golden, 'w', encoding='utf-8') as f:
+            json.dump(golden, f, ensure_ascii=False, indent=1)
+        print(f"[INFO] Perbedaan disengaja '{args.accept}' dicatat: {accepted['expected_row_ids']}")
+        return
+    if golden['dataset_fingerprint'] != dataset_fingerprint(args.dataset, engine.vectorizer_config):
+        print("[WARNING] Dataset/konfigurasi vectorizer berbeda dari saat golden direkam; perbedaan ranking bisa wajar.")
+
+    # Latency hanya sebanding jika jumlah pengulangannya sama (pengulangan pertama selalu cold)
+    repeat = args.repeat or golden['repeat']
+    if repeat != golden['repeat']:
+        print(f"[WARNING] repeat={repeat} berbeda dengan golden (repeat={golden['repeat']}); latency tidak sebanding.")
+    rows = quiet(compare, engine, golden, args.k, repeat)
+
+    print(f"Golden v{golden['version']} ({golden['created_at']}{', ' + golden['note'] if golden.get('note') else ''}), k={args.k}")
+    print(f"{'query':<32}{'filter':>8}{'overlap':>9}{'nDCG':>7}{'warn':>6}{'typo':>6}{'golden':>10}{'now':>10}")
+
+    failures = []
+    for row in rows:
+        entry = row['entry']
+        # '*' = dibandingkan dengan perbedaan yang diterima, bukan hasil baseline
+        label = f"{entry['query'][:29]}{' *' if row['accepted'] else ''}"
+        print(f"{label[:31]:<32}{entry['price_filter']:>8}{row['overlap']:>9.2f}{row['ndcg']:>7.3f}"
+              f"{'ok' if row['warning_ok'] else 'BEDA':>6}{'ok' if row['corrected_ok'] else 'BEDA':>6}"
+              f"{row['baseline_latency']:>8.2f}ms{row['latency']:>8.2f}ms")
+
+        reasons = []
+        if row['overlap'] < args.min_overlap:
+            reasons.append(f"overlap@{args.k} {row['overlap']:.2f}")
+        if row['ndcg'] < args.min_ndcg:
+            reasons.append(f"nDCG@{args.k} {row['ndcg']:.3f}")
+        if not args.ignore_warnings and not row['warning_ok']:
+            reasons.append("warning berubah")
+        if not args.ignore_warnings and not row['corrected_ok']:
+            reasons.append("hasil autocorrect berubah")
+        if reasons:
+            failures.append(f"'{entry['query']}' [{', '.join(entry['tags'])}]: {', '.join(reasons)}")
+
+    baseline_total = sum(row['baseline_latency'] for row in rows)
+    current_total = sum(row['latency'] for row in rows)
+    slowdown = current_total / baseline_total if baseline_total else 1.0
+    print(f"\nRata-rata overlap@{args.k}: {np.mean([row['overlap'] for row in rows]):.3f}, "
+          f"nDCG@{args.k}: {np.mean([row['ndcg'] for row in rows]):.3f}, "
+          f"top-{args.k} identik: {sum(row['exact'] for row in rows)}/{len(rows)}")
+    print(f"Latency p50 total: golden {baseline_total:.1f} ms, sekarang {current_total:.1f} ms ({slowdown:.2f}x)")
+
+    accepted_rows = [row for row in rows if row['accepted']]
+    if accepted_rows:
+        print(f"\nPerbedaan disengaja dari baseline (*, {len(accepted_rows)} query):")
+        for row in accepted_rows:
+            accepted = row['accepted']
+            print(f"  '{accepted['query']}' [{accepted['request']}]: {accepted['reason']}")
+
+    if args.max_slowdown is not None and slowdown > args.max_slowdown:
+        failures.append(f"latency {slowdown:.2f}x golden (batas {args.max_slowdown:.2f}x)")
+
+    check_failures = [(check.__name__, quiet(check, engine, args.dataset)) for check in BEHAVIOUR_CHECKS]
+    check_failures = [(name, message) for name, message in check_failures if message]
+    print(f"Cek perilaku: {len(BEHAVIOUR_CHECKS) - len(check_failures)}/{len(BEHAVIOUR_CHECKS)} lolos")
+    failures.extend(f"{name}: {message}" for name, message in check_failures)
+
+    if failures:
+        for message in failures:
+            print(f"[WARNING] Regresi: {message}")
+        sys.exit(1)
+    print("[SUCCESS] Tidak ada regresi di atas toleransi.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+# ============================================================================
+# LOAD TEST QUERY BERSAMAAN (THROUGHPUT, TAIL LATENCY, CONTENTION)
+# ============================================================================
+# Menjalankan campuran query (teks, lokasi, harga, atribut, browse) dari banyak
+# thread terhadap SATU engine, seperti satu engine ter-cache yang dipakai semua
+# session Streamlit. Hasil setiap query dibandingkan dengan hasil sekuensial
+# untuk memastikan jalur baca benar-benar thread-safe.
+#
+# Contoh:
+#   python utility/load_test.py --threads 1 4 8 16 --queries 400
+#   python utility/load_test.py --threads 16 --gate 4 --gate-timeout 2
+# ============================================================================
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_retrieval import DEFAULT_DATASET, percentile_ms  # noqa: E402
+from chatbot_engine import ChatbotEngine  # noqa: E402
+from concurrency import QueryGate, QueryGateTimeout  # noqa: E402
+
+
+# Campuran query: (jenis, argumen)
+QUERY_MIX = [
+    ('text', "ramen enak"),
+    ('text', "kopi susu gula aren"),
+    ('text', "ayam geprek pedas"),
+    ('text', "dimsum"),
+    ('location', "cafe di dago"),
+    ('location', "bakso dekat coblong"),
+    ('location', "sate di buah batu"),
+    ('price', "makan siang di bawah 30 ribu"),
+    ('price', "steak 50rb an"),
+    ('price', "cafe murah"),
+    ('attributes', "tempat nugas ada wifi"),
+    ('attributes', "restoran keluarga ada parkiran"),
+    ('attributes', "cafe romantis"),
+    ('browse', {'category': 'Cafe & Dessert', 'facilities': ['Wi-Fi']}),
+    ('browse', {'price': 'Murah'}),
+]
+
+
+def run_query(engine, kind, args, top_n):
+    """Menjalankan satu query; mengembalikan row id hasil (untuk dibandingkan)"""
+    if kind == 'browse':
+        return tuple(engine.browse(**args, limit=top_n).page.index.tolist())
+    return tuple(engine.recommend(args, top_n=top_n).row_ids.tolist())
+
+
+def run_load(engine, workload, threads, top_n, expected):
+    """Menjalankan `workload` dengan `threads` worker; latency dicatat per query"""
+    latencies = []
+    errors = []
+    mismatches = []
+    rejected = [0]
+    record_lock = threading.Lock()
+
+    def worker(item):
+        kind, args = item
+        start = time.perf_counter()
+        try:
+            row_ids = run_query(engine, kind, args, top_n)
+        except QueryGateTimeout:
+            with record_lock:
+                rejected[0] += 1
+            return
+        except Exception as e:
+            with record_lock:
+                errors.append(f"{kind} {args!r}: {e}")
+            return
+        elapsed = time.perf_counter() - start
+
+        with record_lock:
+            latencies.append(elapsed)
+            if row_ids != expected[(kind, repr(args))]:
+                mismatches.append(f"{kind} {args!r}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, workload))
+    wall = time.perf_counter() - start
+
+    return {
+        'completed': len(latencies),
+        'qps': len(latencies) / wall if wall else 0.0,
+        'p50': percentile_ms(latencies, 50) if latencies else 0.0,
+        'p95': percentile_ms(latencies, 95) if latencies else 0.0,
+        'p99': percentile_ms(latencies, 99) if latencies else 0.0,
+        'max': max(latencies) * 1000 if latencies else 0.0,
+        'rejected': rejected[0],
+        'errors': errors,
+        'mismatches': mismatches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test query bersamaan terhadap satu ChatbotEngine")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--queries', type=int, default=300, help="Jumlah query per putaran")
+    parser.add_argument('--top-n', type=int, default=10)
+    parser.add_argument('--gate', type=int, default=None, help="Batas query bersamaan (max_concurrent_queries)")
+    parser.add_argument('--gate-timeout', type=float, default=None)
+    parser.add_argument('--mix', nargs='+', default=None,
+                        choices=sorted({kind for kind, _ in QUERY_MIX}),
+                        help="Jenis query yang dipakai (default: semua)")
+    args = parser.parse_args()
+
+    mix = [item for item in QUERY_MIX if args.mix is None or item[0] in args.mix]
+    workload = [mix[position % len(mix)] for position in range(args.queries)]
+
+    # stdout dibungkam sekali untuk seluruh run (redirect_stdout tidak aman jika dibuka per thread)
+    report = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ChatbotEngine(args.dataset)
+        expected = {(kind, repr(query)): run_query(engine, kind, query, args.top_n) for kind, query in mix}
+
+        for threads in args.threads:
+            engine.query_gate = QueryGate(args.gate, args.gate_timeout) if args.gate else None
+            report.append((threads, run_load(engine, workload, threads, args.top_n, expected),
+                           engine.query_gate.stats() if engine.query_gate else None))
+
+    print(f"Query per putaran: {args.queries} ({len(mix)} jenis query), top_n={args.top_n}, "
+          f"gate={args.gate or '-'}, timeout={args.gate_timeout or '-'}")
+    print(f"{'threads':>8}{'qps':>9}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+          f"{'ditolak':>9}{'error':>7}{'beda':>6}{'contention':>12}{'wait rata2':>12}{'wait max':>10}")
+
+    failed = False
+    for threads, stats, gate in report:
+        contention = f"{gate['contention_rate']:.0%}" if gate else '-'
+        mean_wait = f"{gate['mean_wait_ms']:.2f}ms" if gate else '-'
+        max_wait = f"{gate['max_wait_ms']:.2f}ms" if gate else '-'
+        print(f"{threads:>8}{stats['qps']:>9.1f}{stats['p50']:>8.2f}ms{stats['p95']:>8.2f}ms"
+              f"{stats['p99']:>8.2f}ms{stats['max']:>8.2f}ms{stats['rejected']:>9}"
+              f"{len(stats['errors']):>7}{len(stats['mismatches']):>6}{contention:>12}{mean_wait:>12}{max_wait:>10}")
+
+        for message in stats['errors'][:5]:
+            print(f"[WARNING] Error ({threads} thread): {message}")
+        for message in sorted(set(stats['mismatches']))[:5]:
+            print(f"[WARNING] Hasil berbeda dari sekuensial ({threads} thread): {message}")
+        failed = failed or bool(stats['errors'] or stats['mismatches'])
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# ============================================================================
+# LAPORAN MEMORI ENGINE PER KOMPONEN
+# ============================================================================
+# Membandingkan memori engine standar dan mode lean memory (kolom metadata
+# build-only dilepas, kolom tampilan categorical) per komponen, sekaligus
+# memastikan ranking kedua mode identik untuk query acuan.
+#
+# Contoh:
+#   python utility/memory_report.py
+#   python utility/memory_report.py --retrieval-mode bm25 --columns
+# ============================================================================
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmark_retrieval import DEFAULT_DATASET, LABELED_QUERIES, quiet  # noqa: E402
+from chatbot_engine import ChatbotEngine  # noqa: E402
+from retrieval import RETRIEVAL_MODES  # noqa: E402
+
+
+def kilobytes(nbytes):
+    return nbytes / 1024
+
+
+def print_breakdown(title, reports):
+    """Tabel komponen x mode (KB), urut dari komponen terbesar pada mode pertama"""
+    modes = list(reports)
+    components = sorted(
+        {component for report in reports.values() for component in report},
+        key=lambda component: -reports[modes[0]].get(component, 0),
+    )
+
+    print(f"\n{title}")
+    print(f"{'komponen':<24}" + ''.join(f"{mode:>12}" for mode in modes))
+    for component in components:
+        print(f"{component:<24}" + ''.join(f"{kilobytes(reports[mode].get(component, 0)):>10.1f}KB" for mode in modes))
+    print(f"{'TOTAL':<24}" + ''.join(f"{kilobytes(sum(reports[mode].values())):>10.1f}KB" for mode in modes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan memori engine standar vs lean memory per komponen")
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--retrieval-mode', default='tfidf', choices=RETRIEVAL_MODES)
+    parser.add_argument('--columns', action='store_true', help="Tampilkan juga memori DataFrame per kolom")
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args()
+
+    engines = {
+        'standar': quiet(ChatbotEngine, args.dataset, retrieval_mode=args.retrieval_mode),
+        'lean': quiet(ChatbotEngine, args.dataset, retrieval_mode=args.retrieval_mode, lean_memory=True),
+    }
+
+    print_breakdown("Memori per komponen:", {mode: engine.memory_report() for mode, engine in engines.items()})
+
+    if args.columns:
+        print_breakdown("DataFrame per kolom:", {
+            mode: {column: int(nbytes) for column, nbytes in engine.df.memory_usage(deep=True, index=False).items()}
+            for mode, engine in engines.items()
+        })
+
+    standard = sum(engines['standar'].memory_report().values())
+    lean = sum(engines['lean'].memory_report().values())
+    print(f"\nLean memory menghemat {kilobytes(standard - lean):.1f} KB ({1 - lean / standard:.1%}) per engine.")
+
+    # Mode lean tidak boleh mengubah ranking
+    mismatches = [
+        query for query, _ in LABELED_QUERIES
+        if quiet(engines['standar'].recommend, query, top_n=args.top_n).row_ids.tolist()
+        != quiet(engines['lean'].recommend, query, top_n=args.top_n).row_ids.tolist()
+    ]
+    if mismatches:
+        print(f"[WARNING] Ranking berbeda untuk {len(mismatches)} query: {mismatches}")
+        sys.exit(1)
+    print(f"[SUCCESS] Ranking identik untuk {len(LABELED_QUERIES)} query acuan.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# ============================================================================
+# KONFIGURASI VEKTORISASI TF-IDF (FITTED / HASHING)
+# ============================================================================
+# Mode 'fitted' menyimpan vocabulary hasil fit (TfidfVectorizer), sedangkan
+# mode 'hashing' memetakan term ke ruang fitur tetap lewat hashing trick
+# (HashingVectorizer + TfidfTransformer): tanpa vocabulary tersimpan, ukuran
+# fitur tidak bergantung pada jumlah dokumen, dan dokumen bisa diproses
+# secara streaming.
+
+from dataclasses import dataclass
+
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+
+
+VECTORIZER_MODES = ('fitted', 'hashing')
+
+DEFAULT_FEATURE_BUDGET = {
+    'fitted': 1000,
+    'hashing': 2 ** 16,
+}
+
+
+@dataclass(frozen=True)
+class VectorizerConfig:
+    """Pengaturan vektorisasi TF-IDF untuk engine.
+
+    Attributes:
+        mode (str): 'fitted' (vocabulary hasil fit) atau 'hashing' (hashing trick)
+        ngram_range (tuple): Rentang n-gram, e.g. (1, 2)
+        max_features (int): Budget fitur; batas vocabulary pada mode 'fitted',
+            jumlah bucket hash pada mode 'hashing' (None = default per mode)
+        min_df (int/float): Frekuensi dokumen minimal (hanya mode 'fitted')
+        max_df (int/float): Frekuensi dokumen maksimal (hanya mode 'fitted')
+    """
+
+    mode: str = 'fitted'
+    ngram_range: tuple = (1, 2)
+    max_features: int = None
+    min_df: float = 1
+    max_df: float = 0.8
+
+    def __post_init__(self):
+        if self.mode not in VECTORIZER_MODES:
+            raise ValueError(f"Mode vectorizer harus salah satu dari {VECTORIZER_MODES}!")
+
+        low, high = self.ngram_range
+        if not 1 <= low <= high:
+            raise ValueError("ngram_range harus berupa (min, max) dengan 1 <= min <= max!")
+
+        if self.max_features is not None and self.max_features < 1:
+            raise ValueError("max_features minimal 1!")
+
+    @property
+    def feature_budget(self):
+        """Budget fitur yang berlaku untuk mode ini"""
+        return self.max_features or DEFAULT_FEATURE_BUDGET[self.mode]
+
+    def build(self):
+        """Membuat vectorizer (belum di-fit) dengan `fit_transform` & `transform`"""
+        if self.mode == 'hashing':
+            return make_pipeline(
+                HashingVectorizer(
+                    n_features=self.feature_budget,
+                    ngram_range=tuple(self.ngram_range),
+                    alternate_sign=False,
+                    norm=None,
+                ),
+                TfidfTransformer(),
+            )
+
+        return TfidfVectorizer(
+            max_features=self.feature_budget,
+            ngram_range=tuple(self.ngram_range),
+            min_df=self.min_df,
+            max_df=self.max_df,
+        )
+
+    def describe(self):
+        """Ringkasan satu baris untuk log & laporan"""
+        return f"{self.mode} ngram={tuple(self.ngram_range)} fitur={self.feature_budget}"
+
+
+def vocabulary_size(vectorizer):
+    """Jumlah term yang disimpan vectorizer (0 untuk mode hashing)"""
+    return len(getattr(vectorizer, 'vocabulary_', {}) or {})